@@ -0,0 +1,159 @@
+"""
+Benchmarks for context assembly.
+
+Measures:
+- Formatting loaded CONTEXT files into a single string
+- Streaming the same content to a file without building it in memory
+- Building the full first prompt (context + prompt + injections)
+
+Each benchmark also records peak memory allocated during one run
+(tracemalloc), which tracks the extra resident memory the copies cost.
+"""
+
+import os
+import statistics
+import time
+import tracemalloc
+from pathlib import Path
+from typing import NamedTuple
+
+from sdqctl.core.context import ContextManager
+
+# Synthetic context: 200 files x ~20 KB = ~4 MB
+FILE_COUNT = 200
+FILE_LINES = 400
+
+
+class BenchmarkResult(NamedTuple):
+    """Result of a single benchmark."""
+
+    name: str
+    iterations: int
+    mean_ms: float
+    std_ms: float
+    min_ms: float
+    max_ms: float
+    peak_mb: float = 0.0
+
+
+def _time_ms(func, iterations: int = 20, name: str | None = None) -> BenchmarkResult:
+    """Time a function over multiple iterations, then measure its peak allocation."""
+    times = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        func()
+        elapsed = (time.perf_counter() - start) * 1000
+        times.append(elapsed)
+
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return BenchmarkResult(
+        name=name or func.__name__,
+        iterations=iterations,
+        mean_ms=statistics.mean(times),
+        std_ms=statistics.stdev(times) if len(times) > 1 else 0,
+        min_ms=min(times),
+        max_ms=max(times),
+        peak_mb=peak / (1024 * 1024),
+    )
+
+
+def _loaded_context(tmp_path: Path) -> ContextManager:
+    """Create the synthetic files and load them into a ContextManager."""
+    src_dir = tmp_path / "context_src"
+    if not src_dir.exists():
+        src_dir.mkdir()
+        for i in range(FILE_COUNT):
+            lines = [f"def function_{i}_{n}(value):  # padding padding padding\n"
+                     for n in range(FILE_LINES)]
+            (src_dir / f"module_{i:03d}.py").write_text("".join(lines))
+
+    ctx = ContextManager(base_path=tmp_path, max_tokens=10_000_000)
+    ctx.add_pattern(f"@{src_dir}/*.py")
+    return ctx
+
+
+def bench_context_join(tmp_path: Path) -> BenchmarkResult:
+    """Benchmark get_context_content() (one string with all files)."""
+    ctx = _loaded_context(tmp_path)
+
+    def assemble():
+        ctx.get_context_content()
+
+    return _time_ms(assemble, name="context_join")
+
+
+def bench_context_stream(tmp_path: Path) -> BenchmarkResult:
+    """Benchmark write_context_content() to a file (no full string built)."""
+    ctx = _loaded_context(tmp_path)
+
+    def stream():
+        with open(os.devnull, "w") as out:
+            ctx.write_context_content(out)
+
+    return _time_ms(stream, name="context_stream")
+
+
+def bench_prompt_build(tmp_path: Path) -> BenchmarkResult:
+    """Benchmark build_full_prompt() streaming a large context into the first prompt."""
+    from sdqctl.commands.prompt_steps import PromptContext, build_full_prompt
+    from sdqctl.core.conversation import ConversationFile
+    from sdqctl.core.loop_detector import LoopDetector
+    from sdqctl.core.session import Session
+
+    conv = ConversationFile.parse(
+        "MODEL gpt-4\nADAPTER mock\n"
+        "PROLOGUE You are an expert code reviewer.\n"
+        "EPILOGUE Format your response as markdown.\n"
+        "PROMPT Review these modules.\n"
+    )
+    session = Session(conv, session_dir=tmp_path / "session")
+    session.context = _loaded_context(tmp_path)
+    loop_detector = LoopDetector()
+    prompt_ctx = PromptContext(
+        prompt=conv.prompts[0],
+        prompt_idx=0,
+        total_prompts=1,
+        cycle_num=0,
+        max_cycles=1,
+        session_mode="accumulate",
+        context_content="",
+        template_vars={},
+        context_stream=session.context.iter_context_content,
+    )
+
+    def build():
+        build_full_prompt(prompt_ctx, conv, session, loop_detector)
+
+    return _time_ms(build, name="prompt_build")
+
+
+def run_all(tmp_path: Path | None = None) -> list[BenchmarkResult]:
+    """Run all context assembly benchmarks (they need a scratch directory)."""
+    if not tmp_path:
+        return []
+    return [
+        bench_context_join(tmp_path),
+        bench_context_stream(tmp_path),
+        bench_prompt_build(tmp_path),
+    ]
+
+
+if __name__ == "__main__":
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as tmp:
+        results = run_all(Path(tmp))
+        print("\n=== Context Assembly Benchmarks ===\n")
+        for r in results:
+            print(f"{r.name}:")
+            print(f"  mean: {r.mean_ms:.3f}ms (±{r.std_ms:.3f}ms)")
+            print(f"  range: [{r.min_ms:.3f}ms, {r.max_ms:.3f}ms]")
+            print(f"  peak memory: {r.peak_mb:.2f}MB")
+            print(f"  iterations: {r.iterations}")
+            print()
@@ -5,6 +5,7 @@ Measures:
 - Template expansion time
 - Context assembly overhead
 - Prompt building performance
+- Placeholder and {{VAR}} substitution in large prompts
 """
 
 import statistics
@@ -12,7 +13,11 @@ import time
 from pathlib import Path
 from typing import NamedTuple
 
-from sdqctl.core.conversation import ConversationFile
+from sdqctl.core.conversation import (
+    ConversationFile,
+    substitute_template_variables,
+    substitute_tokens,
+)
 from sdqctl.core.renderer import render_prompt
 
 
@@ -195,6 +200,47 @@ def bench_render_multiple_prompts() -> BenchmarkResult:
     return _time_ms(render, iterations=50)
 
 
+def _merged_prompt(producers: int = 200, output_bytes: int = 10_000):
+    """A merged prompt with RUN placeholders and their (large) outputs."""
+    placeholders = [f"{{{{RUN:{i}:pytest tests/test_{i}.py}}}}" for i in range(producers)]
+    prompt = "\n\n".join(f"Step {i}:\n{p}" for i, p in enumerate(placeholders))
+    outputs = {p: f"+ output {i}\n" + "x" * output_bytes for i, p in enumerate(placeholders)}
+    return prompt, outputs
+
+
+def bench_fill_placeholders() -> BenchmarkResult:
+    """Benchmark filling 200 placeholders with 10KB outputs in one pass."""
+    prompt, outputs = _merged_prompt()
+
+    def fill_single_pass():
+        substitute_tokens(prompt, outputs)
+
+    return _time_ms(fill_single_pass, iterations=20)
+
+
+def bench_fill_placeholders_replace_loop() -> BenchmarkResult:
+    """Baseline: the same fill with one str.replace() per placeholder."""
+    prompt, outputs = _merged_prompt()
+
+    def fill_replace_loop():
+        text = prompt
+        for placeholder, output in outputs.items():
+            text = text.replace(placeholder, output)
+
+    return _time_ms(fill_replace_loop, iterations=20)
+
+
+def bench_substitute_variables() -> BenchmarkResult:
+    """Benchmark {{VAR}} substitution in a 1MB prompt with 20 variables."""
+    variables = {f"VAR_{i}": f"value {i}" for i in range(20)}
+    text = "".join(f"{{{{VAR_{i % 20}}}}} " + "y" * 1000 for i in range(1000))
+
+    def substitute_variables():
+        substitute_template_variables(text, variables)
+
+    return _time_ms(substitute_variables, iterations=20)
+
+
 def run_all(tmp_path: Path | None = None) -> list[BenchmarkResult]:
     """Run all rendering benchmarks."""
     results = [
@@ -202,6 +248,9 @@ def run_all(tmp_path: Path | None = None) -> list[BenchmarkResult]:
         bench_render_template(),
         bench_render_structured(),
         bench_render_multiple_prompts(),
+        bench_fill_placeholders(),
+        bench_fill_placeholders_replace_loop(),
+        bench_substitute_variables(),
     ]
 
     if tmp_path:
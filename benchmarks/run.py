@@ -18,7 +18,7 @@ from datetime import datetime
 from pathlib import Path
 from typing import NamedTuple
 
-from . import bench_parsing, bench_rendering, bench_sdk, bench_workflow
+from . import bench_context, bench_parsing, bench_rendering, bench_sdk, bench_workflow
 
 
 class BenchmarkResult(NamedTuple):
@@ -31,6 +31,7 @@ class BenchmarkResult(NamedTuple):
     std_ms: float
     min_ms: float
     max_ms: float
+    peak_mb: float = 0.0  # Peak allocation during one run (0 = not measured)
 
 
 def run_all_benchmarks(quick: bool = False) -> list[BenchmarkResult]:
@@ -66,6 +67,20 @@ def run_all_benchmarks(quick: bool = False) -> list[BenchmarkResult]:
                 max_ms=r.max_ms,
             ))
 
+        # Context assembly benchmarks
+        print("Running context benchmarks...", file=sys.stderr)
+        for r in bench_context.run_all(tmp_path):
+            results.append(BenchmarkResult(
+                category="context",
+                name=r.name,
+                iterations=r.iterations if not quick else max(5, r.iterations // 10),
+                mean_ms=r.mean_ms,
+                std_ms=r.std_ms,
+                min_ms=r.min_ms,
+                max_ms=r.max_ms,
+                peak_mb=r.peak_mb,
+            ))
+
         # Workflow benchmarks
         print("Running workflow benchmarks...", file=sys.stderr)
         for r in bench_workflow.run_all(tmp_path):
@@ -98,14 +113,15 @@ def run_all_benchmarks(quick: bool = False) -> list[BenchmarkResult]:
 def format_table(results: list[BenchmarkResult]) -> str:
     """Format results as a markdown table."""
     lines = [
-        "| Category | Benchmark | Mean (ms) | Std (ms) | Min | Max | Iterations |",
-        "|----------|-----------|-----------|----------|-----|-----|------------|",
+        "| Category | Benchmark | Mean (ms) | Std (ms) | Min | Max | Iterations | Peak (MB) |",
+        "|----------|-----------|-----------|----------|-----|-----|------------|-----------|",
     ]
 
     for r in results:
+        peak = f"{r.peak_mb:.2f}" if r.peak_mb else "-"
         lines.append(
             f"| {r.category} | {r.name} | {r.mean_ms:.3f} | {r.std_ms:.3f} | "
-            f"{r.min_ms:.3f} | {r.max_ms:.3f} | {r.iterations} |"
+            f"{r.min_ms:.3f} | {r.max_ms:.3f} | {r.iterations} | {peak} |"
         )
 
     return "\n".join(lines)
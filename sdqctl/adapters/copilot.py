@@ -289,6 +289,8 @@ class CopilotAdapter(AdapterBase):
             metrics_path = session_dir / "metrics.json"
             with open(metrics_path, "w") as f:
                 json.dump(metrics, f, indent=2)
+            from ..core.session_index import SessionIndex
+            SessionIndex(SDQCTL_DIR / "sessions").record_metrics(session_id, metrics)
             logger.debug(f"Persisted metrics to {metrics_path}")
 
         except Exception as e:
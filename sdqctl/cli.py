@@ -123,7 +123,7 @@ cli.add_command(workspace)
 @click.option("--max-cycles", "-n", type=int, default=None)
 @click.option(
     "--session-mode", "-s",
-    type=click.Choice(["accumulate", "compact", "fresh"]),
+    type=click.Choice(["accumulate", "compact", "fresh", "diff"]),
     default="accumulate",
 )
 @click.option("--adapter", "-a", default=None)
@@ -27,6 +27,7 @@ from ..core.conversation import ConversationFile, apply_iteration_context
 from ..core.logging import get_logger
 from ..core.loop_detector import get_stop_file_instruction
 from ..core.progress import progress as progress_print
+from ..core.retention import schedule_retention
 from ..core.session import Session
 from .utils import run_async
 
@@ -405,6 +406,8 @@ async def _process_single_component(
             session.add_message("assistant", response)
 
         await ai_adapter.destroy_session(adapter_session)
+        session.mark_finished()
+        schedule_retention(protect=session.session_dir.name)
 
         # Write output with header/footer injection
         output_path = None
@@ -0,0 +1,305 @@
+"""
+Supervisor for RUN-ASYNC background processes.
+
+RUN-ASYNC used to start a Popen with piped stdout/stderr that nothing ever
+read: a chatty dev server filled the pipe buffer (64KB on Linux), blocked
+on its next write and stalled. Processes were also never stopped, so they
+outlived the workflow.
+
+ProcessSupervisor starts background commands with asyncio and drains both
+streams continuously into bounded OutputBuffers (spilled to run.log_dir
+when configured, like RUN output). It also answers readiness probes, so
+workflows can wait for a server instead of sleeping a fixed time:
+
+    RUN-ASYNC npm run dev
+    RUN-WAIT port:5173                 # until a TCP connect succeeds
+    RUN-WAIT output:ready in \\d+ms     # until the output matches the regex
+                                       # (^ and $ match at line boundaries)
+
+Probes give up after RUN-TIMEOUT seconds, or as soon as the process exits.
+stop_all() terminates every process group (SIGTERM, then SIGKILL), and an
+atexit hook does the same for anything still running if the interpreter
+exits first.
+"""
+
+import asyncio
+import atexit
+import logging
+import os
+import re
+import shlex
+import signal
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import BinaryIO, Optional
+
+from .run_engine import (
+    TERMINATE_GRACE,
+    OutputBuffer,
+    _drain,
+    _StreamReader,
+    open_capture,
+    terminate_process,
+)
+
+logger = logging.getLogger("sdqctl.commands.async_supervisor")
+
+PROBE_WINDOW = 64 * 1024  # Recent output (chars) searched by output probes
+PROBE_INTERVAL = 0.1  # Seconds between port connection attempts
+
+
+@dataclass
+class ReadinessProbe:
+    """What RUN-WAIT waits for: a listening TCP port or an output pattern."""
+
+    kind: str  # "port" or "output"
+    port: int = 0
+    host: str = "127.0.0.1"
+    pattern: Optional[re.Pattern] = None
+
+    def describe(self) -> str:
+        if self.kind == "port":
+            return f"port {self.host}:{self.port}"
+        return f"output /{self.pattern.pattern}/"
+
+
+def parse_probe(spec: str) -> Optional[ReadinessProbe]:
+    """Parse a RUN-WAIT probe ("port:8000", "port:host:8000", "output:<regex>").
+
+    Returns:
+        The probe, or None if spec is not a probe (e.g. a duration like "5s")
+
+    Raises:
+        ValueError: If a port or output probe is malformed
+    """
+    kind, sep, arg = spec.strip().partition(":")
+    kind = kind.lower()
+    if not sep or kind not in ("port", "output"):
+        return None
+    if kind == "output":
+        try:
+            return ReadinessProbe("output", pattern=re.compile(arg.strip(), re.MULTILINE))
+        except re.error as e:
+            raise ValueError(f"Invalid RUN-WAIT output pattern {arg!r}: {e}") from e
+    host, _, port = arg.strip().rpartition(":")
+    if not port.isdigit():
+        raise ValueError(f"Invalid RUN-WAIT port: {arg!r} (expected port:8000)")
+    return ReadinessProbe("port", port=int(port), host=host or "127.0.0.1")
+
+
+@dataclass
+class BackgroundProcess:
+    """A RUN-ASYNC command and its drained output."""
+
+    command: str
+    cwd: Path
+    proc: asyncio.subprocess.Process
+    buffers: dict[str, OutputBuffer]
+    log_files: dict[str, Path] = field(default_factory=dict)
+    started: float = field(default_factory=time.perf_counter)
+    recent: str = ""  # Last PROBE_WINDOW chars of stdout and stderr, interleaved
+    _output_event: asyncio.Event = field(default_factory=asyncio.Event)
+    _readers: list[asyncio.Task] = field(default_factory=list)
+    _spills: list[BinaryIO] = field(default_factory=list)
+
+    @property
+    def pid(self) -> int:
+        return self.proc.pid
+
+    @property
+    def returncode(self) -> Optional[int]:
+        return self.proc.returncode
+
+    @property
+    def running(self) -> bool:
+        return self.proc.returncode is None
+
+    def output(self, stream: str = "stdout") -> str:
+        """Captured output of one stream (head and tail when capped)."""
+        return self.buffers[stream].text(self.log_files.get(stream))
+
+    def _on_output(self, stream: str, text: str) -> None:
+        self.recent = (self.recent + text)[-PROBE_WINDOW:]
+        self._output_event.set()
+
+    def _close(self) -> None:
+        for task in self._readers:
+            if not task.done():
+                task.cancel()
+        for spill in self._spills:
+            spill.close()
+        self._spills = []
+
+
+class ProcessSupervisor:
+    """Starts, probes and stops the RUN-ASYNC processes of a workflow."""
+
+    def __init__(self):
+        self.processes: list[BackgroundProcess] = []
+        self._atexit_registered = False
+
+    async def start(
+        self,
+        command: str,
+        *,
+        allow_shell: bool,
+        cwd: Path,
+        env: Optional[dict[str, str]] = None,
+        capture_limit: Optional[int] = None,
+        log_dir: Optional[Path] = None,
+    ) -> BackgroundProcess:
+        """Start command in the background and begin draining its output.
+
+        Raises:
+            OSError: If the command cannot be started (e.g. not found)
+        """
+        run_env = None
+        if env:
+            run_env = os.environ.copy()
+            run_env.update(env)
+        kwargs = dict(
+            cwd=cwd,
+            env=run_env,
+            stdin=asyncio.subprocess.DEVNULL,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            start_new_session=os.name == "posix",
+        )
+        if allow_shell:
+            proc = await asyncio.create_subprocess_shell(command, **kwargs)
+        else:
+            proc = await asyncio.create_subprocess_exec(*shlex.split(command), **kwargs)
+
+        stem = f"async-{time.strftime('%Y%m%d-%H%M%S')}-{proc.pid}"
+        buffers, log_files, spills = open_capture(stem, capture_limit, log_dir)
+        bg = BackgroundProcess(command, Path(cwd), proc, buffers, log_files, _spills=spills)
+        bg._readers = [
+            asyncio.ensure_future(_drain(pipe, _StreamReader(name, buffers[name], bg._on_output)))
+            for name, pipe in (("stdout", proc.stdout), ("stderr", proc.stderr))
+        ]
+        self.processes.append(bg)
+        if not self._atexit_registered:
+            atexit.register(self._kill_remaining)
+            self._atexit_registered = True
+        logger.info(f"RUN-ASYNC started (PID {proc.pid}): {command}")
+        return bg
+
+    def find_running(self, command: str, cwd: Path) -> Optional[BackgroundProcess]:
+        """A still-running process started with the same command and cwd."""
+        for bg in reversed(self.processes):
+            if bg.running and bg.command == command and bg.cwd == Path(cwd):
+                return bg
+        return None
+
+    @property
+    def latest(self) -> Optional[BackgroundProcess]:
+        return self.processes[-1] if self.processes else None
+
+    async def wait_ready(
+        self,
+        probe: ReadinessProbe,
+        timeout: Optional[float],
+        process: Optional[BackgroundProcess] = None,
+    ) -> tuple[bool, str]:
+        """Wait until probe succeeds.
+
+        Args:
+            probe: Port or output probe
+            timeout: Seconds to wait (None = no limit)
+            process: Process to watch (default: the most recently started);
+                the wait fails early if it exits
+
+        Returns:
+            (ready, detail) - detail explains a failure
+        """
+        process = process or self.latest
+        deadline = time.perf_counter() + timeout if timeout else None
+        if probe.kind == "output" and process is None:
+            return False, "no RUN-ASYNC process to watch"
+
+        while True:
+            if probe.kind == "port":
+                if await _port_open(probe.host, probe.port):
+                    return True, ""
+            else:
+                process._output_event.clear()
+                if probe.pattern.search(process.recent):
+                    return True, ""
+
+            if process is not None and not process.running:
+                # Give drained output a last chance to match
+                await asyncio.wait(process._readers, timeout=0.5)
+                if probe.kind == "output" and probe.pattern.search(process.recent):
+                    return True, ""
+                return False, f"process exited with code {process.returncode}"
+            remaining = None if deadline is None else deadline - time.perf_counter()
+            if remaining is not None and remaining <= 0:
+                return False, f"not ready after {timeout}s"
+
+            # Output probes wake on new output; the pause bounds exit detection
+            pause = PROBE_INTERVAL if probe.kind == "port" else 5 * PROBE_INTERVAL
+            if remaining is not None:
+                pause = min(pause, remaining)
+            if probe.kind == "output":
+                try:
+                    await asyncio.wait_for(process._output_event.wait(), pause)
+                except asyncio.TimeoutError:
+                    pass
+            else:
+                await asyncio.sleep(pause)
+
+    async def stop_all(self, grace: float = TERMINATE_GRACE) -> None:
+        """Terminate every background process group and release its pipes."""
+        running = [bg for bg in self.processes if bg.running]
+        if running:
+            await asyncio.gather(*(terminate_process(bg.proc, grace) for bg in running))
+            logger.info(f"Stopped {len(running)} RUN-ASYNC process(es)")
+        for bg in self.processes:
+            if bg._readers:
+                await asyncio.wait(bg._readers, timeout=grace)
+            bg._close()
+
+    def _kill_remaining(self) -> None:
+        """atexit fallback: SIGTERM process groups still running (no event loop needed)."""
+        for bg in self.processes:
+            if bg.proc.returncode is not None:
+                continue
+            try:
+                if os.name == "posix":
+                    os.killpg(bg.proc.pid, signal.SIGTERM)
+                else:
+                    os.kill(bg.proc.pid, signal.SIGTERM)
+            except (ProcessLookupError, PermissionError, OSError):
+                pass
+
+
+async def _port_open(host: str, port: int) -> bool:
+    try:
+        _, writer = await asyncio.wait_for(asyncio.open_connection(host, port), 1.0)
+    except (OSError, asyncio.TimeoutError):
+        return False
+    writer.close()
+    try:
+        await writer.wait_closed()
+    except OSError:
+        pass
+    return True
+
+
+# Global shared supervisor (for callers that don't own one)
+_supervisor: Optional[ProcessSupervisor] = None
+
+
+def get_process_supervisor() -> ProcessSupervisor:
+    """Get the process-wide RUN-ASYNC supervisor."""
+    global _supervisor
+    if _supervisor is None:
+        _supervisor = ProcessSupervisor()
+    return _supervisor
+
+
+def clear_process_supervisor() -> None:
+    """Forget the process-wide supervisor (useful for testing)."""
+    global _supervisor
+    _supervisor = None
@@ -5,13 +5,12 @@ Handles execution of steps within conditional blocks during conversation runs.
 """
 
 import logging
-import shlex
-import subprocess
 from pathlib import Path
 
 from rich.markdown import Markdown
 from rich.panel import Panel
 
+from .run_engine import dropped_note, run_command
 from .utils import truncate_output
 
 logger = logging.getLogger("sdqctl.commands.blocks")
@@ -69,14 +68,16 @@ async def execute_block_steps(
 
             try:
                 run_dir = Path(conv.cwd) if conv.cwd else Path.cwd()
-                result = subprocess.run(
-                    command if conv.allow_shell else shlex.split(command),
-                    shell=conv.allow_shell,
-                    capture_output=True,
-                    text=True,
+                result = await run_command(
+                    command,
+                    allow_shell=conv.allow_shell,
                     timeout=conv.run_timeout,
                     cwd=run_dir,
                 )
+                if result.timed_out:
+                    logger.error("    ✗ Block RUN timed out")
+                    progress_fn(f"    ✗ Timeout after {conv.run_timeout}s")
+                    continue
 
                 if result.returncode == 0:
                     logger.info("    ✓ Block RUN succeeded")
@@ -91,12 +92,11 @@ async def execute_block_steps(
                     if result.stderr:
                         output_text += f"\n[stderr]\n{result.stderr}"
                     output_text = truncate_output(output_text, conv.run_output_limit)
+                    if note := dropped_note(result):
+                        output_text += f"\n{note}"
                     run_msg = f"[Block RUN output]\n```\n$ {command}\n{output_text}\n```"
                     session.add_message("system", run_msg)
 
-            except subprocess.TimeoutExpired:
-                logger.error("    ✗ Block RUN timed out")
-                progress_fn(f"    ✗ Timeout after {conv.run_timeout}s")
             except Exception as e:
                 logger.error(f"    ✗ Block RUN error: {e}")
                 progress_fn(f"    ✗ Error: {e}")
@@ -65,6 +65,16 @@ def get_step_content(step) -> str:
     return step.content if hasattr(step, 'content') else step.get('content', '')
 
 
+def placeholder(kind: str, index: int, label: str) -> str:
+    """Build the {{TYPE:N:value}} placeholder for a merged producer.
+
+    CONSULT labels are cut to their first 50 characters.
+    """
+    if kind == "CONSULT":
+        label = label[:50]
+    return f"{{{{{kind}:{index}:{label}}}}}"
+
+
 def process_elided_steps(steps: list) -> list:
     """Process ELIDE directives by merging adjacent steps into single prompts.
 
@@ -94,38 +104,18 @@ def process_elided_steps(steps: list) -> list:
     groups = []
     current_group = []
 
-    for step in steps:
-        step_type = get_step_type(step)
-
-        if step_type == "elide":
-            # ELIDE marks that we should continue the current group
-            # If current_group is empty, start with previous group's last item
+    for i, step in enumerate(steps):
+        if get_step_type(step) == "elide":
+            # ELIDE marks that the next step continues the current group
             continue
+        # Merge with the current group when the step directly before this
+        # one is an ELIDE (consecutive ELIDEs act as one)
+        if current_group and i > 0 and get_step_type(steps[i - 1]) == "elide":
+            current_group.append(step)
         else:
-            # Check if this step should be merged with the previous group
-            # by looking back to see if the previous non-elide step was followed by ELIDE
-            should_merge = False
             if current_group:
-                # Look back in original steps to see if there was an ELIDE between
-                for i, s in enumerate(steps):
-                    if s is step:
-                        # Found current step, look backwards for ELIDE
-                        j = i - 1
-                        while j >= 0:
-                            if get_step_type(steps[j]) == "elide":
-                                should_merge = True
-                                break
-                            elif get_step_type(steps[j]) != "elide":
-                                break
-                            j -= 1
-                        break
-
-            if should_merge:
-                current_group.append(step)
-            else:
-                if current_group:
-                    groups.append(current_group)
-                current_group = [step]
+                groups.append(current_group)
+            current_group = [step]
 
     if current_group:
         groups.append(current_group)
@@ -143,6 +133,8 @@ def process_elided_steps(steps: list) -> list:
             # Combine prompts, context-generating steps become placeholders for later injection
             merged_contents = []
             merged_run_commands = []
+            merged_run_sequential = []
+            merged_run_cache_inputs = []
             merged_verify_commands = []
             merged_refcat_commands = []
             merged_lsp_commands = []
@@ -161,38 +153,54 @@ def process_elided_steps(steps: list) -> list:
                 elif step_type == "run":
                     # Store RUN command to be executed and output injected
                     merged_run_commands.append(content)
+                    merged_run_sequential.append(getattr(step, 'sequential', False))
+                    merged_run_cache_inputs.append(getattr(step, 'cache_inputs', None))
                     # Add placeholder that will be replaced with output
-                    merged_contents.append(f"{{{{RUN:{len(merged_run_commands) - 1}:{content}}}}}")
+                    merged_contents.append(
+                        placeholder("RUN", len(merged_run_commands) - 1, content)
+                    )
                 elif step_type == "verify":
                     # Store VERIFY command to be executed and output injected
                     verify_type = getattr(step, 'verify_type', 'all')
                     verify_options = getattr(step, 'verify_options', {})
                     merged_verify_commands.append((verify_type, verify_options))
                     # Add placeholder that will be replaced with output
-                    merged_contents.append(f"{{{{VERIFY:{len(merged_verify_commands) - 1}:{verify_type}}}}}")
+                    merged_contents.append(
+                        placeholder("VERIFY", len(merged_verify_commands) - 1, verify_type)
+                    )
                 elif step_type == "refcat":
                     # Store REFCAT reference to be resolved and content injected
                     merged_refcat_commands.append(content)
-                    merged_contents.append(f"{{{{REFCAT:{len(merged_refcat_commands) - 1}:{content}}}}}")
+                    merged_contents.append(
+                        placeholder("REFCAT", len(merged_refcat_commands) - 1, content)
+                    )
                 elif step_type == "lsp":
                     # Store LSP query to be executed and output injected
                     lsp_query = getattr(step, 'lsp_query', content)
                     lsp_options = getattr(step, 'lsp_options', {})
                     merged_lsp_commands.append((lsp_query, lsp_options))
-                    merged_contents.append(f"{{{{LSP:{len(merged_lsp_commands) - 1}:{lsp_query}}}}}")
+                    merged_contents.append(
+                        placeholder("LSP", len(merged_lsp_commands) - 1, lsp_query)
+                    )
                 elif step_type == "consult":
                     # Store CONSULT to be executed and output injected
                     merged_consult_commands.append(content)
-                    merged_contents.append(f"{{{{CONSULT:{len(merged_consult_commands) - 1}:{content[:50]}}}}}")
+                    merged_contents.append(
+                        placeholder("CONSULT", len(merged_consult_commands) - 1, content)
+                    )
                 elif step_type == "help_inline":
                     # Store HELP-INLINE topic(s) to be resolved and injected
                     merged_help_inline_commands.append(content)
-                    merged_contents.append(f"{{{{HELP:{len(merged_help_inline_commands) - 1}:{content}}}}}")
+                    merged_contents.append(
+                        placeholder("HELP", len(merged_help_inline_commands) - 1, content)
+                    )
                 elif step_type == "custom_directive":
                     # Store custom directive to be executed via plugin hook
                     directive_name = getattr(step, 'directive_name', 'CUSTOM')
                     merged_custom_directives.append((directive_name, content, step))
-                    merged_contents.append(f"{{{{CUSTOM:{len(merged_custom_directives) - 1}:{directive_name}}}}}")
+                    merged_contents.append(
+                        placeholder("CUSTOM", len(merged_custom_directives) - 1, directive_name)
+                    )
                 elif step_type in CONTROL_TYPES:
                     # Control steps break the merge - shouldn't happen in valid ELIDE usage
                     logger.warning(f"ELIDE cannot merge control step type '{step_type}'")
@@ -213,6 +221,8 @@ def process_elided_steps(steps: list) -> list:
                 )
                 # Attach commands for later execution
                 merged_step.run_commands = merged_run_commands  # type: ignore
+                merged_step.run_sequential = merged_run_sequential  # type: ignore
+                merged_step.run_cache_inputs = merged_run_cache_inputs  # type: ignore
                 merged_step.verify_commands = merged_verify_commands  # type: ignore
                 merged_step.refcat_commands = merged_refcat_commands  # type: ignore
                 merged_step.lsp_commands = merged_lsp_commands  # type: ignore
@@ -0,0 +1,367 @@
+"""
+ELIDE step execution - filling the placeholders of merged prompts.
+
+A merged_prompt step carries producers (RUN, VERIFY, REFCAT, LSP, CONSULT,
+custom directives) whose output replaces its {{TYPE:N:value}} placeholders.
+The producers are independent, so they run concurrently:
+
+- RUN commands run on the asyncio RUN engine (run_engine.py). A
+  RUN-SEQUENTIAL command starts after every earlier RUN of the step has
+  finished, and later RUNs wait for it, so build-then-test style
+  dependencies keep their order. RUNs marked with RUN-CACHE may replay a
+  stored result instead (run_cache.py). With RUN-SHELL persistent they
+  share one bash session and run one at a time (shell_worker.py).
+- VERIFY, REFCAT and LSP do filesystem and CPU work on worker threads.
+  VERIFY and REFCAT output prepared during the previous model turn
+  (prefetch.py) is used instead when its files are unchanged.
+- CONSULT requests share the adapter session and custom directives may have
+  side effects, so each of those runs one at a time, in declaration order.
+
+Placeholders are replaced in a single pass once every producer is done,
+so the prompt text is the same as with one-by-one execution. Placeholder
+text appearing inside a producer's output is left as is.
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Mapping, Optional
+
+from ..core.conversation import substitute_tokens
+from .run_cache import run_cached
+from .run_engine import dropped_note
+from .shell_worker import ShellWorker, shell_runner
+from .utils import truncate_output
+
+logger = logging.getLogger("sdqctl.commands.elide_steps")
+
+# Order in which placeholders are replaced (matches the merged step layout)
+PRODUCER_KINDS = ("RUN", "VERIFY", "REFCAT", "LSP", "HELP", "CONSULT", "CUSTOM")
+
+
+@dataclass
+class ProducerTiming:
+    """How long one placeholder producer took."""
+
+    kind: str  # RUN, VERIFY, REFCAT, LSP, CONSULT, CUSTOM
+    index: int  # Position among producers of the same kind
+    label: str  # Command, verifier type, ref, query or directive name
+    duration: float  # Seconds
+    success: bool = True
+    prefetched: bool = False  # Output prepared during the previous model turn
+
+
+def _verify_output(verify_type: str, verifiers: dict, verify_path: Path, limit) -> tuple[str, bool]:
+    """Run VERIFY verifier(s) and format the injected result."""
+    try:
+        if verify_type == "all":
+            verifier_names = list(verifiers.keys())
+        else:
+            verifier_names = [verify_type]
+
+        lines = [f"## VERIFY {verify_type}\n"]
+        all_passed = True
+        for name in verifier_names:
+            if name in verifiers:
+                result = verifiers[name]().verify(verify_path)
+                status = "✅" if result.passed else "❌"
+                lines.append(f"{status} {name}: {result.summary}")
+                if not result.passed:
+                    all_passed = False
+                    for err in result.errors[:5]:
+                        lines.append(f"  - {err.file}:{err.line}: {err.message}")
+                    if len(result.errors) > 5:
+                        lines.append(f"  - ... and {len(result.errors) - 5} more")
+
+        output = "\n".join(lines)
+        if limit:
+            output = truncate_output(output, limit)
+        return output, all_passed
+    except Exception as e:
+        return f"## VERIFY {verify_type}\n[Error: {e}]", False
+
+
+def _refcat_output(ref: str, cwd: Path) -> tuple[str, bool]:
+    """Resolve a REFCAT reference to its formatted excerpt."""
+    from ..core.refcat import extract_content, format_for_context, parse_ref
+
+    try:
+        content_result = extract_content(parse_ref(ref), cwd=cwd)
+        return format_for_context(content_result), True
+    except Exception as e:
+        return f"## REFCAT {ref}\n[Error: {e}]", False
+
+
+def _lsp_output(lsp_query: str, cwd: Path) -> tuple[str, bool]:
+    """Run an LSP query and format the injected result."""
+    from .lsp_steps import lookup_type, parse_lsp_args
+
+    try:
+        args = parse_lsp_args(lsp_query)
+        if args.get("error"):
+            return f"## LSP\n[Error: {args['error']}]", False
+        subcommand = args.get("subcommand", "type")
+        name = args.get("name", "")
+        project_path = cwd
+        if args.get("path") and args["path"] != ".":
+            project_path = cwd / args["path"]
+        if subcommand != "type":
+            return f"## LSP\n[Unknown subcommand: {subcommand}]", False
+        result = lookup_type(name, project_path, args.get("language"))
+        if "error" in result:
+            return f"## LSP type {name}\n[Error: {result['error']}]", False
+        return f"## LSP type {name}\n{result['type_definition'].to_markdown()}", True
+    except Exception as e:
+        return f"## LSP\n[Error: {e}]", False
+
+
+def _custom_output(
+    directive_name: str,
+    content: str,
+    orig_step: Any,
+    workspace: Path,
+    session_id: Optional[str],
+    cycle_number: int,
+) -> tuple[str, bool]:
+    """Execute a plugin directive; an empty string means "inject nothing"."""
+    from ..plugins import execute_custom_directive
+
+    try:
+        result = execute_custom_directive(
+            directive_name,
+            content,
+            workspace,
+            line_number=getattr(orig_step, 'line_number', 0),
+            session_id=session_id,
+            cycle_number=cycle_number,
+        )
+        # Respect inject_into_prompt - directive can choose to suppress output
+        if not result.inject_into_prompt:
+            return "", result.success
+        if result.success:
+            return f"## {directive_name}\n{result.output}", True
+        return f"## {directive_name}\n[Error: {'; '.join(result.errors)}]", False
+    except Exception as e:
+        return f"## {directive_name}\n[Error: {e}]", False
+
+
+def _load_verifiers(verify_path: Path) -> dict:
+    """Built-in verifiers plus plugin verifiers from the workflow's workspace."""
+    from ..plugins import load_plugin_verifiers
+    from ..verifiers import VERIFIERS
+
+    verifiers = dict(VERIFIERS)
+    for name, pv in load_plugin_verifiers(verify_path).items():
+        verifiers[name] = lambda pv=pv: pv
+    return verifiers
+
+
+async def execute_merged_producers(
+    step: Any,
+    prompt: str,
+    placeholders: Mapping[str, tuple[str, ...]],
+    resolved: Mapping[str, str],
+    conv: Any,
+    *,
+    consult: Optional[Callable[[str], Awaitable[str]]] = None,
+    progress: Any = None,
+    session_id: Optional[str] = None,
+    cycle_number: int = 1,
+    should_stop: Optional[Callable[[], bool]] = None,
+    shell: Optional[ShellWorker] = None,
+    prefetched: Optional[Mapping[str, tuple[str, bool]]] = None,
+) -> tuple[str, list[ProducerTiming]]:
+    """Run the producers of a merged_prompt step and fill its placeholders.
+
+    Args:
+        step: merged_prompt step (see process_elided_steps)
+        prompt: Merged prompt text containing the placeholders
+        placeholders: Producer kind -> placeholder strings (StepPlan)
+        resolved: Placeholder -> text known before execution (HELP-INLINE)
+        conv: ConversationFile with RUN/VERIFY settings
+        consult: Sends a CONSULT request and returns the response
+        progress: WorkflowProgress for RUN progress lines
+        session_id: Session ID passed to custom directives
+        cycle_number: 1-based cycle passed to custom directives
+        should_stop: Polled during RUN commands; True terminates them
+        shell: Persistent shell for RUN commands (RUN-SHELL persistent)
+        prefetched: Placeholder -> (output, success) of VERIFY and REFCAT
+            producers prepared in advance (prefetch.py); these are not run
+
+    Returns:
+        (prompt with placeholders replaced, per-producer timings)
+    """
+    outputs: dict[str, str] = dict(resolved)
+    timings: list[ProducerTiming] = []
+
+    async def timed(kind: str, index: int, label: str, placeholder: str, produce) -> None:
+        start = time.perf_counter()
+        output, success = await produce()
+        outputs[placeholder] = output
+        timings.append(ProducerTiming(kind, index, label, time.perf_counter() - start, success))
+
+    def in_thread(fn, *args):
+        return lambda: asyncio.to_thread(fn, *args)
+
+    prefetched = prefetched or {}
+
+    def take_prefetched(kind: str, index: int, label: str, placeholder: str) -> bool:
+        if placeholder not in prefetched:
+            return False
+        output, success = prefetched[placeholder]
+        outputs[placeholder] = output
+        timings.append(ProducerTiming(kind, index, label, 0.0, success, prefetched=True))
+        return True
+
+    # RUN: parallel subprocesses, with RUN-SEQUENTIAL commands as barriers
+    run_commands = getattr(step, 'run_commands', [])
+    run_sequential = getattr(step, 'run_sequential', [False] * len(run_commands))
+    run_cache_inputs = getattr(step, 'run_cache_inputs', [None] * len(run_commands))
+    run_cwd = Path(conv.run_cwd or conv.cwd or ".").resolve()
+    total_runs = len(run_commands)
+    runner = shell_runner(shell)
+
+    async def run_one(cmd_idx: int, cmd: str) -> tuple[str, bool]:
+        if progress:
+            progress.run_executing(cmd, cmd_idx, total_runs)
+        start = time.perf_counter()
+        cache_inputs = run_cache_inputs[cmd_idx]
+        cached = None
+        try:
+            def run():
+                return runner(
+                    cmd,
+                    allow_shell=conv.allow_shell,
+                    timeout=conv.run_timeout,
+                    cwd=run_cwd,
+                    env=conv.run_env or None,
+                    should_stop=should_stop,
+                )
+
+            if cache_inputs is None:
+                result = await run()
+            else:
+                result, cached = await run_cached(
+                    cmd, cache_inputs, run, cwd=run_cwd, env=conv.run_env,
+                    allow_shell=conv.allow_shell,
+                )
+            output = result.stdout or ""
+            success = result.returncode == 0
+            if not success and result.stderr:
+                output = f"{output}\n[stderr]\n{result.stderr}"
+            if result.timed_out:
+                output = f"{output}\n[Timed out after {conv.run_timeout}s]"
+            elif result.stopped:
+                output = f"{output}\n[Stopped: stop file detected]"
+            output = truncate_output(output, limit=conv.run_output_limit or 50000)
+            if note := dropped_note(result):
+                output = f"{output}\n{note}"
+            text = f"+ {cmd}\n{output}"
+        except Exception as e:
+            success = False
+            text = f"+ {cmd}\n[Error: {e}]"
+        if progress:
+            progress.run_complete(
+                cmd_idx, total_runs, success, time.perf_counter() - start, cached=cached
+            )
+        return text, success
+
+    async def run_all() -> None:
+        batch: list[asyncio.Task] = []
+        run_placeholders = placeholders.get("RUN", ())
+        for cmd_idx, (cmd, placeholder) in enumerate(zip(run_commands, run_placeholders)):
+            producer = timed(
+                "RUN", cmd_idx, cmd, placeholder, lambda i=cmd_idx, c=cmd: run_one(i, c)
+            )
+            if run_sequential[cmd_idx]:
+                await asyncio.gather(*batch)
+                batch = []
+                await producer
+            else:
+                batch.append(asyncio.ensure_future(producer))
+        await asyncio.gather(*batch)
+
+    tasks: list[Awaitable] = [run_all()]
+
+    # VERIFY, REFCAT, LSP: worker threads
+    verify_commands = [
+        (idx, verify_type, placeholder)
+        for idx, ((verify_type, _), placeholder) in enumerate(
+            zip(getattr(step, 'verify_commands', []), placeholders.get("VERIFY", ()))
+        )
+        if not take_prefetched("VERIFY", idx, verify_type, placeholder)
+    ]
+    if verify_commands:
+        verify_path = conv.source_path.parent if conv.source_path else Path.cwd()
+        verifiers = await asyncio.to_thread(_load_verifiers, verify_path)
+        for idx, verify_type, placeholder in verify_commands:
+            tasks.append(timed("VERIFY", idx, verify_type, placeholder, in_thread(
+                _verify_output, verify_type, verifiers, verify_path, conv.verify_limit
+            )))
+
+    cwd = Path(conv.cwd or ".").resolve()
+    for idx, (ref, placeholder) in enumerate(
+        zip(getattr(step, 'refcat_commands', []), placeholders.get("REFCAT", ()))
+    ):
+        if take_prefetched("REFCAT", idx, ref, placeholder):
+            continue
+        tasks.append(timed("REFCAT", idx, ref, placeholder, in_thread(_refcat_output, ref, cwd)))
+
+    for idx, ((lsp_query, _), placeholder) in enumerate(
+        zip(getattr(step, 'lsp_commands', []), placeholders.get("LSP", ()))
+    ):
+        tasks.append(timed(
+            "LSP", idx, lsp_query, placeholder, in_thread(_lsp_output, lsp_query, cwd)
+        ))
+
+    # CONSULT and custom directives: one at a time, in order
+    consult_commands = getattr(step, 'consult_commands', [])
+
+    async def consult_all() -> None:
+        for idx, (consult_prompt, placeholder) in enumerate(
+            zip(consult_commands, placeholders.get("CONSULT", ()))
+        ):
+            async def ask(consult_prompt=consult_prompt) -> tuple[str, bool]:
+                if consult is None:
+                    return "## CONSULT\n[Error: no adapter session]", False
+                try:
+                    return f"## CONSULT\n{await consult(consult_prompt)}", True
+                except Exception as e:
+                    return f"## CONSULT\n[Error: {e}]", False
+
+            await timed("CONSULT", idx, consult_prompt[:50], placeholder, ask)
+
+    workspace = conv.source_path.parent if conv.source_path else Path.cwd()
+    custom_directives = getattr(step, 'custom_directives', [])
+
+    async def custom_all() -> None:
+        for idx, ((name, content, orig_step), placeholder) in enumerate(
+            zip(custom_directives, placeholders.get("CUSTOM", ()))
+        ):
+            await timed("CUSTOM", idx, name, placeholder, in_thread(
+                _custom_output, name, content, orig_step, workspace, session_id, cycle_number
+            ))
+
+    if consult_commands:
+        tasks.append(consult_all())
+    if custom_directives:
+        tasks.append(custom_all())
+
+    await asyncio.gather(*tasks)
+
+    # One scan of the prompt: outputs can be large and are not searched again
+    prompt = substitute_tokens(prompt, {
+        placeholder: outputs[placeholder]
+        for kind in PRODUCER_KINDS
+        for placeholder in placeholders.get(kind, ())
+        if placeholder in outputs
+    })
+
+    order = {kind: i for i, kind in enumerate(PRODUCER_KINDS)}
+    timings.sort(key=lambda t: (order[t.kind], t.index))
+    for t in timings:
+        when = "prefetched" if t.prefetched else f"{t.duration:.2f}s"
+        logger.debug(f"ELIDE producer {t.kind} {t.index + 1} ({t.label}): {when}")
+    return prompt, timings
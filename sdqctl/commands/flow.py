@@ -18,6 +18,7 @@ from ..adapters import get_adapter
 from ..adapters.base import AdapterConfig
 from ..core.conversation import ConversationFile
 from ..core.logging import get_logger
+from ..core.retention import schedule_retention
 from ..core.session import Session
 from .utils import run_async
 
@@ -188,6 +189,8 @@ async def _flow_async(
                     responses.append(response)
 
                 await ai_adapter.destroy_session(adapter_session)
+                session.mark_finished()
+                schedule_retention(protect=session.session_dir.name)
 
                 # Write output with header/footer injection
                 if output_dir:
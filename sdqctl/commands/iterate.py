@@ -19,6 +19,10 @@ Session Modes:
     fresh       Start new adapter session each cycle. CONTEXT files are
                 reloaded from disk, picking up any changes. Best for
                 autonomous workflows that modify files between cycles.
+
+    diff        Like accumulate, but CONTEXT files are reloaded each cycle
+                and only unified diffs of changed files are injected. Sees
+                file changes at a fraction of fresh mode's prompt size.
 """
 
 from datetime import datetime, timezone
@@ -32,6 +36,7 @@ from rich.progress import Progress, SpinnerColumn, TextColumn
 
 from ..adapters import get_adapter
 from ..adapters.base import AdapterConfig
+from ..core.checkpoint_writer import flush_checkpoints
 from ..core.conversation import ConversationFile
 from ..core.exceptions import LoopDetected, MissingContextFiles
 from ..core.logging import WorkflowContext, get_logger, set_workflow_context
@@ -39,6 +44,7 @@ from ..core.loop_detector import LoopDetector, generate_nonce
 from ..core.metrics import emit_metrics
 from ..core.progress import WorkflowProgress, agent_response
 from ..core.progress import progress as progress_print
+from ..core.retention import schedule_retention
 from ..core.session import Session
 from ..utils.output import PromptWriter
 from .compact_steps import execute_checkpoint_step, execute_compact_step
@@ -46,7 +52,6 @@ from .iterate_helpers import (
     SESSION_MODES,  # noqa: F401 - re-exported
     TURN_SEPARATOR,  # noqa: F401 - re-exported
     TurnGroup,  # noqa: F401 - re-exported
-    _merge_help_inline_steps,
     build_infinite_session_config,
     check_existing_stop_file,
     create_or_resume_session,
@@ -74,7 +79,12 @@ from .prompt_steps import (
 from .utils import run_async
 from .verify_steps import execute_verify_coverage_step, execute_verify_trace_step
 from .lsp_steps import execute_lsp_step
-from .elide import process_elided_steps
+from .step_plan import compile_step_plan
+from .elide_steps import execute_merged_producers
+from .async_supervisor import ProcessSupervisor
+from .prefetch import create_prefetcher
+from .run_steps import execute_run_async_step, execute_run_wait_step
+from .shell_worker import create_shell_worker
 
 logger = get_logger(__name__)
 console = Console()
@@ -89,9 +99,11 @@ console = Console()
 @click.option("--file", "-f", "explicit_files", multiple=True, type=click.Path(),
               help="Explicit workflow file (disambiguates from prompts)")
 @click.option("--max-cycles", "-n", type=int, default=None, help="Override max cycles")
-@click.option("--session-mode", "-s", type=click.Choice(["accumulate", "compact", "fresh"]),
+@click.option("--session-mode", "-s",
+              type=click.Choice(["accumulate", "compact", "fresh", "diff"]),
               default="accumulate",
-              help="accumulate (grow), compact (summarize), fresh (new each cycle)")
+              help="accumulate (grow), compact (summarize), fresh (new each cycle), "
+                   "diff (inject CONTEXT changes)")
 @click.option("--adapter", "-a", default=None, help="AI adapter override")
 @click.option("--model", "-m", default=None, help="Model override")
 @click.option("--context", "-c", multiple=True, help="Additional context files")
@@ -461,6 +473,9 @@ async def _cycle_async(
 
     - fresh: Create new adapter session each cycle. Reloads CONTEXT files
       from disk, so file changes made during cycle N are visible in N+1.
+
+    - diff: Keep the session like accumulate, but reload CONTEXT files each
+      cycle and inject unified diffs of the files that changed.
     """
     # Initialize prompt writer for stderr output
     prompt_writer = PromptWriter(enabled=show_prompt)
@@ -640,19 +655,26 @@ async def _cycle_async(
             verbosity, console, logger
         )
         session.sdk_session_id = adapter_session.sdk_session_id  # Q-018 fix
+        shell = create_shell_worker(conv)  # RUN-SHELL persistent: one bash for all RUNs
+        supervisor = ProcessSupervisor()  # RUN-ASYNC processes, stopped when the run ends
+        prefetcher = create_prefetcher()  # Next step's inputs, prepared during model turns
 
         try:
             session.state.status = "running"
             session.state.started_at = datetime.now(timezone.utc)
             all_responses = []
 
+            # Compile steps once: HELP-INLINE and ELIDE merging do not vary by cycle
+            plan = compile_step_plan(conv)
+            total_prompts = plan.total_prompts
+
             # Set workflow context for enhanced logging
             workflow_name = conv.source_path.stem if conv.source_path else "workflow"
             workflow_ctx = WorkflowContext(
                 workflow_name=workflow_name,
                 workflow_path=str(conv.source_path) if conv.source_path else None,
                 total_cycles=conv.max_cycles,
-                total_prompts=len(conv.prompts),
+                total_prompts=total_prompts,  # Prompt turns after ELIDE merging
             )
             set_workflow_context(workflow_ctx)
 
@@ -660,7 +682,7 @@ async def _cycle_async(
             workflow_progress = WorkflowProgress(
                 name=str(conv.source_path or workflow_path),
                 total_cycles=conv.max_cycles,
-                total_prompts=len(conv.prompts),
+                total_prompts=total_prompts,
                 verbosity=verbosity,
             )
 
@@ -731,7 +753,7 @@ async def _cycle_async(
                     # Use effective_min which defaults to 30% if not set
                     effective_min = compaction_min if compaction_min is not None else 30
                     needs_compact = session.needs_compaction(effective_min)
-                    if session_mode == "accumulate" and needs_compact:
+                    if session_mode in ("accumulate", "diff") and needs_compact:
                         new_session = await perform_compaction(
                             ai_adapter, adapter_session, conv, session,
                             "context near limit", console, progress_print,
@@ -749,13 +771,17 @@ async def _cycle_async(
 
                     # Run all steps in this cycle (prompts, compact, etc.)
                     # For fresh mode: re-inject context on each cycle (like cycle 0)
-                    if session_mode == "fresh":
-                        context_content = session.context.get_context_content()
-                    else:
-                        context_content = (
-                            session.context.get_context_content()
-                            if cycle_num == 0 else ""
-                        )
+                    # For diff mode: reload and inject only what changed
+                    # Full CONTEXT is streamed into the first prompt's single join
+                    context_content = ""
+                    context_stream = None
+                    if session_mode == "diff" and cycle_num > 0:
+                        session.reload_context()
+                        context_content = session.context.get_context_diff()
+                    elif session_mode == "fresh" or cycle_num == 0:
+                        context_stream = session.context.iter_context_content
+                        if session_mode == "diff":
+                            session.context.mark_injected()
 
                     # Prepend cycle-specific prologues (--introduction, --until)
                     if cycle_prologues:
@@ -765,34 +791,8 @@ async def _cycle_async(
                         else:
                             context_content = cycle_prologue_text
 
-                    # Use steps if available, fallback to prompts for backward compat
-                    steps_to_process = conv.steps if conv.steps else [
-                        {"type": "prompt", "content": p} for p in conv.prompts
-                    ]
-
-                    # Preprocess: merge help_inline steps with following prompts
-                    steps_to_process = _merge_help_inline_steps(
-                        steps_to_process, conv
-                    )
-
-                    # Process ELIDE directives - merge adjacent steps into single prompts
-                    steps_to_process = process_elided_steps(steps_to_process)
-
-                    # Count actual prompt turns after ELIDE merging (not raw conv.prompts)
-                    total_prompts = sum(
-                        1 for s in steps_to_process
-                        if (s.type if hasattr(s, 'type') else s.get('type', ''))
-                        in ("prompt", "merged_prompt")
-                    )
-
-                    # Update workflow progress with accurate count (after ELIDE)
-                    # This fixes the display to show correct "Prompt X/Y"
-                    if cycle_num == 0:
-                        workflow_progress.total_prompts = total_prompts
-                        workflow_ctx.total_prompts = total_prompts
-
                     prompt_idx = 0
-                    for step in steps_to_process:
+                    for step_pos, step in enumerate(plan.steps):
                         step_type = (
                             step.type if hasattr(step, 'type')
                             else step.get('type')
@@ -819,6 +819,7 @@ async def _cycle_async(
                                 max_cycles=conv.max_cycles,
                                 session_mode=session_mode,
                                 context_content=context_content,
+                                context_stream=context_stream,
                                 template_vars=cycle_vars,
                                 no_stop_file_prologue=no_stop_file_prologue,
                                 verbosity=verbosity,
@@ -842,6 +843,14 @@ async def _cycle_async(
                             def collect_reasoning(reasoning: str) -> None:
                                 last_reasoning.append(reasoning)
 
+                            # Prepare the following step's inputs while the model works
+                            if prefetcher is not None:
+                                prefetcher.prefetch_next(
+                                    plan, step_pos, conv, session,
+                                    more_cycles=cycle_num + 1 < conv.max_cycles,
+                                    reload_context=session_mode in ("fresh", "diff"),
+                                )
+
                             response = await ai_adapter.send(
                                 adapter_session,
                                 full_prompt,
@@ -886,11 +895,11 @@ async def _cycle_async(
                                 raise loop_check.loop_result
 
                             session.add_message("user", prompt)
-                            session.add_message("assistant", response)
+                            reply = session.add_message("assistant", response)
                             all_responses.append({
                                 "cycle": cycle_num + 1,
                                 "prompt": prompt_idx + 1,
-                                "response": response
+                                "response": reply.content,  # Shared with the message store
                             })
                             prompt_idx += 1
 
@@ -898,191 +907,34 @@ async def _cycle_async(
                             # Handle ELIDE-merged steps: execute context-generating directives and inject output
                             prompt = step_content
                             step_line = getattr(step, 'line_number', 0)
-                            run_commands = getattr(step, 'run_commands', [])
-                            verify_commands = getattr(step, 'verify_commands', [])
-                            refcat_commands = getattr(step, 'refcat_commands', [])
-                            lsp_commands = getattr(step, 'lsp_commands', [])
-                            consult_commands = getattr(step, 'consult_commands', [])
-                            help_inline_commands = getattr(step, 'help_inline_commands', [])
-                            custom_directives = getattr(step, 'custom_directives', [])
-
-                            # Execute RUN commands and replace placeholders
-                            import time as _time
-                            from .utils import run_subprocess, truncate_output
-                            run_cwd = Path(conv.run_cwd or conv.cwd or ".").resolve()
-                            total_run_cmds = len(run_commands)
-                            for cmd_idx, cmd in enumerate(run_commands):
-                                placeholder = f"{{{{RUN:{cmd_idx}:{cmd}}}}}"
-                                # Show RUN progress
-                                workflow_progress.run_executing(cmd, cmd_idx, total_run_cmds)
-                                run_start = _time.time()
-                                try:
-                                    result = run_subprocess(
-                                        cmd,
-                                        allow_shell=conv.allow_shell,
-                                        timeout=conv.run_timeout,
-                                        cwd=run_cwd,
-                                        env=conv.run_env or None,
-                                    )
-                                    run_duration = _time.time() - run_start
-                                    output = result.stdout or ""
-                                    success = result.returncode == 0
-                                    if result.returncode != 0 and result.stderr:
-                                        output = f"{output}\n[stderr]\n{result.stderr}"
-                                    # Truncate output if needed
-                                    output = truncate_output(output, limit=conv.run_output_limit or 50000)
-                                    prompt = prompt.replace(placeholder, f"+ {cmd}\n{output}")
-                                    workflow_progress.run_complete(cmd_idx, total_run_cmds, success, run_duration)
-                                except Exception as e:
-                                    run_duration = _time.time() - run_start
-                                    prompt = prompt.replace(placeholder, f"+ {cmd}\n[Error: {e}]")
-                                    workflow_progress.run_complete(cmd_idx, total_run_cmds, False, run_duration)
-
-                            # Execute VERIFY commands and replace placeholders
-                            # Load verifiers including plugins from the workflow's workspace
-                            from ..verifiers import VERIFIERS
-                            from ..plugins import load_plugin_verifiers
-                            verify_path = conv.source_path.parent if conv.source_path else Path.cwd()
-                            # Load plugin verifiers from the workflow's workspace
-                            workspace_verifiers = dict(VERIFIERS)
-                            plugin_verifiers = load_plugin_verifiers(verify_path)
-                            for name, pv in plugin_verifiers.items():
-                                workspace_verifiers[name] = lambda pv=pv: pv
-                            
-                            for verify_idx, (verify_type, verify_options) in enumerate(verify_commands):
-                                placeholder = f"{{{{VERIFY:{verify_idx}:{verify_type}}}}}"
-                                try:
-                                    # Run verifier(s)
-                                    if verify_type == "all":
-                                        verifier_names = list(workspace_verifiers.keys())
-                                    else:
-                                        verifier_names = [verify_type]
-
-                                    verify_output_lines = [f"## VERIFY {verify_type}\n"]
-                                    all_passed = True
-                                    for name in verifier_names:
-                                        if name in workspace_verifiers:
-                                            verifier = workspace_verifiers[name]()
-                                            result = verifier.verify(verify_path)
-                                            status = "✅" if result.passed else "❌"
-                                            verify_output_lines.append(f"{status} {name}: {result.summary}")
-                                            if not result.passed:
-                                                all_passed = False
-                                                for err in result.errors[:5]:
-                                                    verify_output_lines.append(f"  - {err.file}:{err.line}: {err.message}")
-                                                if len(result.errors) > 5:
-                                                    verify_output_lines.append(f"  - ... and {len(result.errors) - 5} more")
-
-                                    verify_output = "\n".join(verify_output_lines)
-                                    if conv.verify_limit:
-                                        verify_output = truncate_output(verify_output, conv.verify_limit)
-                                    prompt = prompt.replace(placeholder, verify_output)
-                                except Exception as e:
-                                    prompt = prompt.replace(placeholder, f"## VERIFY {verify_type}\n[Error: {e}]")
-
-                            # Execute REFCAT commands and replace placeholders
-                            from ..core.refcat import extract_content, format_for_context, parse_ref
-                            refcat_cwd = Path(conv.cwd or ".").resolve()
-                            for refcat_idx, ref in enumerate(refcat_commands):
-                                placeholder = f"{{{{REFCAT:{refcat_idx}:{ref}}}}}"
-                                try:
-                                    parsed = parse_ref(ref)
-                                    content_result = extract_content(parsed, cwd=refcat_cwd)
-                                    refcat_output = format_for_context(content_result)
-                                    prompt = prompt.replace(placeholder, refcat_output)
-                                except Exception as e:
-                                    prompt = prompt.replace(placeholder, f"## REFCAT {ref}\n[Error: {e}]")
-
-                            # Execute LSP commands and replace placeholders
-                            from .lsp_steps import lookup_type, parse_lsp_args
-                            lsp_cwd = Path(conv.cwd or ".").resolve()
-                            for lsp_idx, (lsp_query, lsp_options) in enumerate(lsp_commands):
-                                placeholder = f"{{{{LSP:{lsp_idx}:{lsp_query}}}}}"
-                                try:
-                                    args = parse_lsp_args(lsp_query)
-                                    if args.get("error"):
-                                        prompt = prompt.replace(placeholder, f"## LSP\n[Error: {args['error']}]")
-                                        continue
-                                    subcommand = args.get("subcommand", "type")
-                                    name = args.get("name", "")
-                                    project_path = lsp_cwd
-                                    if args.get("path") and args["path"] != ".":
-                                        project_path = lsp_cwd / args["path"]
-                                    if subcommand == "type":
-                                        result = lookup_type(name, project_path, args.get("language"))
-                                        if "error" in result:
-                                            prompt = prompt.replace(placeholder, f"## LSP type {name}\n[Error: {result['error']}]")
-                                        else:
-                                            type_def = result["type_definition"]
-                                            lsp_output = f"## LSP type {name}\n{type_def.to_markdown()}"
-                                            prompt = prompt.replace(placeholder, lsp_output)
-                                    else:
-                                        prompt = prompt.replace(placeholder, f"## LSP\n[Unknown subcommand: {subcommand}]")
-                                except Exception as e:
-                                    prompt = prompt.replace(placeholder, f"## LSP\n[Error: {e}]")
-
-                            # Execute HELP-INLINE commands and replace placeholders
-                            from ..core.help_topics import TOPICS
-                            for help_idx, topic_list in enumerate(help_inline_commands):
-                                placeholder = f"{{{{HELP:{help_idx}:{topic_list}}}}}"
-                                try:
-                                    topics = topic_list.strip().split()
-                                    help_output_parts = []
-                                    for topic in topics:
-                                        if topic.lower() in TOPICS:
-                                            help_output_parts.append(f"## {topic.upper()}\n{TOPICS[topic.lower()]}")
-                                        else:
-                                            help_output_parts.append(f"## {topic.upper()}\n[Unknown help topic: {topic}]")
-                                    help_output = "\n\n".join(help_output_parts)
-                                    prompt = prompt.replace(placeholder, help_output)
-                                except Exception as e:
-                                    prompt = prompt.replace(placeholder, f"## HELP\n[Error: {e}]")
-
-                            # Execute CONSULT commands and replace placeholders
-                            # CONSULT is special - it runs an AI sub-conversation
-                            for consult_idx, consult_prompt in enumerate(consult_commands):
-                                # Find placeholder (only first 50 chars were stored)
-                                placeholder_prefix = f"{{{{CONSULT:{consult_idx}:"
-                                placeholder_end = prompt.find("}}}}", prompt.find(placeholder_prefix))
-                                if placeholder_end > 0:
-                                    placeholder = prompt[prompt.find(placeholder_prefix):placeholder_end + 4]
-                                    try:
-                                        # Run a sub-conversation with the consult prompt
-                                        consult_response = await ai_adapter.send(
-                                            adapter_session,
-                                            f"[CONSULT REQUEST]\n{consult_prompt}\n\n[Provide a focused response.]",
-                                        )
-                                        consult_output = f"## CONSULT\n{consult_response}"
-                                        prompt = prompt.replace(placeholder, consult_output)
-                                    except Exception as e:
-                                        prompt = prompt.replace(placeholder, f"## CONSULT\n[Error: {e}]")
-
-                            # Execute custom directives and replace placeholders
-                            from ..plugins import execute_custom_directive
-                            for custom_idx, (directive_name, directive_content, orig_step) in enumerate(custom_directives):
-                                placeholder = f"{{{{CUSTOM:{custom_idx}:{directive_name}}}}}"
-                                try:
-                                    workspace = conv.source_path.parent if conv.source_path else Path.cwd()
-                                    result = execute_custom_directive(
-                                        directive_name,
-                                        directive_content,
-                                        workspace,
-                                        line_number=getattr(orig_step, 'line_number', 0),
-                                        session_id=session.id if hasattr(session, 'id') else None,
-                                        cycle_number=cycle_num + 1,
-                                    )
-                                    # Respect inject_into_prompt - directive can choose to suppress output
-                                    if result.inject_into_prompt:
-                                        if result.success:
-                                            custom_output = f"## {directive_name}\n{result.output}"
-                                        else:
-                                            custom_output = f"## {directive_name}\n[Error: {'; '.join(result.errors)}]"
-                                        prompt = prompt.replace(placeholder, custom_output)
-                                    else:
-                                        # Directive chose not to inject - remove placeholder silently
-                                        prompt = prompt.replace(placeholder, "")
-                                except Exception as e:
-                                    prompt = prompt.replace(placeholder, f"## {directive_name}\n[Error: {e}]")
+
+                            # Run RUN/VERIFY/REFCAT/LSP/CONSULT/custom producers concurrently
+                            async def consult(consult_prompt: str) -> str:
+                                return await ai_adapter.send(
+                                    adapter_session,
+                                    f"[CONSULT REQUEST]\n{consult_prompt}\n\n[Provide a focused response.]",
+                                )
+
+                            producers_start = time.perf_counter()
+                            prefetched = None
+                            if prefetcher is not None:
+                                prefetched = await prefetcher.take_producers(
+                                    step_pos, plan.placeholders[step_pos]
+                                )
+                            prompt, producer_timings = await execute_merged_producers(
+                                step, prompt,
+                                plan.placeholders[step_pos], plan.resolved[step_pos], conv,
+                                consult=consult,
+                                progress=workflow_progress,
+                                session_id=session.id,
+                                cycle_number=cycle_num + 1,
+                                should_stop=loop_detector.stop_file_path.exists,
+                                shell=shell,
+                                prefetched=prefetched,
+                            )
+                            workflow_progress.producers_complete(
+                                producer_timings, time.perf_counter() - producers_start
+                            )
 
                             session.state.prompt_index = prompt_idx
                             workflow_ctx.prompt = prompt_idx + 1
@@ -1096,6 +948,7 @@ async def _cycle_async(
                                 max_cycles=conv.max_cycles,
                                 session_mode=session_mode,
                                 context_content=context_content,
+                                context_stream=context_stream,
                                 template_vars=cycle_vars,
                                 no_stop_file_prologue=no_stop_file_prologue,
                                 verbosity=verbosity,
@@ -1117,6 +970,14 @@ async def _cycle_async(
                             def collect_reasoning(reasoning: str) -> None:
                                 last_reasoning.append(reasoning)
 
+                            # Prepare the following step's inputs while the model works
+                            if prefetcher is not None:
+                                prefetcher.prefetch_next(
+                                    plan, step_pos, conv, session,
+                                    more_cycles=cycle_num + 1 < conv.max_cycles,
+                                    reload_context=session_mode in ("fresh", "diff"),
+                                )
+
                             response = await ai_adapter.send(
                                 adapter_session,
                                 full_prompt,
@@ -1138,11 +999,11 @@ async def _cycle_async(
                             # Process response
                             agent_response(response)
                             session.add_message("user", prompt)
-                            session.add_message("assistant", response)
+                            reply = session.add_message("assistant", response)
                             all_responses.append({
                                 "cycle": cycle_num + 1,
                                 "prompt": prompt_idx + 1,
-                                "response": response
+                                "response": reply.content,  # Shared with the message store
                             })
                             prompt_idx += 1
 
@@ -1163,6 +1024,19 @@ async def _cycle_async(
                                 if new_session is not None:
                                     adapter_session = new_session
 
+                        elif step_type == "run_async":
+                            await execute_run_async_step(
+                                step, conv, session, progress_print, supervisor=supervisor
+                            )
+
+                        elif step_type == "run_wait":
+                            ready = await execute_run_wait_step(
+                                step, progress_print,
+                                supervisor=supervisor, timeout=conv.run_timeout,
+                            )
+                            if not ready and conv.run_on_error == "stop":
+                                raise RuntimeError(f"RUN-WAIT {step_content}: not ready")
+
                         elif step_type == "checkpoint":
                             execute_checkpoint_step(
                                 step, session, cycle_num, console, progress_print
@@ -1230,8 +1104,22 @@ async def _cycle_async(
                     logger.info(f"Exported {event_count} events to {effective_event_log}")
                     progress_print(f"  📋 Exported {event_count} events to {effective_event_log}")
 
+            if shell is not None:
+                await shell.close()
+            await supervisor.stop_all()
+            if prefetcher is not None:
+                prefetcher.cancel_all()
+
+            # Checkpoints are written in the background; wait for them before exit
+            session.mark_finished()
+            try:
+                flush_checkpoints()
+            except OSError as e:
+                logger.error(f"Failed to write checkpoint: {e}")
+
             # Always destroy session (handles both success and error paths)
             await ai_adapter.destroy_session(adapter_session)
+            schedule_retention(protect=session.session_dir.name)
 
     except LoopDetected as e:
         handle_loop_error(e, session, workflow_path, json_errors, console)
@@ -204,6 +204,7 @@ SESSION_MODES = {
     "accumulate": "Context grows, compact only at limit",
     "compact": "Summarize after each cycle",
     "fresh": "New session each cycle, reload files",
+    "diff": "Context grows, inject diffs of changed files",
 }
 
 
@@ -0,0 +1,314 @@
+"""
+Speculative preparation of the next step's inputs during model turns.
+
+Most of a cycle's wall time is spent waiting for ai_adapter.send(). The
+inputs of the following steps are deterministic functions of the
+filesystem, so iterate starts preparing them on worker threads as each
+request goes out:
+
+- VERIFY and REFCAT output of the next ELIDE-merged step
+- CONTEXT files of the next cycle (fresh and diff modes reload them)
+- @file prologues and epilogues, which are re-read for every cycle
+
+A prefetched VERIFY or REFCAT output records the stat identity (StatKey:
+mtime, size, inode) of every file it may depend on, including candidate
+paths that did not exist. REFCAT depends on the referenced file; VERIFY on
+every file and directory under the workflow directory, outside
+DEFAULT_EXCLUDES. When the step runs, the output is used only if none of
+those identities changed, so edits made by the model during its turn
+discard the prefetch and the producer runs as usual. Outputs computed while
+a dependency was being modified (or within the racy window, see
+file_cache.py) are never kept.
+
+CONTEXT files and @file references are not stored here: they are read into
+the shared file content cache, which already revalidates entries on stat
+identity, so the next reload only re-reads files that changed.
+
+Prefetching is on by default; turn it off in .sdqctl.yaml with:
+
+    context:
+      prefetch: false
+"""
+
+import asyncio
+import fnmatch
+import logging
+import os
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Hashable, Mapping, Optional, Sequence
+
+from ..core.file_cache import RACY_WINDOW_NS, StatKey
+from ..verifiers.base import DEFAULT_EXCLUDES
+from .elide_steps import _load_verifiers, _refcat_output, _verify_output
+
+logger = logging.getLogger("sdqctl.commands.prefetch")
+
+MAX_TREE_DEPS = 20000  # Trees with more entries are not prefetched for VERIFY
+
+
+def _stat_key(path: str) -> Optional[StatKey]:
+    try:
+        return StatKey.from_stat(os.stat(path))
+    except OSError:
+        return None
+
+
+def _snapshot(paths: Sequence[str]) -> dict[str, Optional[StatKey]]:
+    return {path: _stat_key(path) for path in paths}
+
+
+def _excluded(name: str) -> bool:
+    return any(fnmatch.fnmatch(name, pattern) for pattern in DEFAULT_EXCLUDES)
+
+
+def tree_deps(root: Path, limit: int = MAX_TREE_DEPS) -> Optional[list[str]]:
+    """Files and directories under root that VERIFY may read.
+
+    Directories are included so that added or removed files change a
+    dependency. Entries matching DEFAULT_EXCLUDES are pruned.
+
+    Returns:
+        The paths, or None if the tree has more than limit entries
+    """
+    paths = [str(root)]
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = [d for d in dirnames if not _excluded(d)]
+        for name in dirnames + filenames:
+            paths.append(os.path.join(dirpath, name))
+        if len(paths) > limit:
+            return None
+    return paths
+
+
+def refcat_deps(ref: str, cwd: Path) -> Optional[list[str]]:
+    """Paths a REFCAT reference may resolve to (see refcat.resolve_path).
+
+    Returns:
+        Candidate paths, or None if the reference cannot be tracked (aliases)
+    """
+    from ..core.refcat import parse_ref
+
+    try:
+        spec = parse_ref(ref)
+    except Exception:
+        return []  # Parse errors do not depend on the filesystem
+    if spec.alias:
+        return None
+    if spec.path.is_absolute():
+        return [str(spec.path)]
+    return [str(Path.cwd() / spec.path), str(cwd / spec.path)]
+
+
+@dataclass
+class Prefetched:
+    """A prepared value and the stat identities it was computed from."""
+
+    value: Any
+    deps: dict[str, Optional[StatKey]]
+
+    def valid(self) -> bool:
+        """True if no dependency changed since the value was computed."""
+        return all(_stat_key(path) == key for path, key in self.deps.items())
+
+
+def prepare(
+    deps: Callable[[], Optional[Sequence[str]]], produce: Callable[[], Any]
+) -> Optional[Prefetched]:
+    """Compute produce() and snapshot its dependencies (runs on a worker thread).
+
+    Returns:
+        The prepared value, or None if it cannot be validated later
+    """
+    paths = deps()
+    if paths is None:
+        return None
+    before = _snapshot(paths)
+    now = time.time_ns()
+    if any(key is not None and now - key.mtime_ns < RACY_WINDOW_NS for key in before.values()):
+        return None
+    value = produce()
+    if _snapshot(paths) != before:
+        return None  # Modified while producing
+    return Prefetched(value, before)
+
+
+class Prefetcher:
+    """Prepares the inputs of upcoming steps while a model request is in flight.
+
+    Prepared producer outputs are keyed on (step position, placeholder)
+    and handed out once by take_producers().
+    """
+
+    def __init__(self):
+        self._tasks: dict[Hashable, asyncio.Future] = {}
+        self._warming: dict[str, asyncio.Future] = {}
+        self.hits = 0
+        self.stale = 0
+
+    def _schedule(self, key: Hashable, deps, produce) -> None:
+        if key not in self._tasks:
+            self._tasks[key] = asyncio.ensure_future(asyncio.to_thread(prepare, deps, produce))
+
+    def _warm(self, name: str, fn: Callable[[], Any]) -> None:
+        task = self._warming.get(name)
+        if task is None or task.done():
+            self._warming[name] = asyncio.ensure_future(asyncio.to_thread(fn))
+
+    def prefetch_producers(
+        self,
+        step_pos: int,
+        step: Any,
+        placeholders: Mapping[str, tuple[str, ...]],
+        conv: Any,
+    ) -> None:
+        """Start preparing the VERIFY and REFCAT output of a merged step."""
+        verify_commands = getattr(step, 'verify_commands', [])
+        if verify_commands:
+            verify_path = conv.source_path.parent if conv.source_path else Path.cwd()
+            for (verify_type, _), placeholder in zip(
+                verify_commands, placeholders.get("VERIFY", ())
+            ):
+                def verify(verify_type=verify_type):
+                    verifiers = _load_verifiers(verify_path)
+                    return _verify_output(verify_type, verifiers, verify_path, conv.verify_limit)
+
+                self._schedule(
+                    (step_pos, placeholder), lambda: tree_deps(verify_path), verify
+                )
+
+        cwd = Path(conv.cwd or ".").resolve()
+        for ref, placeholder in zip(
+            getattr(step, 'refcat_commands', []), placeholders.get("REFCAT", ())
+        ):
+            self._schedule(
+                (step_pos, placeholder),
+                lambda ref=ref: refcat_deps(ref, cwd),
+                lambda ref=ref: _refcat_output(ref, cwd),
+            )
+
+    async def take_producers(
+        self, step_pos: int, placeholders: Mapping[str, tuple[str, ...]]
+    ) -> dict[str, tuple[str, bool]]:
+        """Prepared outputs of a step that are still valid.
+
+        Waits for preparations still in flight. Every preparation of the
+        step is consumed, whether it is returned or discarded.
+
+        Returns:
+            Placeholder -> (output, success)
+        """
+        ready: dict[str, tuple[str, bool]] = {}
+        for kind in ("VERIFY", "REFCAT"):
+            for placeholder in placeholders.get(kind, ()):
+                task = self._tasks.pop((step_pos, placeholder), None)
+                if task is None:
+                    continue
+                try:
+                    prepared = await task
+                except Exception as e:
+                    logger.debug(f"Prefetch of {placeholder} failed: {e}")
+                    continue
+                if prepared is None:
+                    continue
+                # Re-stat off the event loop: VERIFY can depend on a whole tree
+                if await asyncio.to_thread(prepared.valid):
+                    self.hits += 1
+                    ready[placeholder] = prepared.value
+                else:
+                    self.stale += 1
+                    logger.debug(f"Prefetched {placeholder} is stale (files changed)")
+        return ready
+
+    def warm_context(self, session: Any) -> None:
+        """Read the session's CONTEXT files into the shared file cache."""
+        from ..core.context import ContextManager
+
+        current = session.context
+        patterns = list(session.conversation.context_files)
+
+        def load() -> None:
+            # A scratch manager: session.context is not touched off-thread
+            scratch = ContextManager(
+                base_path=current.base_path,
+                path_filter=current.path_filter,
+                file_cache=current.file_cache,
+                load_workers=current.load_workers,
+            )
+            for pattern in patterns:
+                scratch.add_pattern(pattern)
+
+        if patterns:
+            self._warm("context", load)
+
+    def warm_references(self, references: Sequence[str], base_path: Optional[Path]) -> None:
+        """Read @file prologues/epilogues into the shared file cache."""
+        from ..core.conversation import resolve_content_reference
+
+        refs = [ref for ref in references if ref.startswith("@")]
+
+        def load() -> None:
+            for ref in refs:
+                resolve_content_reference(ref, base_path)
+
+        if refs:
+            self._warm("references", load)
+
+    def prefetch_next(
+        self,
+        plan: Any,
+        step_pos: int,
+        conv: Any,
+        session: Any,
+        *,
+        more_cycles: bool,
+        reload_context: bool,
+    ) -> None:
+        """Start preparing what follows the step at step_pos.
+
+        Args:
+            plan: StepPlan being executed
+            step_pos: Position of the step whose model request is in flight
+            conv: ConversationFile
+            session: Session whose CONTEXT files are reloaded
+            more_cycles: Whether another cycle follows this one
+            reload_context: Whether the next cycle reloads CONTEXT files
+        """
+        positions = list(range(step_pos + 1, len(plan.steps)))
+        if more_cycles:
+            positions += list(range(0, step_pos + 1))
+        for pos in positions:
+            if plan.placeholders[pos]:
+                self.prefetch_producers(pos, plan.steps[pos], plan.placeholders[pos], conv)
+                break
+
+        if more_cycles and reload_context:
+            self.warm_context(session)
+        self.warm_references(
+            list(conv.prologues) + list(conv.epilogues),
+            conv.source_path.parent if conv.source_path else None,
+        )
+
+    def cancel_all(self) -> None:
+        """Drop pending preparations (worker threads finish on their own)."""
+        for task in list(self._tasks.values()) + list(self._warming.values()):
+            task.cancel()
+        self._tasks.clear()
+        self._warming.clear()
+        if self.hits or self.stale:
+            logger.info(f"Prefetch: {self.hits} used, {self.stale} stale")
+
+
+def _get_prefetch_enabled() -> bool:
+    """Get context.prefetch from config (lazy import)."""
+    try:
+        from ..core.config import get_context_prefetch
+        return get_context_prefetch()
+    except ImportError:
+        return True
+
+
+def create_prefetcher() -> Optional[Prefetcher]:
+    """A Prefetcher, or None if prefetching is disabled in config."""
+    return Prefetcher() if _get_prefetch_enabled() else None
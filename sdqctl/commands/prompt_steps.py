@@ -7,7 +7,7 @@ during workflow execution cycles.
 
 import logging
 from dataclasses import dataclass
-from typing import TYPE_CHECKING, Any, Callable, Optional
+from typing import TYPE_CHECKING, Any, Callable, Iterable, Iterator, Optional
 
 from ..core.conversation import build_prompt_with_injection
 from ..core.exceptions import LoopReason
@@ -38,6 +38,9 @@ class PromptContext:
     no_stop_file_prologue: bool = False
     verbosity: int = 0
     line_number: int = 0  # Source line number from .conv file
+    # Yields CONTEXT file chunks (ContextManager.iter_context_content), placed
+    # after context_content; streamed into the prompt's single join
+    context_stream: Optional[Callable[[], Iterable[str]]] = None
 
 
 @dataclass
@@ -50,6 +53,32 @@ class PromptBuildResult:
     is_last: bool
 
 
+def _prepend(first: str, rest: Iterator[str]) -> Iterator[str]:
+    yield first
+    yield from rest
+
+
+def _context_chunks(ctx: PromptContext) -> Iterator[str]:
+    """Chunks of the context section: context_content, then streamed CONTEXT files."""
+    stream = iter(ctx.context_stream()) if ctx.context_stream else iter(())
+    first = next(stream, None)
+    if ctx.context_content:
+        yield ctx.context_content
+        if first is not None:
+            yield "\n\n"
+    if first is not None:
+        yield first
+        yield from stream
+
+
+def _join_sections(sections: list[Iterable[str]]) -> Iterator[str]:
+    """Chunks of the sections, separated by blank lines."""
+    for i, section in enumerate(sections):
+        if i:
+            yield "\n\n"
+        yield from section
+
+
 def build_full_prompt(
     ctx: PromptContext,
     conv: "ConversationFile",
@@ -88,9 +117,16 @@ def build_full_prompt(
         is_last_prompt=is_last
     )
 
+    # Collect sections and join once at the end: the context can be tens of
+    # MB, so each intermediate concatenation would copy all of it again
+    sections: list[Iterable[str]] = [(full_prompt,)]
+
     # Add context to first prompt (fresh: always, others: cycle 0)
-    if ctx.prompt_idx == 0 and ctx.context_content:
-        full_prompt = f"{ctx.context_content}\n\n{full_prompt}"
+    if ctx.prompt_idx == 0:
+        context = _context_chunks(ctx)
+        first = next(context, None)
+        if first is not None:
+            sections.insert(0, _prepend(first, context))
 
     # Add stop file instruction on first prompt of session (Q-002)
     # For fresh mode: inject each cycle. For accumulate: only cycle 0.
@@ -101,19 +137,19 @@ def build_full_prompt(
     )
     if should_inject_stop_file:
         stop_instr = get_stop_file_instruction(loop_detector.stop_file_name)
-        full_prompt = f"{full_prompt}\n\n{stop_instr}"
+        sections.append((stop_instr,))
 
     # On subsequent cycles (accumulate), add continuation context
     is_continuation = (
-        ctx.session_mode == "accumulate" and
+        ctx.session_mode in ("accumulate", "diff") and
         ctx.cycle_num > 0 and ctx.prompt_idx == 0 and
         conv.on_context_limit_prompt
     )
     if is_continuation:
-        full_prompt = f"{conv.on_context_limit_prompt}\n\n{full_prompt}"
+        sections.insert(0, (conv.on_context_limit_prompt,))
 
     return PromptBuildResult(
-        full_prompt=full_prompt,
+        full_prompt="".join(_join_sections(sections)),
         context_pct=context_pct,
         is_first=is_first,
         is_last=is_last,
@@ -17,7 +17,9 @@ from rich.panel import Panel
 
 from ..adapters import get_adapter
 from ..adapters.base import AdapterConfig
+from ..core.journal import read_checkpoint_header
 from ..core.logging import get_logger, setup_logging
+from ..core.retention import schedule_retention
 from ..core.session import Session
 
 if TYPE_CHECKING:
@@ -98,7 +100,7 @@ def _list_checkpoints(console: Console, json_output: bool) -> None:
         result = []
         for cp in sorted(checkpoints, key=lambda p: p.stat().st_mtime, reverse=True):
             try:
-                data = json_module.loads(cp.read_text())
+                data = read_checkpoint_header(cp)
                 result.append({
                     "path": str(cp),
                     "message": data.get("message", ""),
@@ -112,7 +114,7 @@ def _list_checkpoints(console: Console, json_output: bool) -> None:
         console.print("[bold]Available checkpoints:[/bold]\n")
         for cp in sorted(checkpoints, key=lambda p: p.stat().st_mtime, reverse=True):
             try:
-                data = json_module.loads(cp.read_text())
+                data = read_checkpoint_header(cp)
                 msg = data.get("message", "")[:60]
                 ts = data.get("timestamp", "")[:19]
                 console.print(f"  {cp}")
@@ -257,6 +259,8 @@ async def _resume_async(
 
         # Completed successfully
         await ai_adapter.destroy_session(adapter_session)
+        session.mark_finished()
+        schedule_retention(protect=session.session_dir.name)
         await ai_adapter.stop()
 
         session.state.status = "completed"
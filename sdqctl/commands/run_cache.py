@@ -0,0 +1,303 @@
+"""
+Input-hash memoization of RUN command results.
+
+Workflows often repeat `RUN pytest` or `RUN npm run lint` every cycle even
+when nothing they read has changed. RUN-CACHE opts a RUN step into replaying
+its previous result instead:
+
+    RUN pytest tests/
+    RUN-CACHE src/**/*.py tests/**/*.py pyproject.toml
+
+The cache key is a SHA-256 over the command, the resolved working
+directory, ALLOW-SHELL, the RUN-ENV variables and the content hash of every
+file matched by the declared input globs (relative to the RUN directory).
+When the key matches a stored entry, its stdout, stderr and exit code are
+replayed without starting the command. Anything the command reads that is
+not covered by the globs is invisible to the key, so declare inputs
+generously.
+
+Entries are JSON files under run.cache_dir (default ~/.sdqctl/run-cache).
+A hit refreshes the entry's mtime, and storing a new entry evicts the least
+recently used ones once the directory exceeds run.cache_max_size:
+
+    run:
+      cache_dir: .sdqctl/run-cache
+      cache_max_size: 256MB
+
+Timed-out and stopped commands are never stored, and neither is a result
+whose inputs changed while the command was running.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Optional, Sequence
+
+from ..core.file_cache import RACY_WINDOW_NS, StatKey
+from .run_engine import RunResult
+
+logger = logging.getLogger("sdqctl.commands.run_cache")
+
+DEFAULT_CACHE_DIR = Path.home() / ".sdqctl" / "run-cache"
+DEFAULT_CACHE_MAX_BYTES = 256 * 1024 * 1024
+
+KEY_VERSION = 1  # Bump when the key or entry layout changes
+
+
+class RunCache:
+    """On-disk store of RUN results keyed on command and input hashes.
+
+    File digests are memoized on stat identity, so re-keying an unchanged
+    tree costs one stat() per input file.
+    """
+
+    def __init__(
+        self,
+        directory: Path = DEFAULT_CACHE_DIR,
+        max_bytes: int = DEFAULT_CACHE_MAX_BYTES,
+    ):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self._digests: dict[str, tuple[StatKey, str]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _file_digest(self, path: str) -> str:
+        st = os.stat(path)
+        key = StatKey.from_stat(st)
+        with self._lock:
+            memo = self._digests.get(path)
+        if memo is not None and memo[0] == key:
+            return memo[1]
+        h = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                h.update(chunk)
+        digest = h.hexdigest()
+        if time.time_ns() - st.st_mtime_ns >= RACY_WINDOW_NS:
+            with self._lock:
+                self._digests[path] = (key, digest)
+        return digest
+
+    def input_hashes(self, inputs: Sequence[str], cwd: Path) -> list[tuple[str, str]]:
+        """Content hashes of the files matched by the input globs.
+
+        Returns:
+            Sorted (path relative to cwd, sha256) pairs; unmatched globs add nothing
+        """
+        from ..core.glob_index import get_glob_index
+
+        index = get_glob_index()
+        files: set[str] = set()
+        for pattern in inputs:
+            full = pattern if os.path.isabs(pattern) else os.path.join(cwd, pattern)
+            files.update(index.glob(full, recursive=True, files_only=True))
+
+        hashes = []
+        for path in sorted(files):
+            try:
+                hashes.append((os.path.relpath(path, cwd), self._file_digest(path)))
+            except OSError:
+                continue  # Removed between glob and hash
+        return hashes
+
+    def key(
+        self,
+        command: str,
+        cwd: Path,
+        env: Optional[dict[str, str]],
+        allow_shell: bool,
+        inputs: Sequence[str],
+    ) -> str:
+        """Cache key for a command and the current content of its inputs."""
+        cwd = Path(cwd).resolve()
+        material = {
+            "version": KEY_VERSION,
+            "command": command,
+            "cwd": str(cwd),
+            "allow_shell": bool(allow_shell),
+            "env": sorted((env or {}).items()),
+            "inputs": self.input_hashes(inputs, cwd),
+        }
+        encoded = json.dumps(material, sort_keys=True).encode()
+        return hashlib.sha256(encoded).hexdigest()
+
+    def _entry_path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def get(self, key: str) -> Optional[RunResult]:
+        """Replay a stored result, or None on a miss."""
+        path = self._entry_path(key)
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+            result = RunResult(
+                command=data["command"],
+                returncode=int(data["returncode"]),
+                stdout=data["stdout"],
+                stderr=data["stderr"],
+                duration=0.0,
+                dropped_bytes=int(data.get("dropped_bytes", 0)),
+                dropped_lines=int(data.get("dropped_lines", 0)),
+                cached=True,
+            )
+        except (OSError, ValueError, KeyError, TypeError):
+            with self._lock:
+                self.misses += 1
+            return None
+        try:
+            os.utime(path)  # Mark as recently used
+        except OSError:
+            pass
+        with self._lock:
+            self.hits += 1
+        return result
+
+    def put(self, key: str, result: Any) -> None:
+        """Store a completed result, then evict entries over the size cap."""
+        if getattr(result, "timed_out", False) or getattr(result, "stopped", False):
+            return
+        entry = {
+            "command": getattr(result, "command", ""),
+            "returncode": result.returncode,
+            "stdout": result.stdout or "",
+            "stderr": result.stderr or "",
+            "dropped_bytes": getattr(result, "dropped_bytes", 0),
+            "dropped_lines": getattr(result, "dropped_lines", 0),
+            "created": time.time(),
+        }
+        data = json.dumps(entry).encode("utf-8")
+        if len(data) > self.max_bytes:
+            return
+        path = self._entry_path(key)
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(f".{os.getpid()}.tmp")
+            tmp.write_bytes(data)
+            os.replace(tmp, path)
+        except OSError as e:
+            logger.warning(f"Cannot write RUN cache entry to {self.directory}: {e}")
+            return
+        self.evict()
+
+    def evict(self) -> list[Path]:
+        """Remove least recently used entries until the cache fits max_bytes.
+
+        Returns:
+            The entry files removed
+        """
+        entries = []
+        try:
+            with os.scandir(self.directory) as it:
+                for entry in it:
+                    if entry.name.endswith(".json"):
+                        st = entry.stat()
+                        entries.append((st.st_mtime_ns, st.st_size, Path(entry.path)))
+        except OSError:
+            return []
+
+        total = sum(size for _, size, _ in entries)
+        removed = []
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            total -= size
+            removed.append(path)
+        if removed:
+            logger.debug(f"RUN cache evicted {len(removed)} entries")
+        return removed
+
+    def clear(self) -> None:
+        """Remove every entry and reset hit/miss counters."""
+        for path in self.directory.glob("*.json"):
+            try:
+                path.unlink()
+            except OSError:
+                pass
+        with self._lock:
+            self._digests.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+async def run_cached(
+    command: str,
+    inputs: Sequence[str],
+    run: Callable[[], Awaitable[Any]],
+    *,
+    cwd: Path,
+    env: Optional[dict[str, str]],
+    allow_shell: bool,
+    cache: Optional[RunCache] = None,
+) -> tuple[Any, bool]:
+    """Replay a cached result for command, or run it and store the result.
+
+    Args:
+        command: Command string
+        inputs: Input globs declared with RUN-CACHE
+        run: Starts the command and returns its result (RunResult-like)
+        cwd: RUN working directory (input globs are relative to it)
+        env: RUN-ENV variables
+        allow_shell: ALLOW-SHELL setting
+        cache: Cache to use (default: the process-wide cache)
+
+    Returns:
+        (result, hit) - hit is True when the result was replayed
+    """
+    cache = cache or get_run_cache()
+    # Hashing inputs is file I/O; keep it off the event loop
+    key = await asyncio.to_thread(cache.key, command, cwd, env, allow_shell, inputs)
+    cached = cache.get(key)
+    if cached is not None:
+        logger.info(f"RUN cache hit: {command}")
+        return cached, True
+
+    result = await run()
+    # Inputs edited while the command ran: the output matches neither state
+    if await asyncio.to_thread(cache.key, command, cwd, env, allow_shell, inputs) == key:
+        await asyncio.to_thread(cache.put, key, result)
+    else:
+        logger.debug(f"RUN inputs changed during run, not caching: {command}")
+    return result, False
+
+
+def _get_cache_settings() -> tuple[Path, int]:
+    """Get (cache_dir, cache_max_bytes) from config (lazy import)."""
+    try:
+        from ..core.config import load_config
+        run = load_config().run
+        directory = Path(run.cache_dir).expanduser() if run.cache_dir else DEFAULT_CACHE_DIR
+        return directory, run.cache_max_bytes
+    except ImportError:
+        return DEFAULT_CACHE_DIR, DEFAULT_CACHE_MAX_BYTES
+
+
+# Global shared cache
+_run_cache: Optional[RunCache] = None
+
+
+def get_run_cache() -> RunCache:
+    """Get the process-wide RUN cache (configured from .sdqctl.yaml)."""
+    global _run_cache
+    if _run_cache is None:
+        directory, max_bytes = _get_cache_settings()
+        _run_cache = RunCache(directory, max_bytes)
+    return _run_cache
+
+
+def clear_run_cache() -> None:
+    """Forget the process-wide cache instance (useful for testing).
+
+    Stored entries are kept; use RunCache.clear() to delete them.
+    """
+    global _run_cache
+    _run_cache = None
@@ -0,0 +1,366 @@
+"""
+Asyncio engine for RUN commands.
+
+subprocess.run() blocks the event loop for the whole command, so a long test
+suite froze adapter event handling, progress output and stop-file checks.
+run_command() instead starts the command with asyncio, reads stdout and
+stderr as they are produced, and waits without blocking. While it waits it
+enforces the timeout and polls an optional stop predicate (e.g. "the agent
+wrote its stop file"). On a timeout, stop or task cancellation the whole
+process group is terminated, so shell pipelines and child processes go too.
+
+Capture is bounded: each stream keeps a head and a tail of at most
+run.capture_limit bytes together (default 2MB) and counts what was dropped
+in between, so a command printing gigabytes of logs cannot exhaust memory.
+With run.log_dir set, the full output is also spilled to files there:
+
+    run:
+      capture_limit: 2MB
+      log_dir: .sdqctl/run-logs
+
+Output is decoded as UTF-8 (undecodable bytes replaced) with universal
+newlines, matching subprocess text mode.
+"""
+
+import asyncio
+import codecs
+import logging
+import os
+import shlex
+import signal
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import BinaryIO, Callable, Optional
+
+logger = logging.getLogger("sdqctl.commands.run_engine")
+
+READ_CHUNK = 64 * 1024
+DEFAULT_CAPTURE_BYTES = 2 * 1024 * 1024  # Per stream; see run.capture_limit
+STOP_POLL_INTERVAL = 0.5  # Seconds between stop predicate checks
+TERMINATE_GRACE = 2.0  # Seconds between SIGTERM and SIGKILL
+
+
+@dataclass
+class RunResult:
+    """Outcome of a RUN command.
+
+    Has the returncode/stdout/stderr attributes of subprocess.CompletedProcess.
+    """
+
+    command: str
+    returncode: int
+    stdout: str
+    stderr: str
+    duration: float
+    timed_out: bool = False
+    stopped: bool = False  # Terminated because the stop predicate fired
+    dropped_bytes: int = 0  # Output dropped from the middle (both streams)
+    dropped_lines: int = 0
+    log_files: dict[str, Path] = field(default_factory=dict)  # Stream -> spill file
+    cached: bool = False  # Replayed from the RUN cache (see run_cache.py)
+
+
+class OutputBuffer:
+    """Bounded capture of one output stream.
+
+    Keeps the first two thirds of limit bytes (head) and the most recent
+    third (tail); everything in between is dropped but counted. Optionally
+    every byte is also written to a spill file.
+    """
+
+    def __init__(self, limit: int = DEFAULT_CAPTURE_BYTES, spill: Optional[BinaryIO] = None):
+        self.head_limit = limit * 2 // 3
+        self.tail_limit = limit - self.head_limit
+        self.spill = spill
+        self._head = bytearray()
+        self._tail = bytearray()
+        self.total_bytes = 0
+        self.total_lines = 0
+
+    def feed(self, data: bytes) -> None:
+        self.total_bytes += len(data)
+        self.total_lines += data.count(b"\n")
+        if self.spill is not None:
+            self.spill.write(data)
+        room = self.head_limit - len(self._head)
+        if room > 0:
+            self._head += data[:room]
+            data = data[room:]
+        if data:
+            self._tail += data
+            excess = len(self._tail) - self.tail_limit
+            if excess > 0:
+                del self._tail[:excess]
+
+    @property
+    def dropped_bytes(self) -> int:
+        return self.total_bytes - len(self._head) - len(self._tail)
+
+    @property
+    def dropped_lines(self) -> int:
+        if not self.dropped_bytes:
+            return 0
+        return self.total_lines - self._head.count(b"\n") - self._tail.count(b"\n")
+
+    def text(self, log_file: Optional[Path] = None) -> str:
+        """Captured output, with a marker where bytes were dropped."""
+        head = _decode(bytes(self._head))
+        if not self.dropped_bytes:
+            return head + _decode(bytes(self._tail))
+        where = f"; full output: {log_file}" if log_file else ""
+        marker = (
+            f"\n[... {self.dropped_bytes} bytes, {self.dropped_lines} lines "
+            f"dropped{where} ...]\n"
+        )
+        return head + marker + _decode(bytes(self._tail))
+
+
+def _decode(data: bytes) -> str:
+    return data.decode(errors="replace").replace("\r\n", "\n").replace("\r", "\n")
+
+
+class _StreamReader:
+    """Feeds one pipe into an OutputBuffer and the on_output callback."""
+
+    def __init__(
+        self,
+        name: str,
+        buffer: OutputBuffer,
+        on_output: Optional[Callable[[str, str], None]],
+    ):
+        self.name = name
+        self.buffer = buffer
+        self.on_output = on_output
+        self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+
+    def feed(self, data: bytes, final: bool = False) -> None:
+        self.buffer.feed(data)
+        if not self.on_output:
+            return
+        text = self._decoder.decode(data, final=final)
+        if text:
+            try:
+                self.on_output(self.name, text)
+            except Exception as e:
+                logger.debug(f"RUN output callback failed: {e}")
+
+
+async def _drain(stream: asyncio.StreamReader, reader: _StreamReader) -> None:
+    while True:
+        data = await stream.read(READ_CHUNK)
+        if not data:
+            break
+        reader.feed(data)
+    reader.feed(b"", final=True)
+
+
+def dropped_note(result: "RunResult") -> str:
+    """Summary of output dropped by bounded capture ("" if nothing was dropped).
+
+    Appended to injected RUN output, where the in-stream marker may itself
+    be cut by RUN-OUTPUT-LIMIT truncation.
+    """
+    if not getattr(result, "dropped_bytes", 0):
+        return ""
+    note = f"[RUN output capped: {result.dropped_bytes} bytes, {result.dropped_lines} lines dropped"
+    if result.log_files:
+        note += "; full output: " + ", ".join(str(p) for p in result.log_files.values())
+    return note + "]"
+
+
+def _get_run_settings() -> tuple[int, Optional[str]]:
+    """Get (capture_bytes, log_dir) from config (lazy import)."""
+    try:
+        from ..core.config import load_config
+        run = load_config().run
+        return run.capture_bytes, run.log_dir
+    except ImportError:
+        return DEFAULT_CAPTURE_BYTES, None
+
+
+def open_capture(
+    stem: str, capture_limit: Optional[int] = None, log_dir: Optional[Path] = None
+) -> tuple[dict[str, OutputBuffer], dict[str, Path], list[BinaryIO]]:
+    """Create the stdout/stderr buffers for one command.
+
+    Args:
+        stem: Spill file name stem (files are <stem>.<stream>.log)
+        capture_limit: Bytes kept in memory per stream (default: run.capture_limit)
+        log_dir: Directory for full-output spill files (default: run.log_dir)
+
+    Returns:
+        (stream -> buffer, stream -> spill file path, open spill files to close)
+    """
+    config_limit, config_log_dir = _get_run_settings()
+    limit = capture_limit or config_limit
+    spill_dir = log_dir or (Path(config_log_dir) if config_log_dir else None)
+    log_files: dict[str, Path] = {}
+    spills: list[BinaryIO] = []
+    buffers: dict[str, OutputBuffer] = {}
+    for name in ("stdout", "stderr"):
+        spill = None
+        if spill_dir is not None:
+            try:
+                spill_dir.mkdir(parents=True, exist_ok=True)
+                log_files[name] = spill_dir / f"{stem}.{name}.log"
+                spill = open(log_files[name], "wb")
+                spills.append(spill)
+            except OSError as e:
+                logger.warning(f"Cannot spill RUN output to {spill_dir}: {e}")
+                log_files.pop(name, None)
+        buffers[name] = OutputBuffer(limit, spill)
+    return buffers, log_files, spills
+
+
+async def wait_with_limits(
+    waiter: "asyncio.Future",
+    deadline: Optional[float],
+    should_stop: Optional[Callable[[], bool]] = None,
+) -> Optional[str]:
+    """Wait for waiter until it finishes, the deadline passes or should_stop fires.
+
+    Args:
+        waiter: Future that completes when the command is done
+        deadline: time.perf_counter() value to give up at (None = no limit)
+        should_stop: Polled every STOP_POLL_INTERVAL seconds
+
+    Returns:
+        None if waiter finished, else "timeout" or "stop"
+    """
+    while not waiter.done():
+        wait_for = STOP_POLL_INTERVAL if should_stop else None
+        if deadline is not None:
+            remaining = max(0.0, deadline - time.perf_counter())
+            wait_for = remaining if wait_for is None else min(wait_for, remaining)
+        await asyncio.wait({waiter}, timeout=wait_for)
+        if waiter.done():
+            break
+        if deadline is not None and time.perf_counter() >= deadline:
+            return "timeout"
+        if should_stop and should_stop():
+            return "stop"
+    return None
+
+
+def _signal_group(proc: asyncio.subprocess.Process, sig: int) -> None:
+    """Send sig to the command's process group (the process alone off POSIX)."""
+    if proc.returncode is not None:
+        return
+    try:
+        if os.name == "posix":
+            os.killpg(proc.pid, sig)
+        elif sig == signal.SIGTERM:
+            proc.terminate()
+        else:
+            proc.kill()
+    except (ProcessLookupError, PermissionError):
+        pass
+
+
+async def terminate_process(
+    proc: asyncio.subprocess.Process, grace: float = TERMINATE_GRACE
+) -> None:
+    """Terminate a command's process group: SIGTERM, then SIGKILL after grace."""
+    _signal_group(proc, signal.SIGTERM)
+    try:
+        await asyncio.wait_for(proc.wait(), grace)
+    except asyncio.TimeoutError:
+        _signal_group(proc, getattr(signal, "SIGKILL", signal.SIGTERM))
+        await proc.wait()
+
+
+async def run_command(
+    command: str,
+    *,
+    allow_shell: bool,
+    timeout: Optional[float],
+    cwd: Path,
+    env: Optional[dict[str, str]] = None,
+    on_output: Optional[Callable[[str, str], None]] = None,
+    should_stop: Optional[Callable[[], bool]] = None,
+    capture_limit: Optional[int] = None,
+    log_dir: Optional[Path] = None,
+) -> RunResult:
+    """Run a command without blocking the event loop.
+
+    Args:
+        command: Command string (split with shlex unless allow_shell)
+        allow_shell: Run through the shell (pipes, redirects)
+        timeout: Seconds before the command is terminated (None = no limit)
+        cwd: Working directory
+        env: Extra environment variables (merged with os.environ)
+        on_output: Called with ("stdout" | "stderr", text) as output arrives
+        should_stop: Polled while waiting; True terminates the command
+        capture_limit: Bytes kept in memory per stream (default: run.capture_limit)
+        log_dir: Directory for full-output spill files (default: run.log_dir)
+
+    Returns:
+        RunResult with the captured output. A timed-out or stopped command
+        has returncode -1 and keeps the output produced so far.
+
+    Raises:
+        OSError: If the command cannot be started (e.g. not found)
+    """
+    run_env = None
+    if env:
+        run_env = os.environ.copy()
+        run_env.update(env)
+
+    kwargs = dict(
+        cwd=cwd,
+        env=run_env,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        start_new_session=os.name == "posix",
+    )
+    start = time.perf_counter()
+    if allow_shell:
+        proc = await asyncio.create_subprocess_shell(command, **kwargs)
+    else:
+        proc = await asyncio.create_subprocess_exec(*shlex.split(command), **kwargs)
+
+    stem = f"run-{time.strftime('%Y%m%d-%H%M%S')}-{proc.pid}"
+    buffers, log_files, spills = open_capture(stem, capture_limit, log_dir)
+    readers = [
+        asyncio.ensure_future(_drain(pipe, _StreamReader(name, buffers[name], on_output)))
+        for name, pipe in (("stdout", proc.stdout), ("stderr", proc.stderr))
+    ]
+    waiter = asyncio.ensure_future(proc.wait())
+    timed_out = stopped = False
+
+    try:
+        reason = await wait_with_limits(
+            waiter, start + timeout if timeout else None, should_stop
+        )
+        if reason:
+            timed_out, stopped = reason == "timeout", reason == "stop"
+            what = f"timed out after {timeout}s" if timed_out else "stop requested"
+            logger.warning(f"RUN {what}, terminating: {command}")
+            await terminate_process(proc)
+        # Children that inherited the pipes may outlive the command; don't wait on them
+        await asyncio.wait(readers, timeout=TERMINATE_GRACE)
+    except asyncio.CancelledError:
+        await asyncio.shield(terminate_process(proc))
+        raise
+    finally:
+        for task in (*readers, waiter):
+            if not task.done():
+                task.cancel()
+        for spill in spills:
+            spill.close()
+
+    returncode = -1 if (timed_out or stopped) else proc.returncode
+    out, err = buffers["stdout"], buffers["stderr"]
+    return RunResult(
+        command=command,
+        returncode=returncode,
+        stdout=out.text(log_files.get("stdout")),
+        stderr=err.text(log_files.get("stderr")),
+        duration=time.perf_counter() - start,
+        timed_out=timed_out,
+        stopped=stopped,
+        dropped_bytes=out.dropped_bytes + err.dropped_bytes,
+        dropped_lines=out.dropped_lines + err.dropped_lines,
+        log_files=log_files,
+    )
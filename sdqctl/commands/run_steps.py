@@ -4,8 +4,9 @@ RUN step handlers for workflow execution.
 Handles RUN, RUN-ASYNC, and RUN-WAIT directives during runs.
 """
 
+import asyncio
+import inspect
 import logging
-import shlex
 import subprocess
 import time
 from typing import TYPE_CHECKING, Any, Callable, Optional
@@ -15,8 +16,16 @@ if TYPE_CHECKING:
     from ..core.conversation import ConversationFile
     from ..core.session import Session
 
+from .async_supervisor import (
+    BackgroundProcess,
+    ProcessSupervisor,
+    get_process_supervisor,
+    parse_probe,
+)
+from .run_cache import run_cached
+from .run_engine import dropped_note
+from .shell_worker import ShellWorker, shell_runner
 from .utils import resolve_run_directory, truncate_output
-from .utils import run_async as run_async_util
 
 logger = logging.getLogger("sdqctl.commands.run_steps")
 
@@ -30,7 +39,9 @@ async def execute_run_step(
     console: Any,
     progress: Callable[[str], None],
     first_prompt: bool,
-    run_subprocess_fn: Callable,
+    run_subprocess_fn: Optional[Callable] = None,
+    should_stop: Optional[Callable[[], bool]] = None,
+    shell: Optional[ShellWorker] = None,
 ) -> Optional[bool]:
     """Execute a RUN step with optional retry and AI-assisted fixes.
 
@@ -43,14 +54,17 @@ async def execute_run_step(
         console: Rich console for output
         progress: Progress callback
         first_prompt: Whether this is first prompt
-        run_subprocess_fn: Function to run subprocess
+        run_subprocess_fn: Function to run subprocess (default: the asyncio
+            RUN engine, which keeps the event loop responsive)
+        should_stop: Polled while the command runs; True terminates it
+        shell: Persistent shell for the command (RUN-SHELL persistent)
 
     Returns:
         None to continue, or False if should stop execution
     """
     from .blocks import execute_block_steps
 
-    step_content = getattr(step, 'content', step.get('content', ''))
+    step_content = step.content if hasattr(step, 'content') else step.get('content', '')
     command = step_content
     retry_count = getattr(step, 'retry_count', 0)
     retry_prompt = getattr(step, 'retry_prompt', '')
@@ -77,24 +91,56 @@ async def execute_run_step(
                 conv.run_cwd, conv.cwd, conv.source_path
             )
 
-            result = run_subprocess_fn(
-                command,
+            run_kwargs = dict(
                 allow_shell=conv.allow_shell,
                 timeout=conv.run_timeout,
                 cwd=run_dir,
                 env=conv.run_env if conv.run_env else None,
             )
+
+            async def run():
+                if run_subprocess_fn is None:
+                    runner = shell_runner(shell)
+                    return await runner(command, should_stop=should_stop, **run_kwargs)
+                result = run_subprocess_fn(command, **run_kwargs)
+                if inspect.isawaitable(result):
+                    result = await result
+                return result
+
+            # RUN-CACHE: replay the stored result while the declared inputs are unchanged
+            cache_inputs = getattr(step, 'cache_inputs', None)
+            hit = False
+            if cache_inputs is None:
+                result = await run()
+            else:
+                result, hit = await run_cached(
+                    command, cache_inputs, run, cwd=run_dir, env=conv.run_env,
+                    allow_shell=conv.allow_shell,
+                )
             run_elapsed = time.time() - run_start
+            timing = "cached" if hit else f"{run_elapsed:.1f}s"
+            if cache_inputs is not None and not hit:
+                timing += ", cache miss"
             last_result = result
 
+            if getattr(result, 'timed_out', False):
+                raise subprocess.TimeoutExpired(
+                    command, conv.run_timeout, output=result.stdout, stderr=result.stderr
+                )
+            if getattr(result, 'stopped', False):
+                logger.warning("  ✗ Command stopped (stop file detected)")
+                progress("  ✗ Command stopped (stop file detected)")
+                break
+
             if result.returncode == 0:
-                logger.info(f"  ✓ Command succeeded ({run_elapsed:.1f}s)")
-                progress(f"  ✓ Command succeeded ({run_elapsed:.1f}s)")
+                logger.info(f"  ✓ Command succeeded ({timing})")
+                progress(f"  ✓ Command succeeded ({timing})")
                 break  # Success - exit retry loop
             else:
                 rc = result.returncode
-                logger.warning(f"  ✗ Command failed (exit {rc})")
-                progress(f"  ✗ Command failed (exit {result.returncode})")
+                cache_note = f" ({timing})" if cache_inputs is not None else ""
+                logger.warning(f"  ✗ Command failed (exit {rc}){cache_note}")
+                progress(f"  ✗ Command failed (exit {result.returncode}){cache_note}")
 
                 # If retries remaining, send to AI for fix
                 if retry_count > 0 and attempt < max_attempts:
@@ -125,12 +171,12 @@ After fixing, the command will be retried automatically."""
 
                     # Send to AI and wait for response
                     try:
-                        retry_response = run_async_util(ai_adapter.run(
+                        retry_response = await ai_adapter.run(
                             adapter_session,
                             full_retry_prompt,
                             restrictions=conv.file_restrictions,
                             stream=True,
-                        ))
+                        )
                         if retry_response:
                             resp_len = len(retry_response)
                             logger.info(f"  📥 AI response ({resp_len} chars)")
@@ -150,8 +196,8 @@ After fixing, the command will be retried automatically."""
             # Timeout - no retry (complex to handle)
             last_result = type('Result', (), {
                 'returncode': -1,
-                'stdout': e.stdout or '',
-                'stderr': e.stderr or f'Timeout after {conv.run_timeout}s'
+                'stdout': _as_text(e.stdout),
+                'stderr': _as_text(e.stderr) or f'Timeout after {conv.run_timeout}s'
             })()
             break
 
@@ -176,6 +222,8 @@ After fixing, the command will be retried automatically."""
             if last_result.stderr:
                 output_text += f"\n\n[stderr]\n{last_result.stderr}"
             output_text = truncate_output(output_text, conv.run_output_limit)
+            if note := dropped_note(last_result):
+                output_text += f"\n{note}"
 
             if output_text.strip():
                 rc = last_result.returncode
@@ -214,8 +262,8 @@ After fixing, the command will be retried automatically."""
         # Handle stop-on-error AFTER output, blocks, retries
         # Only stop if no ON-FAILURE block was present
         is_failed = last_result.returncode != 0
-        should_stop = conv.run_on_error == "stop" and not on_failure
-        if is_failed and should_stop:
+        stop_on_error = conv.run_on_error == "stop" and not on_failure
+        if is_failed and stop_on_error:
             retry_msg = f" after {attempt} attempts" if retry_count > 0 else ""
             console.print(f"[red]RUN failed{retry_msg}: {command}[/red]")
             console.print(f"[dim]Exit code: {last_result.returncode}[/dim]")
@@ -231,23 +279,37 @@ After fixing, the command will be retried automatically."""
     return None  # Continue execution
 
 
-def execute_run_async_step(
+def _as_text(output: Any) -> str:
+    """Captured output from TimeoutExpired, which may be bytes or None."""
+    if isinstance(output, bytes):
+        return output.decode(errors="replace")
+    return output or ''
+
+
+async def execute_run_async_step(
     step: Any,
     conv: "ConversationFile",
     session: "Session",
     progress: Callable[[str], None],
-) -> None:
+    supervisor: Optional[ProcessSupervisor] = None,
+) -> BackgroundProcess:
     """Execute a RUN-ASYNC step (background process).
 
+    The process is started by the supervisor, which drains its output and
+    stops it when the workflow ends.
+
     Args:
         step: ConversationStep with command
         conv: ConversationFile for settings
         session: Session for context
         progress: Progress callback
-    """
-    import os
+        supervisor: Owner of the workflow's background processes
+            (default: the process-wide supervisor)
 
-    step_content = getattr(step, 'content', step.get('content', ''))
+    Returns:
+        The started BackgroundProcess (also appended to conv.async_processes)
+    """
+    step_content = step.content if hasattr(step, 'content') else step.get('content', '')
     command = step_content
 
     logger.info(f"🔧 RUN-ASYNC: {command}")
@@ -257,46 +319,71 @@ def execute_run_async_step(
         conv.run_cwd, conv.cwd, conv.source_path
     )
 
-    # Build environment
-    run_env = None
-    if conv.run_env:
-        run_env = os.environ.copy()
-        run_env.update(conv.run_env)
-
-    # Start process in background
-    args = command if conv.allow_shell else shlex.split(command)
-    proc = subprocess.Popen(
-        args,
-        shell=conv.allow_shell,
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE,
-        text=True,
+    supervisor = supervisor or get_process_supervisor()
+    running = supervisor.find_running(command, run_dir)
+    if running is not None:
+        # Later cycles repeat the step; keep the server from the first one
+        logger.info(f"  ✓ Background process already running (PID {running.pid})")
+        progress(f"  ✓ Background process already running (PID {running.pid})")
+        return running
+
+    bg = await supervisor.start(
+        command,
+        allow_shell=conv.allow_shell,
         cwd=run_dir,
-        env=run_env,
+        env=conv.run_env if conv.run_env else None,
     )
-    conv.async_processes.append((command, proc))
-    logger.info(f"  ✓ Background process started (PID {proc.pid})")
-    progress(f"  ✓ Background process started (PID {proc.pid})")
-    async_msg = f"[RUN-ASYNC started]\n$ {command} (PID {proc.pid})"
+    conv.async_processes.append((command, bg))
+    logger.info(f"  ✓ Background process started (PID {bg.pid})")
+    progress(f"  ✓ Background process started (PID {bg.pid})")
+    async_msg = f"[RUN-ASYNC started]\n$ {command} (PID {bg.pid})"
     session.add_message("system", async_msg)
+    return bg
 
 
-def execute_run_wait_step(
+async def execute_run_wait_step(
     step: Any,
     progress: Callable[[str], None],
-) -> None:
-    """Execute a RUN-WAIT step (sleep/delay).
+    supervisor: Optional[ProcessSupervisor] = None,
+    timeout: Optional[float] = None,
+) -> bool:
+    """Execute a RUN-WAIT step without blocking the event loop.
+
+    RUN-WAIT takes a duration ("5", "5s", "1m", "500ms") to sleep, or a
+    readiness probe for the latest RUN-ASYNC process: "port:8000",
+    "port:host:8000" or "output:<regex>".
 
     Args:
-        step: ConversationStep with duration
+        step: ConversationStep with duration or probe
         progress: Progress callback
+        supervisor: Supervisor of the RUN-ASYNC processes (default: process-wide)
+        timeout: Seconds a probe may wait (None = no limit)
+
+    Returns:
+        False if a probe did not succeed, else True
     """
-    step_content = getattr(step, 'content', step.get('content', ''))
-    wait_spec = step_content.strip().lower()
+    step_content = step.content if hasattr(step, 'content') else step.get('content', '')
+    wait_spec = step_content.strip()
 
     logger.info(f"⏱️ RUN-WAIT: {wait_spec}")
 
+    probe = parse_probe(wait_spec)
+    if probe is not None:
+        supervisor = supervisor or get_process_supervisor()
+        progress(f"  ⏱️ Waiting for {probe.describe()}...")
+        start = time.perf_counter()
+        ready, detail = await supervisor.wait_ready(probe, timeout)
+        if ready:
+            elapsed = time.perf_counter() - start
+            logger.info(f"  ✓ Ready: {probe.describe()} ({elapsed:.1f}s)")
+            progress(f"  ✓ Ready: {probe.describe()} ({elapsed:.1f}s)")
+        else:
+            logger.warning(f"  ✗ Not ready: {probe.describe()} ({detail})")
+            progress(f"  ✗ Not ready: {probe.describe()} ({detail})")
+        return ready
+
     # Parse duration: "5", "5s", "1m", "500ms"
+    wait_spec = wait_spec.lower()
     if wait_spec.endswith("ms"):
         wait_seconds = float(wait_spec[:-2]) / 1000
     elif wait_spec.endswith("m"):
@@ -307,6 +394,7 @@ def execute_run_wait_step(
         wait_seconds = float(wait_spec)
 
     progress(f"  ⏱️ Waiting {wait_seconds}s...")
-    time.sleep(wait_seconds)
+    await asyncio.sleep(wait_seconds)
     logger.info("  ✓ Wait complete")
     progress("  ✓ Wait complete")
+    return True
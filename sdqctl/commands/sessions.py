@@ -26,6 +26,10 @@ from rich.console import Console
 from rich.table import Table
 
 from ..adapters import get_adapter
+from ..core.config import load_config
+from ..core.journal import read_checkpoint_header
+from ..core.retention import apply_retention, parse_size
+from ..core.session_index import SessionIndex
 from .utils import run_async
 
 console = Console()
@@ -108,6 +112,14 @@ def format_tokens(tokens: int) -> str:
         return str(tokens)
 
 
+def format_bytes(size: int) -> str:
+    """Format a byte count with KB/MB/GB suffix for readability."""
+    for unit, scale in (("GB", 1024**3), ("MB", 1024**2), ("KB", 1024)):
+        if size >= scale:
+            return f"{size / scale:.1f}{unit}"
+    return f"{size}B"
+
+
 def format_duration_short(seconds: float) -> str:
     """Format duration in short form like '5m', '1h30m', '2h'."""
     if seconds < 60:
@@ -149,6 +161,8 @@ def sessions():
       list     List all available sessions
       delete   Delete a session permanently
       cleanup  Clean up old sessions
+      reindex  Rebuild the local session index
+      gc       Prune local checkpoints and cap session storage
 
     \b
     Examples:
@@ -205,10 +219,13 @@ async def _list_sessions_async(
     # Sort by modified time (newest first)
     sessions_list.sort(key=lambda s: s.get("modified_time", ""), reverse=True)
 
-    # Enrich with metrics if verbose
+    # Enrich with metrics if verbose (one index query instead of a file per session)
     if verbose:
+        index = SessionIndex(SDQCTL_DIR / "sessions")
+        index.sync()
+        metrics_by_id = index.get_metrics([s.get("id", "") for s in sessions_list])
         for s in sessions_list:
-            metrics = load_session_metrics(s.get("id", ""))
+            metrics = metrics_by_id.get(s.get("id", ""))
             if metrics:
                 s["metrics"] = metrics
 
@@ -410,6 +427,61 @@ async def _cleanup_sessions_async(cutoff: datetime, dry_run: bool, adapter_name:
         console.print(f"[red]Error during cleanup: {e}[/red]")
 
 
+@sessions.command("reindex")
+def reindex_sessions():
+    """Rebuild the local session index from disk.
+
+    The index (~/.sdqctl/sessions.db) speeds up `status` and
+    `sessions list --verbose`. It is kept up to date automatically; use this
+    if it was deleted or looks wrong.
+    """
+    index = SessionIndex(SDQCTL_DIR / "sessions")
+    count = index.rebuild()
+    console.print(f"[green]Indexed {count} sessions in {index.db_path}[/green]")
+
+
+@sessions.command("gc")
+@click.option("--keep-last", type=int, default=None,
+              help="Checkpoints to keep per session (default: checkpoints.keep_last)")
+@click.option("--max-size", default=None,
+              help="Cap on local session storage, e.g. 2GB (default: checkpoints.max_size)")
+@click.option("--dry-run", is_flag=True, help="Show what would be removed without removing it")
+def gc_sessions(keep_last: Optional[int], max_size: Optional[str], dry_run: bool):
+    """Prune local checkpoints and evict old session directories.
+
+    Keeps the newest --keep-last checkpoints of each session, then removes
+    whole sessions, least recently written first, until local storage fits
+    in --max-size. Unlike cleanup, this only touches ~/.sdqctl/sessions.
+
+    \b
+    Examples:
+      sdqctl sessions gc --keep-last 5 --dry-run
+      sdqctl sessions gc --max-size 2GB
+    """
+    config = load_config().checkpoints
+    try:
+        max_bytes = parse_size(max_size) if max_size is not None else config.max_bytes
+    except ValueError as e:
+        console.print(f"[red]{e}[/red]")
+        return
+    keep = keep_last if keep_last is not None else config.keep_last
+    if keep <= 0 and max_bytes <= 0:
+        console.print(
+            "[yellow]No limits set (use --keep-last/--max-size or "
+            "checkpoints.keep_last/max_size in .sdqctl.yaml)[/yellow]"
+        )
+        return
+
+    result = apply_retention(SDQCTL_DIR / "sessions", keep, max_bytes, dry_run=dry_run)
+    verb = "Would remove" if dry_run else "Removed"
+    console.print(
+        f"{verb} {len(result.checkpoints_removed)} checkpoints and "
+        f"{len(result.sessions_evicted)} sessions ({format_bytes(result.bytes_freed)})"
+    )
+    for session_id in result.sessions_evicted:
+        console.print(f"  {session_id}")
+
+
 @sessions.command("stats")
 @click.argument("session_id")
 @click.option("--format", "output_format", type=click.Choice(["table", "json"]),
@@ -586,6 +658,7 @@ async def _fetch_metrics_async(session_id: str, adapter_name: str):
                     metrics_path = session_dir / "metrics.json"
                     with open(metrics_path, "w") as f:
                         json.dump(metrics, f, indent=2)
+                    SessionIndex(SDQCTL_DIR / "sessions").record_metrics(session_id, metrics)
 
                     console.print(f"\n[green]✓ Saved to {metrics_path}[/green]")
                 else:
@@ -662,7 +735,7 @@ async def _resume_session_async(
             checkpoint_file = session_dir / "pause.json"
             if checkpoint_file.exists():
                 try:
-                    checkpoint_data = json.loads(checkpoint_file.read_text())
+                    checkpoint_data = read_checkpoint_header(checkpoint_file)
                     if checkpoint_data.get("status") == "consulting":
                         # Check for expiration (CONSULT-TIMEOUT)
                         expires_at = checkpoint_data.get("expires_at")
@@ -684,7 +757,7 @@ async def _resume_session_async(
                             consult_topic = message[9:]  # Strip "CONSULT: " prefix
                         else:
                             consult_topic = "Open Questions"
-                except (json.JSONDecodeError, KeyError):
+                except (json.JSONDecodeError, KeyError, OSError):
                     pass
 
             # Resume the session
@@ -0,0 +1,261 @@
+"""
+Persistent shell session for RUN commands.
+
+With ALLOW-SHELL every RUN pays for a fresh /bin/sh, and setup such as
+`source .venv/bin/activate` has to be repeated in each command. With
+
+    ALLOW-SHELL true
+    RUN-SHELL persistent
+
+the workflow's RUN commands are sent to one long-lived bash process instead.
+Shell state carries over between commands: exported variables, functions,
+aliases and activated virtualenvs. Each command still starts in the RUN
+directory (RUN-CWD) with the RUN-ENV variables exported.
+
+Framing: every command is wrapped as
+
+    if builtin cd -- <cwd>; then
+      export <RUN-ENV>...
+      eval <command> </dev/null
+      __sdqctl_rc=$?
+    else
+      __sdqctl_rc=1
+    fi
+    builtin printf '%s %d\\n' <sentinel> "$__sdqctl_rc"
+    builtin printf '%s\\n' <sentinel> >&2
+
+and its output is read up to a per-session random sentinel on each stream;
+the number after the stdout sentinel is the exit code. eval keeps syntax
+errors from breaking the framing, and </dev/null keeps commands from
+reading the framing script itself.
+
+Commands run one at a time (RUNs of an ELIDE group queue up in declaration
+order). A timeout, stop request or cancellation terminates the whole shell;
+so does a command that exits the shell. The next command then starts a new
+shell, without the state of the old one.
+"""
+
+import asyncio
+import logging
+import os
+import shlex
+import shutil
+import time
+import uuid
+from pathlib import Path
+from typing import Awaitable, Callable, Optional
+
+from .run_engine import (
+    READ_CHUNK,
+    RunResult,
+    _StreamReader,
+    open_capture,
+    run_command,
+    terminate_process,
+    wait_with_limits,
+)
+
+logger = logging.getLogger("sdqctl.commands.shell_worker")
+
+SHELL = "bash"
+
+
+async def _read_frame(
+    stream: asyncio.StreamReader, reader: _StreamReader, sentinel: bytes
+) -> Optional[str]:
+    """Feed stream into reader up to the sentinel.
+
+    Returns:
+        The rest of the sentinel line, or None if the stream ended first
+    """
+    keep = len(sentinel) - 1  # A sentinel may straddle two reads
+    pending = b""
+    while True:
+        chunk = await stream.read(READ_CHUNK)
+        if not chunk:
+            reader.feed(pending, final=True)
+            return None
+        pending += chunk
+        idx = pending.find(sentinel)
+        if idx >= 0:
+            reader.feed(pending[:idx], final=True)
+            rest = pending[idx + len(sentinel):]
+            while b"\n" not in rest:
+                more = await stream.read(READ_CHUNK)
+                if not more:
+                    break
+                rest += more
+            return rest.split(b"\n", 1)[0].decode(errors="replace").strip()
+        if len(pending) > keep:
+            reader.feed(pending[:-keep])
+            pending = pending[-keep:]
+
+
+class ShellWorker:
+    """A long-lived bash process that runs RUN commands one at a time."""
+
+    def __init__(self, shell: str = SHELL):
+        self.shell = shell
+        self._proc: Optional[asyncio.subprocess.Process] = None
+        self._lock = asyncio.Lock()
+        self._sentinel = f"__SDQCTL_{uuid.uuid4().hex}__"
+        self.commands_run = 0
+        self.starts = 0
+
+    @property
+    def alive(self) -> bool:
+        return self._proc is not None and self._proc.returncode is None
+
+    async def _start(self) -> asyncio.subprocess.Process:
+        self._proc = await asyncio.create_subprocess_exec(
+            self.shell, "--noprofile", "--norc",
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            start_new_session=os.name == "posix",
+        )
+        self.starts += 1
+        logger.debug(f"Started persistent shell (pid {self._proc.pid})")
+        return self._proc
+
+    def _frame(self, command: str, cwd: Path, env: Optional[dict[str, str]]) -> bytes:
+        exports = "".join(
+            f"  export {key}={shlex.quote(value)}\n" for key, value in (env or {}).items()
+        )
+        script = (
+            f"if builtin cd -- {shlex.quote(str(cwd))}; then\n"
+            f"{exports}"
+            f"  eval {shlex.quote(command)} </dev/null\n"
+            "  __sdqctl_rc=$?\n"
+            "else\n"
+            "  __sdqctl_rc=1\n"
+            "fi\n"
+            f"builtin printf '%s %d\\n' {self._sentinel} \"$__sdqctl_rc\"\n"
+            f"builtin printf '%s\\n' {self._sentinel} >&2\n"
+        )
+        return script.encode()
+
+    async def run(
+        self,
+        command: str,
+        *,
+        timeout: Optional[float],
+        cwd: Path,
+        env: Optional[dict[str, str]] = None,
+        on_output: Optional[Callable[[str, str], None]] = None,
+        should_stop: Optional[Callable[[], bool]] = None,
+        capture_limit: Optional[int] = None,
+        log_dir: Optional[Path] = None,
+    ) -> RunResult:
+        """Run a command in the persistent shell; same contract as run_command().
+
+        Invalid RUN-ENV names are reported as a failed command rather than
+        being passed to the shell.
+        """
+        bad = [key for key in (env or {}) if not key.isidentifier()]
+        if bad:
+            return RunResult(command, 1, "", f"Invalid RUN-ENV name(s): {', '.join(bad)}", 0.0)
+
+        async with self._lock:
+            proc = self._proc if self.alive else await self._start()
+            start = time.perf_counter()
+            stem = f"run-{time.strftime('%Y%m%d-%H%M%S')}-{proc.pid}-{self.commands_run}"
+            buffers, log_files, spills = open_capture(stem, capture_limit, log_dir)
+            sentinel = self._sentinel.encode()
+            out_task = asyncio.ensure_future(_read_frame(
+                proc.stdout, _StreamReader("stdout", buffers["stdout"], on_output), sentinel
+            ))
+            err_task = asyncio.ensure_future(_read_frame(
+                proc.stderr, _StreamReader("stderr", buffers["stderr"], on_output), sentinel
+            ))
+            frames = asyncio.ensure_future(asyncio.gather(out_task, err_task))
+            timed_out = stopped = False
+            returncode = -1
+            self.commands_run += 1
+
+            try:
+                proc.stdin.write(self._frame(command, cwd, env))
+                await proc.stdin.drain()
+                reason = await wait_with_limits(
+                    frames, start + timeout if timeout else None, should_stop
+                )
+                if reason:
+                    timed_out, stopped = reason == "timeout", reason == "stop"
+                    what = f"timed out after {timeout}s" if timed_out else "stop requested"
+                    logger.warning(f"RUN {what}, terminating persistent shell: {command}")
+                    await terminate_process(proc)
+                    await asyncio.wait({frames}, timeout=1)
+                else:
+                    status = out_task.result()
+                    if status is None:
+                        # The command exited the shell (e.g. `exit 3`)
+                        returncode = await proc.wait()
+                        logger.warning(f"Persistent shell exited ({returncode}) during: {command}")
+                    else:
+                        returncode = int(status or 1)
+            except (BrokenPipeError, ConnectionResetError):
+                returncode = await proc.wait()
+            except asyncio.CancelledError:
+                await asyncio.shield(terminate_process(proc))
+                raise
+            finally:
+                for task in (frames, out_task, err_task):
+                    if not task.done():
+                        task.cancel()
+                for spill in spills:
+                    spill.close()
+
+        out, err = buffers["stdout"], buffers["stderr"]
+        return RunResult(
+            command=command,
+            returncode=returncode,
+            stdout=out.text(log_files.get("stdout")),
+            stderr=err.text(log_files.get("stderr")),
+            duration=time.perf_counter() - start,
+            timed_out=timed_out,
+            stopped=stopped,
+            dropped_bytes=out.dropped_bytes + err.dropped_bytes,
+            dropped_lines=out.dropped_lines + err.dropped_lines,
+            log_files=log_files,
+        )
+
+    async def close(self) -> None:
+        """Exit the shell (terminating it if it does not exit promptly)."""
+        proc, self._proc = self._proc, None
+        if proc is None or proc.returncode is not None:
+            return
+        try:
+            proc.stdin.write(b"exit 0\n")
+            await proc.stdin.drain()
+            proc.stdin.close()
+            await asyncio.wait_for(proc.wait(), 1.0)
+        except (OSError, asyncio.TimeoutError):
+            await terminate_process(proc)
+        logger.debug(f"Persistent shell closed after {self.commands_run} commands")
+
+
+def shell_runner(worker: Optional[ShellWorker]) -> Callable[..., Awaitable[RunResult]]:
+    """The function that runs RUN commands: worker.run, or run_command without a worker.
+
+    The returned function takes run_command()'s arguments.
+    """
+    if worker is None:
+        return run_command
+
+    async def run(command: str, *, allow_shell: bool = True, **kwargs) -> RunResult:
+        return await worker.run(command, **kwargs)
+
+    return run
+
+
+def create_shell_worker(conv) -> Optional[ShellWorker]:
+    """A ShellWorker for conv if it uses RUN-SHELL persistent, else None."""
+    if getattr(conv, "run_shell", "fresh") != "persistent":
+        return None
+    if not conv.allow_shell:
+        logger.warning("RUN-SHELL persistent requires ALLOW-SHELL true; using fresh processes")
+        return None
+    if shutil.which(SHELL) is None:
+        logger.warning(f"RUN-SHELL persistent: {SHELL} not found; using fresh processes")
+        return None
+    return ShellWorker()
@@ -11,7 +11,6 @@ Usage:
 """
 
 import json
-from datetime import datetime
 from pathlib import Path
 
 import click
@@ -20,6 +19,7 @@ from rich.table import Table
 
 from .. import __version__
 from ..adapters import get_adapter, list_adapters
+from ..core.session_index import SessionIndex
 from .utils import run_async
 
 console = Console()
@@ -85,10 +85,7 @@ async def _show_overview_async(adapter_name: str, json_output: bool) -> None:
     checkpoint_count = 0
 
     if sessions_dir.exists():
-        session_dirs = list(sessions_dir.iterdir())
-        session_count = len(session_dirs)
-        for session_dir in session_dirs:
-            checkpoint_count += len(list(session_dir.glob("checkpoint-*.json")))
+        session_count, checkpoint_count = _session_index().totals()
 
     available_adapters = list_adapters()
 
@@ -236,10 +233,7 @@ async def _show_all_async(adapter_name: str, json_output: bool) -> None:
     checkpoint_count = 0
 
     if sessions_dir.exists():
-        session_dirs = list(sessions_dir.iterdir())
-        session_count = len(session_dirs)
-        for session_dir in session_dirs:
-            checkpoint_count += len(list(session_dir.glob("checkpoint-*.json")))
+        session_count, checkpoint_count = _session_index().totals()
 
     available_adapters = list_adapters()
 
@@ -374,6 +368,13 @@ def _show_adapters(json_output: bool) -> None:
         console.print(table)
 
 
+def _session_index() -> SessionIndex:
+    """Open the session index, re-indexing any session directories that changed."""
+    index = SessionIndex(SDQCTL_DIR / "sessions")
+    index.sync()
+    return index
+
+
 def _show_sessions(json_output: bool, show_checkpoints: bool = False) -> None:
     """Show session details."""
     sessions_dir = SDQCTL_DIR / "sessions"
@@ -385,34 +386,18 @@ def _show_sessions(json_output: bool, show_checkpoints: bool = False) -> None:
             console.print("[yellow]No sessions found[/yellow]")
         return
 
+    index = _session_index()
     session_data = []
 
-    for session_dir in sorted(sessions_dir.iterdir(), reverse=True):
-        if not session_dir.is_dir():
-            continue
-
-        session_id = session_dir.name
-        checkpoints = list(session_dir.glob("checkpoint-*.json"))
-
+    for row in index.list_sessions(sort="modified", descending=True):
         session_info = {
-            "id": session_id,
-            "checkpoints": len(checkpoints),
-            "modified": datetime.fromtimestamp(session_dir.stat().st_mtime).isoformat(),
+            "id": row["id"],
+            "checkpoints": row["checkpoints"],
+            "modified": row["modified"],
         }
 
-        if show_checkpoints and checkpoints:
-            session_info["checkpoint_details"] = []
-            for cp_file in sorted(checkpoints):
-                try:
-                    cp_data = json.loads(cp_file.read_text())
-                    session_info["checkpoint_details"].append({
-                        "id": cp_data.get("id"),
-                        "name": cp_data.get("name"),
-                        "timestamp": cp_data.get("timestamp"),
-                        "cycle": cp_data.get("cycle_number"),
-                    })
-                except Exception:
-                    pass
+        if show_checkpoints and row["checkpoints"]:
+            session_info["checkpoint_details"] = index.get_checkpoints(row["id"])
 
         session_data.append(session_info)
 
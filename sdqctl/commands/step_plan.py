@@ -0,0 +1,147 @@
+"""
+Compiled step plans for workflow execution.
+
+A workflow's step list does not change between cycles: the PROMPT fallback,
+HELP-INLINE merging, ELIDE grouping and the prompt-turn count depend only on
+the ConversationFile. compile_step_plan() does that work once and returns an
+immutable StepPlan that every cycle walks.
+
+For ELIDE-merged steps the plan also carries the placeholder strings of each
+producer (RUN, VERIFY, REFCAT, LSP, HELP, CONSULT, CUSTOM), in the order the
+producers were merged, and the text of HELP-INLINE placeholders, which is
+static and resolved at compile time.
+"""
+
+import logging
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any, Mapping
+
+from .elide import get_step_type, placeholder, process_elided_steps
+from .iterate_helpers import _merge_help_inline_steps
+
+logger = logging.getLogger("sdqctl.commands.step_plan")
+
+PROMPT_TYPES = frozenset({"prompt", "merged_prompt"})
+
+_EMPTY: Mapping = MappingProxyType({})
+
+
+@dataclass(frozen=True)
+class StepPlan:
+    """Steps of a workflow after HELP-INLINE and ELIDE merging.
+
+    Attributes:
+        steps: Steps to execute, in order
+        total_prompts: Number of prompt turns (prompt and merged_prompt steps)
+        placeholders: Per step, producer kind -> placeholder strings
+        resolved: Per step, placeholder -> text known at compile time
+    """
+
+    steps: tuple[Any, ...]
+    total_prompts: int
+    placeholders: tuple[Mapping[str, tuple[str, ...]], ...]
+    resolved: tuple[Mapping[str, str], ...]
+
+    def __len__(self) -> int:
+        return len(self.steps)
+
+    def __iter__(self):
+        return iter(self.steps)
+
+    def placeholders_for(self, position: int, kind: str) -> tuple[str, ...]:
+        """Placeholder strings of one producer kind in the step at position."""
+        return self.placeholders[position].get(kind, ())
+
+
+def _producer_placeholders(step) -> Mapping[str, tuple[str, ...]]:
+    """Placeholder strings of a merged step, keyed by producer kind."""
+    if get_step_type(step) != "merged_prompt":
+        return _EMPTY
+    return MappingProxyType({
+        "RUN": tuple(
+            placeholder("RUN", i, cmd)
+            for i, cmd in enumerate(getattr(step, "run_commands", []))
+        ),
+        "VERIFY": tuple(
+            placeholder("VERIFY", i, verify_type)
+            for i, (verify_type, _) in enumerate(getattr(step, "verify_commands", []))
+        ),
+        "REFCAT": tuple(
+            placeholder("REFCAT", i, ref)
+            for i, ref in enumerate(getattr(step, "refcat_commands", []))
+        ),
+        "LSP": tuple(
+            placeholder("LSP", i, query)
+            for i, (query, _) in enumerate(getattr(step, "lsp_commands", []))
+        ),
+        "HELP": tuple(
+            placeholder("HELP", i, topics)
+            for i, topics in enumerate(getattr(step, "help_inline_commands", []))
+        ),
+        "CONSULT": tuple(
+            placeholder("CONSULT", i, consult_prompt)
+            for i, consult_prompt in enumerate(getattr(step, "consult_commands", []))
+        ),
+        "CUSTOM": tuple(
+            placeholder("CUSTOM", i, name)
+            for i, (name, _, _) in enumerate(getattr(step, "custom_directives", []))
+        ),
+    })
+
+
+def render_help_topics(topic_list: str) -> str:
+    """Render the help text that replaces a HELP placeholder."""
+    from ..core.help_topics import TOPICS
+
+    parts = []
+    for topic in topic_list.strip().split():
+        if topic.lower() in TOPICS:
+            parts.append(f"## {topic.upper()}\n{TOPICS[topic.lower()]}")
+        else:
+            parts.append(f"## {topic.upper()}\n[Unknown help topic: {topic}]")
+    return "\n\n".join(parts)
+
+
+def _resolved_text(step, placeholders: Mapping[str, tuple[str, ...]]) -> Mapping[str, str]:
+    """Placeholder replacements that do not depend on execution."""
+    help_placeholders = placeholders.get("HELP", ())
+    if not help_placeholders:
+        return _EMPTY
+    topic_lists = getattr(step, "help_inline_commands", [])
+    return MappingProxyType({
+        ph: render_help_topics(topics)
+        for ph, topics in zip(help_placeholders, topic_lists)
+    })
+
+
+def compile_step_plan(conv) -> StepPlan:
+    """Compile a ConversationFile into the plan executed by every cycle.
+
+    Uses conv.steps when present, otherwise one prompt step per PROMPT
+    (backward compatibility), then merges HELP-INLINE steps into the
+    following prompt and ELIDE groups into merged_prompt steps.
+
+    Args:
+        conv: Parsed ConversationFile
+
+    Returns:
+        Immutable StepPlan
+    """
+    steps = conv.steps if conv.steps else [
+        {"type": "prompt", "content": p} for p in conv.prompts
+    ]
+    steps = _merge_help_inline_steps(steps, conv)
+    steps = process_elided_steps(steps)
+
+    placeholders = tuple(_producer_placeholders(step) for step in steps)
+    plan = StepPlan(
+        steps=tuple(steps),
+        total_prompts=sum(1 for s in steps if get_step_type(s) in PROMPT_TYPES),
+        placeholders=placeholders,
+        resolved=tuple(
+            _resolved_text(step, phs) for step, phs in zip(steps, placeholders)
+        ),
+    )
+    logger.debug(f"Compiled {len(plan)} steps ({plan.total_prompts} prompt turns)")
+    return plan
@@ -0,0 +1,138 @@
+"""
+Background checkpoint persistence.
+
+Serializing and writing a checkpoint (journal append, header file) used to
+run inline in the cycle loop, blocking the asyncio event loop - and with it
+adapter event handling - while large histories were encoded. The session now
+snapshots what a checkpoint needs (the new message objects and the state
+header) synchronously and hands the serialization and I/O to a single writer
+thread.
+
+Ordering:
+    Tasks run one at a time in submission order, so a journal never has a
+    gap and a header file is only written after the messages it covers.
+
+Durability:
+    Every file is flushed and fsync'd before it is closed. flush() is a
+    barrier: it returns once everything submitted so far is on disk, and
+    re-raises the first write error since the last flush. PAUSE checkpoints
+    flush before returning their path, and an atexit hook flushes whatever
+    is still queued when the process exits.
+"""
+
+import atexit
+import logging
+import os
+import queue
+import threading
+from pathlib import Path
+from typing import Callable, Optional
+
+logger = logging.getLogger("sdqctl.core.checkpoint_writer")
+
+
+def write_durable(path: Path, data: bytes, append: bool = False) -> None:
+    """Write (or append) bytes to a file and fsync before closing it."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "ab" if append else "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+class CheckpointWriter:
+    """Runs checkpoint write tasks on a background thread, in order."""
+
+    def __init__(self):
+        self._queue: queue.Queue[Optional[Callable[[], None]]] = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._error: Optional[BaseException] = None
+
+    @property
+    def pending(self) -> int:
+        """Number of tasks submitted but not yet finished."""
+        return self._queue.unfinished_tasks
+
+    def submit(self, task: Callable[[], None]) -> None:
+        """Queue a write task; it runs after every task submitted before it."""
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="sdqctl-checkpoint-writer", daemon=True
+                )
+                self._thread.start()
+        self._queue.put(task)
+
+    def flush(self) -> None:
+        """Block until every submitted task has finished.
+
+        Raises:
+            OSError (or whatever the failing task raised): The first error
+                since the previous flush
+        """
+        self._queue.join()
+        error, self._error = self._error, None
+        if error is not None:
+            raise error
+
+    def close(self) -> None:
+        """Flush pending tasks and stop the writer thread."""
+        try:
+            self.flush()
+        finally:
+            with self._lock:
+                if self._thread is not None and self._thread.is_alive():
+                    self._queue.put(None)
+                    self._thread.join()
+                self._thread = None
+
+    def _run(self) -> None:
+        while True:
+            task = self._queue.get()
+            try:
+                if task is None:
+                    return
+                task()
+            except Exception as e:
+                logger.error(f"Checkpoint write failed: {e}")
+                if self._error is None:
+                    self._error = e
+            finally:
+                self._queue.task_done()
+
+
+# Global shared writer
+_checkpoint_writer: Optional[CheckpointWriter] = None
+
+
+def get_checkpoint_writer() -> CheckpointWriter:
+    """Get the process-wide checkpoint writer."""
+    global _checkpoint_writer
+    if _checkpoint_writer is None:
+        _checkpoint_writer = CheckpointWriter()
+    return _checkpoint_writer
+
+
+def flush_checkpoints() -> None:
+    """Wait for all queued checkpoint writes (no-op if nothing was queued)."""
+    if _checkpoint_writer is not None:
+        _checkpoint_writer.flush()
+
+
+def clear_checkpoint_writer() -> None:
+    """Flush and stop the process-wide writer (useful for testing)."""
+    global _checkpoint_writer
+    if _checkpoint_writer is not None:
+        writer, _checkpoint_writer = _checkpoint_writer, None
+        writer.close()
+
+
+def _flush_at_exit() -> None:
+    try:
+        flush_checkpoints()
+    except Exception as e:
+        logger.error(f"Checkpoint write failed at exit: {e}")
+
+
+atexit.register(_flush_at_exit)
@@ -11,6 +11,8 @@ from typing import Optional
 
 import yaml
 
+from .retention import parse_size
+
 
 @dataclass
 class ConfigDefaults:
@@ -24,6 +26,10 @@ class ConfigContext:
     """Context settings from config file."""
     limit: float = 0.8  # 80%
     on_limit: str = "compact"
+    tokenizer: str = "auto"  # auto, heuristic, bpe (see core/tokenizer.py)
+    tokenizer_vocab: Optional[str] = None  # Path to tiktoken-format vocabulary
+    load_workers: int = 8  # Threads for loading CONTEXT files (1 = sequential)
+    prefetch: bool = True  # Prepare the next step's inputs during model turns
 
 
 @dataclass
@@ -31,6 +37,18 @@ class ConfigCheckpoints:
     """Checkpoint settings from config file."""
     enabled: bool = True
     directory: str = ".sdqctl/checkpoints"
+    compression: str = "none"  # Session journal encoding: none, gzip, zstd
+    keep_last: int = 0  # Checkpoint headers kept per session (0 = all)
+    max_bytes: int = 0  # Cap on ~/.sdqctl/sessions, LRU-evicted (0 = no cap)
+
+
+@dataclass
+class ConfigRun:
+    """RUN command settings from config file."""
+    capture_bytes: int = 2 * 1024 * 1024  # Output kept in memory per stream (head + tail)
+    log_dir: Optional[str] = None  # Spill full RUN output to files here (None = off)
+    cache_dir: Optional[str] = None  # RUN-CACHE entries (None = ~/.sdqctl/run-cache)
+    cache_max_bytes: int = 256 * 1024 * 1024  # Cap on cache_dir, LRU-evicted
 
 
 @dataclass
@@ -40,6 +58,7 @@ class Config:
     defaults: ConfigDefaults = field(default_factory=ConfigDefaults)
     context: ConfigContext = field(default_factory=ConfigContext)
     checkpoints: ConfigCheckpoints = field(default_factory=ConfigCheckpoints)
+    run: ConfigRun = field(default_factory=ConfigRun)
     source_path: Optional[Path] = None
 
     @classmethod
@@ -66,12 +85,38 @@ class Config:
             elif isinstance(limit, (int, float)):
                 config.context.limit = float(limit) if limit <= 1 else float(limit) / 100
             config.context.on_limit = ctx.get("on_limit", config.context.on_limit)
+            config.context.tokenizer = ctx.get("tokenizer", config.context.tokenizer)
+            config.context.tokenizer_vocab = ctx.get(
+                "tokenizer_vocab", config.context.tokenizer_vocab
+            )
+            config.context.load_workers = max(
+                1, int(ctx.get("load_workers", config.context.load_workers))
+            )
+            config.context.prefetch = bool(ctx.get("prefetch", config.context.prefetch))
 
         # Checkpoints
         if "checkpoints" in data and isinstance(data["checkpoints"], dict):
             cp = data["checkpoints"]
             config.checkpoints.enabled = cp.get("enabled", config.checkpoints.enabled)
             config.checkpoints.directory = cp.get("directory", config.checkpoints.directory)
+            compression = str(cp.get("compression", config.checkpoints.compression)).lower()
+            if compression in ("none", "gzip", "zstd"):
+                config.checkpoints.compression = compression
+            config.checkpoints.keep_last = max(
+                0, int(cp.get("keep_last", config.checkpoints.keep_last))
+            )
+            if cp.get("max_size") is not None:
+                config.checkpoints.max_bytes = parse_size(cp["max_size"])
+
+        # RUN
+        if "run" in data and isinstance(data["run"], dict):
+            run = data["run"]
+            if run.get("capture_limit") is not None:
+                config.run.capture_bytes = max(1024, parse_size(run["capture_limit"]))
+            config.run.log_dir = run.get("log_dir", config.run.log_dir)
+            config.run.cache_dir = run.get("cache_dir", config.run.cache_dir)
+            if run.get("cache_max_size") is not None:
+                config.run.cache_max_bytes = parse_size(run["cache_max_size"])
 
         return config
 
@@ -165,6 +210,36 @@ def get_context_limit() -> float:
     return load_config().context.limit
 
 
+def get_context_load_workers() -> int:
+    """Get number of threads used to load CONTEXT files from config."""
+    return load_config().context.load_workers
+
+
+def get_context_prefetch() -> bool:
+    """Get whether iterate prefetches the next step's inputs from config."""
+    return load_config().context.prefetch
+
+
 def get_checkpoint_directory() -> str:
     """Get checkpoint directory from config."""
     return load_config().checkpoints.directory
+
+
+def get_checkpoint_compression() -> str:
+    """Get session journal compression (none, gzip, zstd) from config."""
+    return load_config().checkpoints.compression
+
+
+def get_run_capture_bytes() -> int:
+    """Get the per-stream RUN output kept in memory from config."""
+    return load_config().run.capture_bytes
+
+
+def get_run_log_dir() -> Optional[str]:
+    """Get the directory RUN output is spilled to from config (None = off)."""
+    return load_config().run.log_dir
+
+
+def get_run_cache_dir() -> Optional[str]:
+    """Get the RUN-CACHE entry directory from config (None = default)."""
+    return load_config().run.cache_dir
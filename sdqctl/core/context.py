@@ -3,42 +3,220 @@ Context management for AI workflows.
 
 Handles:
 - File inclusion via @path syntax
-- Glob pattern expansion
+- Glob pattern expansion (see glob_index.py)
 - Context window tracking
 - Compaction triggers
+- Cached file reads across cycles (see file_cache.py)
+- Packing files into a token budget (omitted files become outline stubs)
+- Change tracking for diff session mode (unified diffs of edited files)
+- Lazy file content (re-read on demand, verified by content hash)
+- Deduplication of files matched more than once (by real path or content)
+- Per-file and per-pattern token caps (oversized files are elided)
 
 Token Estimation Note:
-    Token counts are estimated using a simple heuristic of ~4 characters per token.
-    This is a rough approximation that works reasonably well for English text and code.
-    Actual token counts vary by model and content type:
-    - GPT models: use tiktoken for accurate counts
-    - Claude models: typically ~3.5 chars/token for code
-
-    For precise token budgeting, consider integrating tiktoken or model-specific
-    tokenizers. The current heuristic prioritizes simplicity and zero dependencies.
+    Token counts come from the active tokenizer (see tokenizer.py). When a
+    local BPE vocabulary is available counts are close estimates for that
+    vocabulary (the pre-tokenizer split is approximated, so they are not
+    exact); otherwise a ~4 characters per token heuristic is used. The
+    heuristic works reasonably for English text but can be off by 30% on
+    code. Leave headroom when budgeting either way.
 """
 
+import difflib
+import fnmatch
+import hashlib
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Optional
+from typing import Iterator, Optional, TextIO
+
+from .file_cache import FileContentCache, get_file_cache
+from .glob_index import get_glob_index
+from .outline import elide_content, extract_outline
+from .tokenizer import count_tokens, get_tokenizer
+
+logger = logging.getLogger("sdqctl.core.context")
+
+# Smaller identical files are all sent; a duplicate note would save next to nothing
+MIN_DEDUP_BYTES = 512
 
 
 def estimate_tokens(content: str) -> int:
     """Estimate token count for content.
 
-    Uses ~4 characters per token heuristic. This is approximate;
-    see module docstring for accuracy considerations.
+    Delegates to the active tokenizer; see module docstring for
+    accuracy considerations.
     """
-    return len(content) // 4
+    return count_tokens(content)
+
+
+def _get_default_load_workers() -> int:
+    """Get default CONTEXT loader thread count from config (lazy import)."""
+    try:
+        from .config import get_context_load_workers
+        return get_context_load_workers()
+    except ImportError:
+        return 8
+
+
+def _fair_share_cap(token_counts: list[int], limit: int) -> Optional[int]:
+    """Largest per-file cap such that the capped counts sum to at most limit.
+
+    Small files stay whole; only the largest ones are cut down to the cap.
+    Returns None if the counts already fit.
+    """
+    if sum(token_counts) <= limit:
+        return None
+    remaining = limit
+    ordered = sorted(token_counts)
+    for i, tokens in enumerate(ordered):
+        share = remaining // (len(ordered) - i)
+        if tokens > share:
+            return share
+        remaining -= tokens
+    return None
+
+
+def content_hash(content: str) -> str:
+    """Stable hash of file content, used to detect changes between loads."""
+    return hashlib.blake2b(content.encode("utf-8"), digest_size=16).hexdigest()
 
 
-@dataclass
 class ContextFile:
-    """A file included in the context."""
+    """A file included in the context.
+
+    Files loaded by ContextManager don't keep their content: only the path,
+    token estimate and content hash stay resident, and `content` is fetched
+    on access from the shared file cache or, failing that, re-read from disk
+    and checked against the stored hash. Files constructed with content
+    keep it.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        content: Optional[str] = None,
+        tokens_estimate: int = 0,  # Approximate; see estimate_tokens()
+        mtime: float = 0.0,  # Modification time when loaded (for packing recency)
+        digest: Optional[str] = None,
+        file_cache: Optional[FileContentCache] = None,
+        size: int = 0,  # Size on disk in bytes
+        elided_tokens: int = 0,  # Tokens removed by token-cap elision
+    ):
+        self.path = path
+        self.tokens_estimate = tokens_estimate
+        self.mtime = mtime
+        self.size = size
+        self.elided_tokens = elided_tokens
+        if digest is None:
+            digest = content_hash(content) if content is not None else ""
+        self.digest = digest
+        self._content = content
+        self._file_cache = file_cache
+
+    def __repr__(self) -> str:
+        return (
+            f"ContextFile(path={self.path!r}, tokens_estimate={self.tokens_estimate}, "
+            f"loaded={self.is_loaded})"
+        )
+
+    @property
+    def is_loaded(self) -> bool:
+        """Whether content is held in memory (rather than fetched on access)."""
+        return self._content is not None
+
+    @property
+    def content(self) -> str:
+        """File content, materialized on demand for lazy files."""
+        if self._content is not None:
+            return self._content
+        return self._materialize()
+
+    def _materialize(self) -> str:
+        """Fetch content from the file cache or disk without retaining it.
+
+        A file that vanished or became unreadable since it was loaded is
+        replaced by a stub saying so. A file whose content changed is
+        returned as it is now, with digest and token estimate recomputed.
+        """
+        try:
+            st = self.path.stat()
+        except OSError as e:
+            logger.warning(f"Context file disappeared since it was loaded: {self.path} ({e})")
+            return self._unavailable("removed")
+
+        if self._file_cache is not None:
+            cached = self._file_cache.get(self.path, st)
+            if cached is not None and cached.digest == self.digest:
+                return cached.content
+
+        try:
+            content = self.path.read_text()
+        except Exception as e:
+            logger.warning(f"Failed to re-read context file {self.path}: {e}")
+            return self._unavailable("unreadable")
+
+        digest = content_hash(content)
+        if digest != self.digest:
+            logger.warning(
+                f"Context file changed since it was loaded: {self.path} "
+                "(token estimate recomputed)"
+            )
+            self.digest = digest
+            self.tokens_estimate = estimate_tokens(content)
+            self.mtime = st.st_mtime
+            self.size = st.st_size
+            if self._file_cache is not None:
+                self._file_cache.put(self.path, st, content, self.tokens_estimate, digest)
+        return content
+
+    def _unavailable(self, reason: str) -> str:
+        """Stub sent in place of a file that can no longer be read."""
+        stub = f"[File {reason} since it was loaded: {self.path}]"
+        self.digest = content_hash(stub)
+        self.tokens_estimate = estimate_tokens(stub)
+        self.size = 0
+        return stub
+
+
+@dataclass
+class DuplicateFile:
+    """A matched file skipped because the same file or content was already loaded."""
 
     path: Path
-    content: str
-    tokens_estimate: int  # Approximate; see estimate_tokens()
+    same_as: Path  # Path of the copy that was kept
+    size: int  # Bytes not sent
+    tokens: int  # Tokens of the skipped copy
+    note: str = ""  # Line shown in place of the file ("" if path was already listed)
+    note_tokens: int = 0
+
+
+@dataclass
+class OmittedFile:
+    """A context file replaced by a path+outline stub to fit the token budget."""
+
+    file: ContextFile
+    stub: str
+    stub_tokens: int
+
+
+@dataclass
+class ContextPack:
+    """Result of packing context files into a token budget."""
+
+    budget: int
+    included: list[ContextFile]
+    omitted: list[OmittedFile]
+
+    @property
+    def tokens(self) -> int:
+        """Tokens of included files plus omitted-file stubs."""
+        return (
+            sum(f.tokens_estimate for f in self.included)
+            + sum(o.stub_tokens for o in self.omitted)
+        )
 
 
 @dataclass
@@ -75,12 +253,39 @@ class ContextManager:
         max_tokens: int = 128000,
         limit_threshold: float = 0.8,
         path_filter: Optional[callable] = None,
+        file_cache: Optional[FileContentCache] = None,
+        token_budget: Optional[int] = None,
+        priority_patterns: Optional[list[str]] = None,
+        load_workers: Optional[int] = None,
+        file_token_limit: Optional[int] = None,
+        pattern_token_limit: Optional[int] = None,
     ):
         self.base_path = base_path or Path.cwd()
         self.window = ContextWindow(max_tokens=max_tokens, limit_threshold=limit_threshold)
         self.files: list[ContextFile] = []
         self.conversation_tokens: int = 0
         self.path_filter = path_filter  # Optional filter: (path: str) -> bool
+        # Shared across ContextManagers so fresh-mode reloads skip unchanged files
+        self.file_cache = file_cache if file_cache is not None else get_file_cache()
+        # Packing: explicit CONTEXT token budget (None = fit the context limit)
+        # and patterns whose matches are kept first (CONTEXT-PRIORITY)
+        self.token_budget = token_budget
+        self.priority_patterns = list(priority_patterns or [])
+        self.omitted: list[OmittedFile] = []
+        # Threads used by add_pattern to read matched files (context.load_workers)
+        self.load_workers = (
+            load_workers if load_workers is not None else _get_default_load_workers()
+        )
+        # Token caps: files (or a pattern's files together) over these are elided
+        self.file_token_limit = file_token_limit
+        self.pattern_token_limit = pattern_token_limit
+        # Deduplication: real paths and content hashes of loaded files
+        self.duplicates: list[DuplicateFile] = []
+        self._seen_realpaths: dict[str, Path] = {}
+        self._seen_digests: dict[str, Path] = {}
+        # Diff mode: path -> (content hash, text, is stub) as last sent to the
+        # model; text is the outline stub for files that were packed out
+        self._injected: dict[str, tuple[str, str, bool]] = {}
 
     def resolve_pattern(self, pattern: str) -> list[Path]:
         """Resolve a context pattern to file paths.
@@ -117,19 +322,11 @@ class ContextManager:
 
         # Check if it's a glob pattern
         if "*" in pattern or "?" in pattern or "[" in pattern:
-            # Use Python's glob module for proper pattern matching
-            import glob as glob_module
-
-            pattern_str = str(full_pattern)
-
-            # Handle ** recursive patterns
-            if "**" in pattern:
-                matches = list(glob_module.glob(pattern_str, recursive=True))
-            else:
-                # For patterns like mapping/*/README.md, use glob directly
-                matches = list(glob_module.glob(pattern_str))
-
-            return [Path(m) for m in matches if Path(m).is_file()]
+            # Shared index reuses directory listings across resolutions
+            matches = get_glob_index().glob(
+                str(full_pattern), recursive="**" in pattern, files_only=True
+            )
+            return [Path(m) for m in matches]
         else:
             # Single file
             if full_pattern.exists() and full_pattern.is_file():
@@ -140,78 +337,464 @@ class ContextManager:
         """Add a file to the context.
 
         Respects path_filter if configured (e.g., for DENY-FILES restrictions).
+        Content is served from the file cache when the file's stat identity
+        (mtime, size, inode) is unchanged since it was last read.
+
+        Files over file_token_limit are elided (see _cap_file).
+
+        Returns None if the file is filtered out, unreadable, or a duplicate
+        of a file already in the context.
         """
-        if not path.exists():
+        ctx_file = self._load_file(path)
+        if not ctx_file or not self._claim_file(ctx_file):
             return None
+        if self.file_token_limit is not None:
+            ctx_file = self._cap_file(ctx_file, self.file_token_limit)
+        self._append_file(ctx_file)
+        return ctx_file
 
-        # Apply path filter if configured
-        if self.path_filter is not None:
-            if not self.path_filter(str(path)):
-                return None  # Filtered out by restrictions
+    def add_pattern(self, pattern: str) -> list[ContextFile]:
+        """Add files matching a pattern to the context.
+
+        Matched files are read on up to load_workers threads; results keep
+        the pattern's match order, and a file that fails to load is skipped
+        without affecting the others. Files are then elided to fit
+        file_token_limit and, together, pattern_token_limit.
+        """
+        paths = self.resolve_pattern(pattern)
+        workers = min(self.load_workers, len(paths))
+        if workers > 1:
+            with ThreadPoolExecutor(
+                max_workers=workers, thread_name_prefix="sdqctl-context"
+            ) as pool:
+                loaded = list(pool.map(self._load_file, paths))
+        else:
+            loaded = [self._load_file(path) for path in paths]
+
+        added = [f for f in loaded if f and self._claim_file(f)]
+
+        cap = self.file_token_limit
+        if self.pattern_token_limit is not None:
+            pattern_cap = _fair_share_cap(
+                [f.tokens_estimate for f in added], self.pattern_token_limit
+            )
+            if pattern_cap is not None:
+                cap = pattern_cap if cap is None else min(cap, pattern_cap)
+        if cap is not None:
+            added = [self._cap_file(f, cap) for f in added]
+
+        for ctx_file in added:
+            self._append_file(ctx_file)
+        return added
+
+    def _load_file(self, path: Path) -> Optional[ContextFile]:
+        """Read a file (or take it from the file cache) without adding it.
 
+        Thread-safe; returns None if the file is filtered out or unreadable.
+        """
         try:
-            content = path.read_text()
-        except Exception:
+            st = path.stat()
+        except OSError:
             return None
 
-        tokens = estimate_tokens(content)
+        # Apply path filter if configured
+        if self.path_filter is not None:
+            if not self.path_filter(str(path)):
+                return None  # Filtered out by restrictions
 
-        ctx_file = ContextFile(path=path, content=content, tokens_estimate=tokens)
+        cached = self.file_cache.get(path, st)
+        if cached is not None:
+            tokens, digest = cached.tokens, cached.digest
+        else:
+            try:
+                content = path.read_text()
+            except Exception:
+                return None
+            tokens = estimate_tokens(content)
+            digest = content_hash(content)
+            self.file_cache.put(path, st, content, tokens, digest)
+
+        # Content is not retained; it is fetched again when the prompt is built
+        return ContextFile(
+            path=path,
+            tokens_estimate=tokens,
+            mtime=st.st_mtime,
+            digest=digest,
+            file_cache=self.file_cache,
+            size=st.st_size,
+        )
+
+    def _claim_file(self, ctx_file: ContextFile) -> bool:
+        """Register a loaded file, unless it duplicates one already loaded.
+
+        Files already loaded under the same real path (overlapping patterns,
+        symlinks) or with identical content (vendored copies) are recorded as
+        duplicates instead. A duplicate under a different path is listed by
+        name so the model still knows it exists. Files smaller than
+        MIN_DEDUP_BYTES are never deduplicated by content: empty __init__.py
+        files and small fixtures are identical by design, and each is sent
+        under its own path.
+
+        Returns:
+            True if the file is new and should be added, False if duplicate
+        """
+        realpath = os.path.realpath(ctx_file.path)
+        original = self._seen_realpaths.get(realpath)
+        dedup_content = ctx_file.digest and ctx_file.size >= MIN_DEDUP_BYTES
+        if original is None and dedup_content:
+            original = self._seen_digests.get(ctx_file.digest)
+        if original is not None:
+            self._add_duplicate(ctx_file, original)
+            return False
+
+        self._seen_realpaths[realpath] = ctx_file.path
+        if dedup_content:
+            self._seen_digests[ctx_file.digest] = ctx_file.path
+        return True
+
+    def _append_file(self, ctx_file: ContextFile) -> None:
+        """Add a claimed file and count its tokens."""
         self.files.append(ctx_file)
-        self.window.used_tokens += tokens
+        self.window.used_tokens += ctx_file.tokens_estimate
 
-        return ctx_file
+    def _cap_file(self, ctx_file: ContextFile, max_tokens: int) -> ContextFile:
+        """Elide a file to at most max_tokens, keeping head, tail and signatures.
 
-    def add_pattern(self, pattern: str) -> list[ContextFile]:
-        """Add files matching a pattern to the context."""
-        paths = self.resolve_pattern(pattern)
-        added = []
-        for path in paths:
-            ctx_file = self.add_file(path)
-            if ctx_file:
-                added.append(ctx_file)
-        return added
+        Returns the file unchanged if it fits, otherwise a new ContextFile
+        holding the elided text (the original content hash is kept so change
+        detection still tracks the file on disk).
+        """
+        if ctx_file.tokens_estimate <= max_tokens:
+            return ctx_file
+
+        content = ctx_file.content
+        chars_per_token = len(content) / max(1, ctx_file.tokens_estimate)
+        max_chars = int(max_tokens * chars_per_token)
+        # The char budget is an estimate; shrink until the token count fits
+        for _ in range(5):
+            elided = elide_content(content, ctx_file.path, max_chars)
+            tokens = estimate_tokens(elided)
+            if tokens <= max_tokens or max_chars <= 0:
+                break
+            max_chars = int(max_chars * max_tokens / tokens * 0.9)
+
+        return ContextFile(
+            path=ctx_file.path,
+            content=elided,
+            tokens_estimate=tokens,
+            mtime=ctx_file.mtime,
+            digest=ctx_file.digest,
+            size=ctx_file.size,
+            elided_tokens=ctx_file.tokens_estimate - tokens,
+        )
+
+    def _add_duplicate(self, ctx_file: ContextFile, original: Path) -> None:
+        """Record a skipped duplicate (and its one-line note, if any)."""
+        note = ""
+        listed = {d.path for d in self.duplicates} | {original}
+        if ctx_file.path not in listed:
+            note = (
+                f"- {self._display_path(ctx_file.path)} "
+                f"(same content as {self._display_path(original)})\n"
+            )
+        duplicate = DuplicateFile(
+            path=ctx_file.path,
+            same_as=original,
+            size=ctx_file.size,
+            tokens=ctx_file.tokens_estimate,
+            note=note,
+            note_tokens=estimate_tokens(note) if note else 0,
+        )
+        self.duplicates.append(duplicate)
+        self.window.used_tokens += duplicate.note_tokens
 
     def add_conversation_turn(self, content: str) -> None:
         """Track tokens from a conversation turn."""
-        tokens = len(content) // 4
+        tokens = estimate_tokens(content)
         self.conversation_tokens += tokens
         self.window.used_tokens += tokens
 
-    def get_context_content(self) -> str:
-        """Get formatted context content for inclusion in prompts."""
-        if not self.files:
-            return ""
+    @property
+    def file_budget(self) -> int:
+        """Token budget for CONTEXT files.
 
-        parts = ["## Context Files\n"]
-        for ctx_file in self.files:
-            try:
-                if self.base_path:
-                    rel_path = ctx_file.path.relative_to(self.base_path)
+        Uses the explicit token_budget if set, otherwise whatever the
+        context limit leaves after conversation tokens.
+        """
+        if self.token_budget is not None:
+            return self.token_budget
+        limit_tokens = int(self.window.max_tokens * self.window.limit_threshold)
+        return max(0, limit_tokens - self.conversation_tokens)
+
+    def pack(self, budget: Optional[int] = None) -> ContextPack:
+        """Select and order loaded files to fit a token budget.
+
+        When all files fit, nothing changes. Otherwise files are ranked by
+        priority hint (first matching CONTEXT-PRIORITY pattern), then recency
+        (newest mtime first), then size (smallest first), and kept greedily
+        while they fit. Files that don't fit are replaced by path+outline
+        stubs, and window usage is reduced accordingly.
+
+        Args:
+            budget: Token budget (defaults to file_budget)
+
+        Returns:
+            ContextPack describing included and omitted files
+        """
+        if budget is None:
+            budget = self.file_budget
+
+        # Re-pack from the full set so a larger budget can restore files
+        candidates = self.files + [o.file for o in self.omitted]
+        self.window.used_tokens -= self._file_tokens()
+
+        if sum(f.tokens_estimate for f in candidates) <= budget:
+            included, omitted = candidates, []
+        else:
+            stubs = {id(f): self._make_stub(f) for f in candidates}
+            ranked = sorted(candidates, key=self._pack_rank)
+            # Start from "everything stubbed"; promote files while they fit
+            remaining = budget - sum(stub.stub_tokens for stub in stubs.values())
+            included, omitted = [], []
+            for ctx_file in ranked:
+                stub = stubs[id(ctx_file)]
+                extra = ctx_file.tokens_estimate - stub.stub_tokens
+                if extra <= remaining:
+                    included.append(ctx_file)
+                    remaining -= extra
                 else:
-                    rel_path = ctx_file.path
-            except ValueError:
-                # File is not in base_path subtree, use absolute or name
-                rel_path = ctx_file.path
-            parts.append(f"### {rel_path}\n```\n{ctx_file.content}\n```\n")
+                    omitted.append(stub)
+
+        self.files = included
+        self.omitted = omitted
+        self.window.used_tokens += self._file_tokens()
+        return ContextPack(budget=budget, included=included, omitted=omitted)
+
+    def _pack_rank(self, ctx_file: ContextFile) -> tuple:
+        """Sort key for packing: priority hint, then newest, then smallest."""
+        priority = len(self.priority_patterns)
+        path_str = str(ctx_file.path)
+        rel_str = str(self._display_path(ctx_file.path))
+        for idx, pattern in enumerate(self.priority_patterns):
+            pattern = pattern[1:] if pattern.startswith("@") else pattern
+            if fnmatch.fnmatch(rel_str, pattern) or fnmatch.fnmatch(path_str, pattern):
+                priority = idx
+                break
+        return (priority, -ctx_file.mtime, ctx_file.tokens_estimate)
+
+    def _make_stub(self, ctx_file: ContextFile) -> OmittedFile:
+        """Build the path+outline stub that stands in for an omitted file."""
+        lines = [f"### {self._display_path(ctx_file.path)} "
+                 f"(omitted, ~{ctx_file.tokens_estimate} tokens)"]
+        outline = extract_outline(ctx_file.content, ctx_file.path)
+        if outline:
+            lines.append("```")
+            lines.extend(f"{lineno}: {text}" for lineno, text in outline)
+            lines.append("```")
+        stub = "\n".join(lines) + "\n"
+        return OmittedFile(file=ctx_file, stub=stub, stub_tokens=estimate_tokens(stub))
+
+    def _file_tokens(self) -> int:
+        """Tokens attributed to CONTEXT files (full files, stubs, duplicate notes)."""
+        return (
+            sum(f.tokens_estimate for f in self.files)
+            + sum(o.stub_tokens for o in self.omitted)
+            + sum(d.note_tokens for d in self.duplicates)
+        )
+
+    def _display_path(self, path: Path) -> Path:
+        """Path relative to base_path when possible."""
+        try:
+            if self.base_path:
+                return path.relative_to(self.base_path)
+        except ValueError:
+            # File is not in base_path subtree, use absolute or name
+            pass
+        return path
 
-        return "\n".join(parts)
+    def get_context_content(self) -> str:
+        """Get formatted context content for inclusion in prompts.
+
+        Built with a single join over iter_context_content(), so file
+        contents are copied once.
+        """
+        return "".join(self.iter_context_content())
+
+    def iter_context_content(self) -> Iterator[str]:
+        """Yield formatted context content in chunks.
+
+        File contents are yielded as-is rather than formatted into larger
+        strings, so callers can stream a large context to a file or pipe
+        without building it in memory. Concatenating the chunks gives
+        exactly get_context_content().
+        """
+        if not self.files and not self.omitted:
+            return
+
+        notes = [d.note for d in self.duplicates if d.note]
+        file_tokens = self._file_tokens()
+        try:
+            yield "## Context Files\n"
+            for ctx_file in self.files:
+                rel_path = self._display_path(ctx_file.path)
+                if ctx_file.elided_tokens:
+                    total = ctx_file.tokens_estimate + ctx_file.elided_tokens
+                    rel_path = f"{rel_path} (elided from ~{total} tokens)"
+                yield f"\n### {rel_path}\n```\n"
+                yield ctx_file.content
+                yield "\n```\n"
+
+            if self.omitted:
+                yield (
+                    "\n## Omitted Context Files\n\n"
+                    "These files exceeded the context token budget; read them directly "
+                    "if needed.\n"
+                )
+                for omitted in self.omitted:
+                    yield "\n"
+                    yield omitted.stub
+
+            if notes:
+                yield "\n## Duplicate Context Files\n\nIdentical to files above:\n"
+                yield from notes
+        finally:
+            self._reconcile_file_tokens(file_tokens)
+
+    def _reconcile_file_tokens(self, file_tokens: int) -> None:
+        """Update the window after lazy files were materialized.
+
+        Reading a lazy file re-estimates its tokens if it changed since it
+        was loaded (see ContextFile._materialize), so callers that read file
+        contents pass the _file_tokens() total from before reading.
+        """
+        self.window.used_tokens += self._file_tokens() - file_tokens
+
+    def write_context_content(self, out: TextIO) -> int:
+        """Stream formatted context content to a text stream.
+
+        Returns:
+            Number of characters written
+        """
+        written = 0
+        for chunk in self.iter_context_content():
+            out.write(chunk)
+            written += len(chunk)
+        return written
 
     def clear_files(self) -> None:
         """Clear loaded files (for compaction)."""
-        file_tokens = sum(f.tokens_estimate for f in self.files)
-        self.window.used_tokens -= file_tokens
+        self.window.used_tokens -= self._file_tokens()
         self.files = []
+        self.omitted = []
+        self.duplicates = []
+        self._seen_realpaths = {}
+        self._seen_digests = {}
+
+    def mark_injected(self) -> None:
+        """Record loaded file contents as sent to the model.
+
+        Sets the baseline that get_context_diff() compares against. Files
+        packed out of the budget are recorded as their outline stub, which
+        is all the model saw of them.
+        """
+        file_tokens = self._file_tokens()
+        self._injected = {str(f.path): (f.digest, f.content, False) for f in self.files}
+        self._reconcile_file_tokens(file_tokens)
+        for omitted in self.omitted:
+            self._injected[str(omitted.file.path)] = (omitted.file.digest, omitted.stub, True)
+
+    def get_context_diff(self, context_lines: int = 3) -> str:
+        """Get formatted changes to CONTEXT files since they were last sent.
+
+        Compares loaded files against the mark_injected() baseline and
+        renders unified diffs for modified files, full content (or the outline
+        stub, if packed out) for new files, and a note for removed files.
+        A modified file whose diff would be larger than the file itself, or
+        of which the model only saw a stub, is sent in full instead. A
+        modified file that is packed out is sent as its new stub, never as a
+        diff. The baseline is then advanced to what was sent.
+
+        Args:
+            context_lines: Unchanged lines of context around each hunk
+
+        Returns:
+            Formatted changes, or "" if no CONTEXT file changed
+        """
+        stubs = {str(o.file.path): o.stub for o in self.omitted}
+        current = self.files + [o.file for o in self.omitted]
+        sections = []
+        baseline: dict[str, tuple[str, str, bool]] = {}
+        file_tokens = self._file_tokens()
+
+        for ctx_file in current:
+            key = str(ctx_file.path)
+            rel_path = self._display_path(ctx_file.path)
+            previous = self._injected.get(key)
+            # Unchanged files are detected by hash without materializing content
+            if previous is not None and previous[0] == ctx_file.digest:
+                baseline[key] = previous
+                continue
+
+            stub = stubs.get(key)
+            if stub is not None:
+                baseline[key] = (ctx_file.digest, stub, True)
+                if previous is not None:
+                    stub = stub.replace(" (omitted, ", " (modified, omitted, ", 1)
+                sections.append(stub)
+                continue
+
+            content = ctx_file.content
+            baseline[key] = (ctx_file.digest, content, False)
+            if previous is None:
+                sections.append(f"### {rel_path} (new)\n```\n{content}\n```\n")
+                continue
+            if previous[2]:
+                # Only the outline stub was shown; a diff against it is meaningless
+                sections.append(f"### {rel_path} (modified)\n```\n{content}\n```\n")
+                continue
+
+            diff = "".join(difflib.unified_diff(
+                previous[1].splitlines(keepends=True),
+                content.splitlines(keepends=True),
+                fromfile=f"a/{rel_path}",
+                tofile=f"b/{rel_path}",
+                n=context_lines,
+            ))
+            if len(diff) >= len(content):
+                sections.append(f"### {rel_path} (rewritten)\n```\n{content}\n```\n")
+            else:
+                sections.append(f"### {rel_path} (modified)\n```diff\n{diff}```\n")
+
+        for key in self._injected:
+            if key not in baseline:
+                sections.append(f"### {self._display_path(Path(key))} (removed)\n")
+
+        self._injected = baseline
+        self._reconcile_file_tokens(file_tokens)
+        if not sections:
+            return ""
+        return "\n".join([
+            "## Context Changes\n\n"
+            "CONTEXT files changed since they were last shown:\n",
+            *sections,
+        ])
 
     def get_status(self) -> dict:
         """Get context status for reporting."""
         return {
             "files_loaded": len(self.files),
-            "file_tokens": sum(f.tokens_estimate for f in self.files),
+            "files_omitted": len(self.omitted),
+            "files_elided": sum(1 for f in self.files if f.elided_tokens),
+            "elided_tokens_saved": sum(f.elided_tokens for f in self.files),
+            "duplicates_skipped": len(self.duplicates),
+            "duplicate_bytes_saved": sum(d.size for d in self.duplicates),
+            "duplicate_tokens_saved": sum(d.tokens - d.note_tokens for d in self.duplicates),
+            "file_tokens": self._file_tokens(),
             "conversation_tokens": self.conversation_tokens,
             "total_tokens": self.window.used_tokens,
             "max_tokens": self.window.max_tokens,
             "usage_percent": round(self.window.usage_percent * 100, 1),
             "near_limit": self.window.is_near_limit,
             "available_tokens": self.window.available_tokens,
+            "tokenizer": get_tokenizer().name,
         }
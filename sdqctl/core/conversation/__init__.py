@@ -23,6 +23,7 @@ from .parser import _parse_line, parse_line
 from .templates import (
     get_standard_variables,
     substitute_template_variables,
+    substitute_tokens,
 )
 from .types import (
     SECRET_KEY_PATTERNS,
@@ -51,6 +52,7 @@ __all__ = [
     "FileRestrictions",
     # Template functions
     "substitute_template_variables",
+    "substitute_tokens",
     "get_standard_variables",
     # Content utilities
     "apply_iteration_context",
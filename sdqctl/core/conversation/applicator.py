@@ -62,6 +62,14 @@ def apply_directive(conv, directive: Directive) -> None:
             conv.context_limit = float(value) / 100
         case DirectiveType.ON_CONTEXT_LIMIT:
             conv.on_context_limit = directive.value
+        case DirectiveType.CONTEXT_BUDGET:
+            conv.context_budget = _parse_token_count(directive.value)
+        case DirectiveType.CONTEXT_FILE_LIMIT:
+            conv.context_file_limit = _parse_token_count(directive.value)
+        case DirectiveType.CONTEXT_PATTERN_LIMIT:
+            conv.context_pattern_limit = _parse_token_count(directive.value)
+        case DirectiveType.CONTEXT_PRIORITY:
+            conv.context_priority.append(directive.value)
         case DirectiveType.VALIDATION_MODE:
             conv.validation_mode = directive.value.lower()
 
@@ -225,6 +233,20 @@ def apply_directive(conv, directive: Directive) -> None:
                     retry_count=retry_count,
                     retry_prompt=retry_prompt
                 ))
+        case DirectiveType.RUN_SEQUENTIAL:
+            # A RUN that waits for earlier RUNs of its ELIDE group, and that later ones wait for
+            conv.steps.append(
+                ConversationStep(type="run", content=directive.value, sequential=True)
+            )
+        case DirectiveType.RUN_CACHE:
+            # RUN-CACHE modifies the previous RUN step: its result is replayed while
+            # the files matched by these globs (relative to RUN-CWD) are unchanged
+            for i in range(len(conv.steps) - 1, -1, -1):
+                if conv.steps[i].type == "run":
+                    conv.steps[i].cache_inputs = directive.value.split()
+                    break
+            else:
+                raise ValueError("RUN-CACHE must follow a RUN directive")
         case DirectiveType.RUN_ASYNC:
             conv.steps.append(ConversationStep(type="run_async", content=directive.value))
         case DirectiveType.RUN_WAIT:
@@ -255,6 +277,14 @@ def apply_directive(conv, directive: Directive) -> None:
         case DirectiveType.RUN_CWD:
             # Set working directory for RUN commands
             conv.run_cwd = directive.value.strip()
+        case DirectiveType.RUN_SHELL:
+            # fresh: a new process per RUN; persistent: one bash session per workflow
+            value = directive.value.strip().lower()
+            if value not in ("fresh", "persistent"):
+                raise ValueError(
+                    f"Invalid RUN-SHELL value: {directive.value} (expected fresh/persistent)"
+                )
+            conv.run_shell = value
         case DirectiveType.RUN_TIMEOUT:
             # Parse timeout in seconds (supports "30", "30s", "2m")
             value = directive.value.strip().lower()
@@ -417,6 +447,18 @@ def apply_directive(conv, directive: Directive) -> None:
                 ))
 
 
+def _parse_token_count(value: str) -> int | None:
+    """Parse a token count: "50K", "1M", "40000", or "none" (no limit)."""
+    value = value.strip().lower()
+    if value in ("none", "unlimited", ""):
+        return None
+    if value.endswith("k"):
+        return int(value[:-1]) * 1000
+    if value.endswith("m"):
+        return int(value[:-1]) * 1000000
+    return int(value)
+
+
 def apply_directive_to_block(steps: list[ConversationStep], directive: Directive) -> None:
     """Apply a directive inside an ON-FAILURE/ON-SUCCESS block.
 
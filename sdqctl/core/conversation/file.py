@@ -80,6 +80,10 @@ class ConversationFile:
     context_exclude: list[str] = field(default_factory=list)  # Patterns to exclude from validation
     context_limit: float = field(default_factory=_get_default_context_limit)
     on_context_limit: str = "compact"  # compact, stop, continue
+    context_budget: Optional[int] = None  # Token budget for CONTEXT files (None = fit limit)
+    context_priority: list[str] = field(default_factory=list)  # Patterns packed first
+    context_file_limit: Optional[int] = None  # Max tokens per file (None = no cap)
+    context_pattern_limit: Optional[int] = None  # Max tokens per CONTEXT pattern
 
     # Validation mode (strict, lenient, exploratory)
     validation_mode: str = "strict"  # strict=fail on missing, lenient=warn only
@@ -138,6 +142,7 @@ class ConversationFile:
     run_cwd: Optional[str] = None  # Working directory for RUN commands (relative to workflow dir)
     allow_shell: bool = False  # Security: must opt-in to shell=True for RUN
     run_timeout: int = 60  # Timeout in seconds for RUN commands
+    run_shell: str = "fresh"  # fresh, persistent (one bash session for all RUNs)
     async_processes: list = field(default_factory=list)  # Background processes from RUN-ASYNC
 
     # Verification settings
@@ -391,6 +396,7 @@ class ConversationFile:
         conv.context_files.extend(included_conv.context_files)
         conv.context_files_optional.extend(included_conv.context_files_optional)
         conv.context_exclude.extend(included_conv.context_exclude)
+        conv.context_priority.extend(included_conv.context_priority)
         conv.prologues.extend(included_conv.prologues)
         conv.epilogues.extend(included_conv.epilogues)
         conv.prompts.extend(included_conv.prompts)
@@ -473,7 +479,6 @@ class ConversationFile:
             Warnings are optional patterns that are missing or excluded patterns.
         """
         import fnmatch as fnmatch_module
-        import glob as glob_module
 
         errors = []
         warnings = []
@@ -511,7 +516,7 @@ class ConversationFile:
             # Absolute paths resolve directly
             if Path(pattern).is_absolute():
                 resolved_pattern = Path(pattern)
-                found = self._check_pattern_exists(resolved_pattern, glob_module)
+                found = self._check_pattern_exists(resolved_pattern)
                 if not found:
                     if is_optional or allow_missing:
                         warnings.append((context_ref, resolved_pattern))
@@ -523,8 +528,8 @@ class ConversationFile:
             cwd_resolved = cwd / pattern
             workflow_resolved = workflow_base / pattern
 
-            cwd_found = self._check_pattern_exists(cwd_resolved, glob_module)
-            workflow_found = self._check_pattern_exists(workflow_resolved, glob_module)
+            cwd_found = self._check_pattern_exists(cwd_resolved)
+            workflow_found = self._check_pattern_exists(workflow_resolved)
 
             if not cwd_found and not workflow_found:
                 # Report CWD path since that's what users expect
@@ -768,11 +773,13 @@ class ConversationFile:
 
         return errors
 
-    def _check_pattern_exists(self, resolved_pattern: Path, glob_module) -> bool:
+    def _check_pattern_exists(self, resolved_pattern: Path) -> bool:
         """Check if a pattern (file or glob) resolves to existing files."""
+        from ..glob_index import get_glob_index
+
         pattern_str = str(resolved_pattern)
         if "*" in pattern_str or "?" in pattern_str or "[" in pattern_str:
-            return bool(list(glob_module.glob(pattern_str, recursive=True)))
+            return bool(get_glob_index().glob(pattern_str, recursive=True))
         else:
             return resolved_pattern.exists()
 
@@ -812,6 +819,14 @@ class ConversationFile:
             lines.append(f"CONTEXT-LIMIT {int(self.context_limit * 100)}%")
         if self.on_context_limit != "compact":
             lines.append(f"ON-CONTEXT-LIMIT {self.on_context_limit}")
+        if self.context_budget is not None:
+            lines.append(f"CONTEXT-BUDGET {self.context_budget}")
+        for pattern in self.context_priority:
+            lines.append(f"CONTEXT-PRIORITY {pattern}")
+        if self.context_file_limit is not None:
+            lines.append(f"CONTEXT-FILE-LIMIT {self.context_file_limit}")
+        if self.context_pattern_limit is not None:
+            lines.append(f"CONTEXT-PATTERN-LIMIT {self.context_pattern_limit}")
 
         for ctx in self.context_files:
             lines.append(f"CONTEXT {ctx}")
@@ -863,12 +878,17 @@ class ConversationFile:
             lines.append(f"RUN-CWD {self.run_cwd}")
         if self.run_timeout != 60:
             lines.append(f"RUN-TIMEOUT {self.run_timeout}")
+        if self.run_shell != "fresh":
+            lines.append(f"RUN-SHELL {self.run_shell}")
         # RUN-ENV with secret masking for serialization
         for key, value in self.run_env.items():
             masked_value = _mask_env_value(key, value)
             lines.append(f"RUN-ENV {key}={masked_value}")
 
-        if self.allow_shell or self.run_cwd or self.run_timeout != 60 or self.run_env:
+        if (
+            self.allow_shell or self.run_cwd or self.run_timeout != 60
+            or self.run_shell != "fresh" or self.run_env
+        ):
             lines.append("")
 
         # Prompt injection (prologues/epilogues)
@@ -1,7 +1,38 @@
 """Template variable substitution for ConversationFile."""
 
+import re
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional
+from typing import Mapping, Optional
+
+
+@lru_cache(maxsize=256)
+def _token_pattern(tokens: tuple[str, ...]) -> re.Pattern:
+    """One regex matching any of tokens, longest first (so prefixes lose)."""
+    return re.compile("|".join(map(re.escape, sorted(tokens, key=len, reverse=True))))
+
+
+def substitute_tokens(text: str, replacements: Mapping[str, object]) -> str:
+    """Replace every occurrence of each token in a single scan of text.
+
+    Used for {{VAR}} templates and the {{TYPE:N:value}} placeholders of
+    merged prompts. Unlike one str.replace() per token, which copies the
+    whole text each time, the text is scanned once and the result built
+    once; the regex for a set of tokens is compiled once and cached.
+    Replacement values are inserted as-is: tokens inside them are not
+    expanded again.
+
+    Args:
+        text: Text containing the tokens
+        replacements: Token (e.g. "{{DATE}}") -> replacement value
+
+    Returns:
+        Text with every token replaced by str(value)
+    """
+    tokens = tuple(sorted(token for token in replacements if token))
+    if not tokens:
+        return text
+    return _token_pattern(tokens).sub(lambda m: str(replacements[m.group()]), text)
 
 
 def substitute_template_variables(text: str, variables: dict[str, str]) -> str:
@@ -28,10 +59,11 @@ def substitute_template_variables(text: str, variables: dict[str, str]) -> str:
     avoid influencing agent behavior. Use __WORKFLOW_NAME__ for explicit opt-in.
     See Q-001 in docs/QUIRKS.md.
     """
-    result = text
-    for key, value in variables.items():
-        result = result.replace(f"{{{{{key}}}}}", str(value))
-    return result
+    if not variables or "{{" not in text:
+        return text
+    return substitute_tokens(
+        text, {f"{{{{{key}}}}}": value for key, value in variables.items()}
+    )
 
 
 def get_standard_variables(
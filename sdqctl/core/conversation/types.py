@@ -3,7 +3,7 @@
 from dataclasses import dataclass, field
 from enum import Enum
 from pathlib import Path
-from typing import TYPE_CHECKING, Union
+from typing import TYPE_CHECKING, Optional, Union
 
 if TYPE_CHECKING:
     pass
@@ -88,6 +88,10 @@ class DirectiveType(Enum):
     CONTEXT_EXCLUDE = "CONTEXT-EXCLUDE"  # Patterns to exclude from validation
     CONTEXT_LIMIT = "CONTEXT-LIMIT"
     ON_CONTEXT_LIMIT = "ON-CONTEXT-LIMIT"
+    CONTEXT_BUDGET = "CONTEXT-BUDGET"  # Token budget for CONTEXT files (e.g., 50K, none)
+    CONTEXT_PRIORITY = "CONTEXT-PRIORITY"  # Pattern kept first when packing
+    CONTEXT_FILE_LIMIT = "CONTEXT-FILE-LIMIT"  # Max tokens per file (larger files elided)
+    CONTEXT_PATTERN_LIMIT = "CONTEXT-PATTERN-LIMIT"  # Max tokens per CONTEXT pattern
 
     # Validation mode
     VALIDATION_MODE = "VALIDATION-MODE"  # strict, lenient, exploratory
@@ -150,6 +154,9 @@ class DirectiveType(Enum):
     RUN_ASYNC = "RUN-ASYNC"  # Run command in background, don't wait
     RUN_WAIT = "RUN-WAIT"  # Wait/sleep (e.g., 5s, 1m)
     RUN_RETRY = "RUN-RETRY"  # Retry with AI fix: RUN-RETRY N "prompt"
+    RUN_SEQUENTIAL = "RUN-SEQUENTIAL"  # RUN that never overlaps other RUNs in an ELIDE group
+    RUN_CACHE = "RUN-CACHE"  # Replay previous RUN result while input globs are unchanged
+    RUN_SHELL = "RUN-SHELL"  # fresh (process per RUN) or persistent (one bash per workflow)
 
     # Verification
     VERIFY = "VERIFY"  # Run verification: VERIFY refs, VERIFY links, VERIFY all
@@ -299,6 +306,8 @@ class ConversationStep:
     preserve: list[str] = field(default_factory=list)  # For compact
     retry_count: int = 0  # For run_retry: max retries
     retry_prompt: str = ""  # For run_retry: prompt to send on failure
+    sequential: bool = False  # For run: ordering barrier among RUNs in an ELIDE group
+    cache_inputs: Optional[list[str]] = None  # For run: RUN-CACHE input globs (None = uncached)
     verify_type: str = ""  # For verify: refs, links, traceability, all
     verify_options: dict = field(default_factory=dict)  # For verify: additional options
     merge_with_next: bool = False  # For help_inline: merge content with following step
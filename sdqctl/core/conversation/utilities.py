@@ -12,6 +12,25 @@ if TYPE_CHECKING:
 logger = logging.getLogger("sdqctl.core.conversation")
 
 
+def _read_reference(path: Path) -> str:
+    """Read an @file reference through the shared file content cache.
+
+    Prologues and epilogues are re-read on every cycle; unchanged files
+    (same stat identity) are served from the cache.
+    """
+    from ..context import content_hash, estimate_tokens
+    from ..file_cache import get_file_cache
+
+    cache = get_file_cache()
+    st = path.stat()
+    cached = cache.get(path, st)
+    if cached is not None:
+        return cached.content
+    content = path.read_text()
+    cache.put(path, st, content, estimate_tokens(content), content_hash(content))
+    return content
+
+
 def resolve_content_reference(value: str, base_path: Optional[Path] = None) -> str:
     """Resolve @file references to file content.
 
@@ -36,7 +55,7 @@ def resolve_content_reference(value: str, base_path: Optional[Path] = None) -> s
         if Path(file_path).is_absolute():
             full_path = Path(file_path)
             if full_path.exists():
-                return full_path.read_text()
+                return _read_reference(full_path)
             else:
                 logger.warning(f"File reference not found: {value} (resolved to {full_path})")
                 return value
@@ -44,13 +63,13 @@ def resolve_content_reference(value: str, base_path: Optional[Path] = None) -> s
         # Try CWD first (intuitive for CLI users)
         cwd_path = Path.cwd() / file_path
         if cwd_path.exists():
-            return cwd_path.read_text()
+            return _read_reference(cwd_path)
 
         # Fall back to base_path (workflow directory)
         if base_path:
             full_path = base_path / file_path
             if full_path.exists():
-                return full_path.read_text()
+                return _read_reference(full_path)
 
         # Neither worked - log warning with both attempted paths
         if base_path:
@@ -0,0 +1,155 @@
+"""
+Process-wide cache of CONTEXT file contents.
+
+Fresh-mode workflows reload every CONTEXT file on each cycle. Most of those
+files are unchanged between cycles, so re-reading them is wasted I/O. This
+cache keeps decoded file content (plus its token estimate) keyed on the
+file's stat identity: (path, st_mtime_ns, st_size, st_ino). A file is only
+re-read when any part of that identity changes.
+
+Racy entries:
+    Filesystem timestamps are coarse (often a few milliseconds), so a file
+    rewritten twice within one timestamp tick with the same size would keep
+    an identical stat identity. Like git's "racily clean" index entries, files
+    modified within RACY_WINDOW_NS of being read are not cached.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+# Default cap on cached content (bytes on disk)
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+# Files modified this recently are never cached (see module docstring)
+RACY_WINDOW_NS = 2_000_000_000
+
+
+@dataclass(frozen=True)
+class StatKey:
+    """Stat identity of a file; any change invalidates a cache entry."""
+
+    mtime_ns: int
+    size: int
+    inode: int
+
+    @classmethod
+    def from_stat(cls, st: os.stat_result) -> "StatKey":
+        return cls(mtime_ns=st.st_mtime_ns, size=st.st_size, inode=st.st_ino)
+
+
+@dataclass
+class CachedContent:
+    """Cached file content with its token estimate and content hash."""
+
+    key: StatKey
+    content: str
+    tokens: int
+    digest: str = ""
+
+
+class FileContentCache:
+    """LRU cache of file contents bounded by total byte size.
+
+    Thread-safe; a single instance is shared by every ContextManager in the
+    process (see get_file_cache()).
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[str, CachedContent] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def total_bytes(self) -> int:
+        """Bytes currently held (sum of cached file sizes)."""
+        return self._bytes
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, path: Path, st: os.stat_result) -> Optional[CachedContent]:
+        """Return cached content if the file's stat identity is unchanged."""
+        name = str(path)
+        key = StatKey.from_stat(st)
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is None or entry.key != key:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(name)
+            self.hits += 1
+            return entry
+
+    def put(
+        self, path: Path, st: os.stat_result, content: str, tokens: int, digest: str = ""
+    ) -> None:
+        """Store content read from path, evicting least recently used entries."""
+        if st.st_size > self.max_bytes:
+            return
+        if time.time_ns() - st.st_mtime_ns < RACY_WINDOW_NS:
+            return
+
+        name = str(path)
+        entry = CachedContent(
+            key=StatKey.from_stat(st), content=content, tokens=tokens, digest=digest
+        )
+        with self._lock:
+            old = self._entries.pop(name, None)
+            if old is not None:
+                self._bytes -= old.key.size
+            self._entries[name] = entry
+            self._bytes += entry.key.size
+            while self._bytes > self.max_bytes and self._entries:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.key.size
+
+    def invalidate(self, path: Path) -> None:
+        """Drop a single path from the cache."""
+        with self._lock:
+            old = self._entries.pop(str(path), None)
+            if old is not None:
+                self._bytes -= old.key.size
+
+    def clear(self) -> None:
+        """Drop all entries and reset hit/miss counters."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self.hits = 0
+            self.misses = 0
+
+    def get_stats(self) -> dict:
+        """Get cache statistics for reporting."""
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+# Global shared cache
+_file_cache: Optional[FileContentCache] = None
+
+
+def get_file_cache() -> FileContentCache:
+    """Get the process-wide file content cache."""
+    global _file_cache
+    if _file_cache is None:
+        _file_cache = FileContentCache()
+    return _file_cache
+
+
+def clear_file_cache() -> None:
+    """Clear the process-wide cache (useful for testing)."""
+    if _file_cache is not None:
+        _file_cache.clear()
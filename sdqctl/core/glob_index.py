@@ -0,0 +1,274 @@
+"""
+Directory-walk index shared by CONTEXT resolution and validation.
+
+`**` patterns over large trees are expensive, and a single run used to walk
+the same tree several times: ConversationFile.validate_context_files() checks
+each pattern under CWD and the workflow directory, ContextManager then globs
+it again (CWD, then base_path), and fresh mode repeats the resolution every
+cycle. REFCAT glob refs add one more walk.
+
+GlobIndex caches each directory's listing together with the directory's
+st_mtime_ns. Adding, removing or renaming an entry changes the directory
+mtime, so a cached listing is reused until that happens; a re-glob costs one
+stat() per visited directory instead of a full scandir().
+
+Matching follows glob.glob() semantics: `*`, `?` and `[...]` match within a
+single path component, `**` (when recursive) matches zero or more
+directories, and names starting with "." are only matched by patterns that
+start with ".". Results are sorted per directory for deterministic order.
+"""
+
+import fnmatch
+import os
+import threading
+import time
+from dataclasses import dataclass
+from glob import has_magic
+from typing import Iterator, Optional
+
+from .file_cache import RACY_WINDOW_NS
+
+
+@dataclass(frozen=True)
+class DirListing:
+    """Cached listing of a single directory."""
+
+    mtime_ns: int
+    files: tuple[str, ...]  # Sorted names of non-directory entries
+    dirs: tuple[str, ...]  # Sorted names of directories (symlinks followed)
+    regular: frozenset[str] = frozenset()  # Regular files among files (not symlinks)
+    links: frozenset[str] = frozenset()  # Symlinks among files, resolved when matched
+
+    def is_file(self, name: str, path: str) -> bool:
+        """True if the entry name (at path) is a regular file.
+
+        Symlinks are resolved on every call: their target may have been
+        removed without changing this directory's mtime.
+        """
+        return name in self.regular or (name in self.links and os.path.isfile(path))
+
+
+class GlobIndex:
+    """Cache of directory listings, invalidated by directory mtime.
+
+    Thread-safe; a single instance is shared by the whole process
+    (see get_glob_index()).
+    """
+
+    def __init__(self):
+        self._listings: dict[str, DirListing] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._listings)
+
+    def listing(self, dirname: str) -> Optional[DirListing]:
+        """Get the listing for a directory, rescanning only if it changed.
+
+        Returns None if dirname is not a readable directory.
+        """
+        try:
+            st = os.stat(dirname)
+        except OSError:
+            return None
+
+        with self._lock:
+            cached = self._listings.get(dirname)
+            if cached is not None and cached.mtime_ns == st.st_mtime_ns:
+                self.hits += 1
+                return cached
+
+        files: list[str] = []
+        dirs: list[str] = []
+        regular: set[str] = set()
+        links: set[str] = set()
+        try:
+            with os.scandir(dirname) as it:
+                for entry in it:
+                    try:
+                        is_dir = entry.is_dir()
+                    except OSError:
+                        is_dir = False
+                    if is_dir:
+                        dirs.append(entry.name)
+                        continue
+                    files.append(entry.name)
+                    try:
+                        if entry.is_symlink():
+                            links.add(entry.name)
+                        elif entry.is_file(follow_symlinks=False):
+                            regular.add(entry.name)  # Not a socket, FIFO or device
+                    except OSError:
+                        pass
+        except OSError:
+            return None
+
+        result = DirListing(
+            mtime_ns=st.st_mtime_ns,
+            files=tuple(sorted(files)),
+            dirs=tuple(sorted(dirs)),
+            regular=frozenset(regular),
+            links=frozenset(links),
+        )
+        with self._lock:
+            self.misses += 1
+            # Recently modified directories may change again within the same
+            # timestamp tick; don't trust their mtime (see file_cache.py).
+            if time.time_ns() - st.st_mtime_ns >= RACY_WINDOW_NS:
+                self._listings[dirname] = result
+            else:
+                self._listings.pop(dirname, None)
+        return result
+
+    def glob(self, pattern: str, recursive: bool = False, files_only: bool = False) -> list[str]:
+        """Expand a glob pattern, equivalent to glob.glob(pattern, recursive=...).
+
+        Args:
+            pattern: Glob pattern (absolute, or relative to the process CWD)
+            recursive: If True, `**` matches any number of directories
+            files_only: If True, only return regular files (symlinks followed;
+                no directories, broken symlinks, sockets or FIFOs)
+
+        Returns:
+            List of matching paths, in the same form as the pattern
+        """
+        if not has_magic(pattern):
+            if files_only:
+                return [pattern] if os.path.isfile(pattern) else []
+            return [pattern] if os.path.lexists(pattern) else []
+
+        drive_root, parts = _split_pattern(pattern)
+        # Walk the literal prefix directly; only magic components use listings
+        first_magic = next(i for i, part in enumerate(parts) if has_magic(part))
+        base = os.path.join(drive_root, *parts[:first_magic]) if (
+            drive_root or first_magic
+        ) else ""
+
+        seen: set[str] = set()
+        results: list[str] = []
+        for match in self._match(base, parts[first_magic:], recursive, files_only):
+            if match not in seen:
+                seen.add(match)
+                results.append(match)
+        return results
+
+    def _match(
+        self, base: str, parts: tuple[str, ...], recursive: bool, files_only: bool
+    ) -> Iterator[str]:
+        """Yield paths under base matching the remaining pattern parts."""
+        head, rest = parts[0], parts[1:]
+
+        if recursive and head == "**":
+            # Zero directories
+            if rest:
+                yield from self._match(base, rest, recursive, files_only)
+            elif base and not files_only:
+                yield os.path.join(base, "")
+            # One or more directories
+            for subdir in self._walk_dirs(base):
+                if rest:
+                    yield from self._match(subdir, rest, recursive, files_only)
+                elif not files_only:
+                    yield subdir
+            if not rest:
+                yield from self._walk_files(base, files_only)
+            return
+
+        if not has_magic(head):
+            path = os.path.join(base, head) if base else head
+            if rest:
+                if os.path.isdir(path):
+                    yield from self._match(path, rest, recursive, files_only)
+            elif files_only:
+                if os.path.isfile(path):
+                    yield path
+            elif os.path.lexists(path):
+                yield path
+            return
+
+        listing = self.listing(base or os.curdir)
+        if listing is None:
+            return
+        candidates = listing.dirs if rest else (
+            listing.files if files_only else listing.files + listing.dirs
+        )
+        for name in fnmatch.filter(candidates, head):
+            if _is_hidden(name) and not _is_hidden(head):
+                continue
+            path = os.path.join(base, name) if base else name
+            if rest:
+                yield from self._match(path, rest, recursive, files_only)
+            elif not files_only or listing.is_file(name, path):
+                yield path
+
+    def _walk_dirs(self, base: str) -> Iterator[str]:
+        """Yield all non-hidden directories below base (depth-first)."""
+        listing = self.listing(base or os.curdir)
+        if listing is None:
+            return
+        for name in listing.dirs:
+            if _is_hidden(name):
+                continue
+            path = os.path.join(base, name) if base else name
+            yield path
+            yield from self._walk_dirs(path)
+
+    def _walk_files(self, base: str, files_only: bool = False) -> Iterator[str]:
+        """Yield all non-hidden files below base, for a trailing `**`."""
+        listing = self.listing(base or os.curdir)
+        if listing is None:
+            return
+        for name in listing.files:
+            if not _is_hidden(name):
+                path = os.path.join(base, name) if base else name
+                if not files_only or listing.is_file(name, path):
+                    yield path
+        for name in listing.dirs:
+            if not _is_hidden(name):
+                yield from self._walk_files(
+                    os.path.join(base, name) if base else name, files_only
+                )
+
+    def clear(self) -> None:
+        """Drop all cached listings and reset hit/miss counters."""
+        with self._lock:
+            self._listings.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+def _is_hidden(name: str) -> bool:
+    return name.startswith(".")
+
+
+def _split_pattern(pattern: str) -> tuple[str, tuple[str, ...]]:
+    """Split a pattern into (root, components); root is "/" for absolute paths."""
+    drive, rest = os.path.splitdrive(pattern)
+    root = ""
+    if rest.startswith(os.sep):
+        root = drive + os.sep
+        rest = rest.lstrip(os.sep)
+    elif drive:
+        root = drive
+    parts = tuple(p for p in rest.split(os.sep) if p)
+    return root, parts
+
+
+# Global shared index
+_glob_index: Optional[GlobIndex] = None
+
+
+def get_glob_index() -> GlobIndex:
+    """Get the process-wide glob index."""
+    global _glob_index
+    if _glob_index is None:
+        _glob_index = GlobIndex()
+    return _glob_index
+
+
+def clear_glob_index() -> None:
+    """Clear the process-wide index (useful for testing)."""
+    if _glob_index is not None:
+        _glob_index.clear()
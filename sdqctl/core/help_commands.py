@@ -71,7 +71,7 @@ sdqctl cycle workflow.conv -n 3 --session-mode fresh
 | Option | Description |
 |--------|-------------|
 | `--max-cycles, -n` | Maximum iterations |
-| `--session-mode` | Context management (accumulate, compact, fresh) |
+| `--session-mode` | Context management (accumulate, compact, fresh, diff) |
 | `--checkpoint-dir` | Checkpoint storage location |
 | `--from-json` | Execute from pre-rendered JSON |
 
@@ -82,6 +82,7 @@ sdqctl cycle workflow.conv -n 3 --session-mode fresh
 | `accumulate` | Context grows; compact only at limit |
 | `compact` | Summarize after each cycle |
 | `fresh` | New session each cycle (sees file changes) |
+| `diff` | Context grows; changed CONTEXT files injected as diffs |
 
 ## Examples
 
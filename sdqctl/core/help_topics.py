@@ -42,6 +42,10 @@ Requirements: `context:Nk`, `tier:economy|standard|premium`, `speed:fast|standar
 | `CONTEXT` | Include file/pattern | `CONTEXT @lib/*.js` |
 | `CONTEXT-LIMIT` | Window threshold | `CONTEXT-LIMIT 80%` |
 | `ON-CONTEXT-LIMIT` | Limit action | `ON-CONTEXT-LIMIT compact` |
+| `CONTEXT-BUDGET` | Token budget for files | `CONTEXT-BUDGET 50K` |
+| `CONTEXT-PRIORITY` | Keep pattern first | `CONTEXT-PRIORITY lib/core/*` |
+| `CONTEXT-FILE-LIMIT` | Max tokens per file | `CONTEXT-FILE-LIMIT 8K` |
+| `CONTEXT-PATTERN-LIMIT` | Max tokens per pattern | `CONTEXT-PATTERN-LIMIT 30K` |
 
 ## Injection Directives
 
@@ -60,6 +64,9 @@ Requirements: `context:Nk`, `tier:economy|standard|premium`, `speed:fast|standar
 |-----------|---------|---------|
 | `RUN` | Execute shell command | `RUN pytest -v` |
 | `RUN-RETRY` | Retry with AI fix | `RUN-RETRY 3 "Fix errors"` |
+| `RUN-SEQUENTIAL` | RUN that never overlaps others in ELIDE groups | `RUN-SEQUENTIAL make build` |
+| `RUN-CACHE` | Replay previous RUN result while inputs are unchanged | `RUN-CACHE src/**/*.py` |
+| `RUN-SHELL` | Run RUNs in one persistent bash session | `RUN-SHELL persistent` |
 | `RUN-ON-ERROR` | Error behavior | `RUN-ON-ERROR continue` |
 | `RUN-OUTPUT` | Output inclusion | `RUN-OUTPUT on-error` |
 | `RUN-OUTPUT-LIMIT` | Max output chars | `RUN-OUTPUT-LIMIT 10K` |
@@ -296,12 +303,37 @@ ON-CONTEXT-LIMIT compact    # Summarize and continue
 ON-CONTEXT-LIMIT stop       # Stop and checkpoint
 ```
 
+## Context Budget
+
+```dockerfile
+# Fit CONTEXT files into 50K tokens (default: what CONTEXT-LIMIT leaves)
+CONTEXT-BUDGET 50K
+
+# Files matching these patterns are kept first; then newest, then smallest
+CONTEXT-PRIORITY lib/core/*
+CONTEXT-PRIORITY *.md
+```
+
+Files that don't fit are replaced by a path + outline stub (signatures
+and headings only).
+
+```dockerfile
+# Elide any file over 8K tokens (lockfiles, minified bundles)
+CONTEXT-FILE-LIMIT 8K
+
+# Cap each CONTEXT pattern's files at 30K tokens in total
+CONTEXT-PATTERN-LIMIT 30K
+```
+
+Elided files keep their head, tail and function/class signatures.
+
 ## Session Modes (cycle command)
 
 ```bash
 sdqctl cycle workflow.conv --session-mode accumulate  # Grow context
 sdqctl cycle workflow.conv --session-mode compact     # Summarize per cycle
 sdqctl cycle workflow.conv --session-mode fresh       # Reset per cycle
+sdqctl cycle workflow.conv --session-mode diff        # Grow, inject file diffs
 ```
 
 ## Compaction
@@ -0,0 +1,205 @@
+"""
+Append-only session journal.
+
+Checkpoints used to serialize the whole message history on every save, so
+CHECKPOINT-AFTER each-prompt on long runs wrote O(n²) bytes. Instead, each
+session appends to one JSONL journal in its session directory
+(journal-<session_id>.jsonl):
+
+    {"type": "message", "seq": 0, "role": "user", "content": ..., ...}
+    {"type": "message", "seq": 1, "role": "assistant", "content": ..., ...}
+    {"type": "checkpoint", "id": ..., "name": ..., "message_count": 2, ...}
+    {"type": "pause", "message": ..., "message_count": 2, ...}
+
+A checkpoint appends only the messages added since the previous one, plus
+its state header. The checkpoint files themselves (checkpoint-<id>.json,
+pause.json) keep just the header with "journal" and "message_count"; use
+load_checkpoint_data() to read one back with its messages.
+
+A resumed session keeps appending to the same journal. If it re-writes a
+sequence number, the later record wins, and each header only reads its
+first message_count messages. An incomplete last line (a crash mid-write)
+is ignored.
+
+Journals can be compressed (checkpoints.compression in .sdqctl.yaml): each
+append is written as its own gzip member or zstd frame (journal-<id>.jsonl.gz
+or .jsonl.zst), and readers detect the format from the file's magic bytes,
+decompressing line by line so a resume never holds the whole decompressed
+journal in memory. zstd needs the optional `zstandard` package.
+"""
+
+import gzip
+import io
+import json
+from pathlib import Path
+from typing import Optional, TextIO
+
+from .checkpoint_writer import write_durable
+
+JOURNAL_VERSION = 1
+
+COMPRESSIONS = ("none", "gzip", "zstd")
+
+_SUFFIXES = {"none": "", "gzip": ".gz", "zstd": ".zst"}
+_GZIP_MAGIC = b"\x1f\x8b"
+_ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+
+def journal_name(session_id: str, compression: str = "none") -> str:
+    """File name of the journal for a session."""
+    return f"journal-{session_id}.jsonl{_SUFFIXES[compression]}"
+
+
+def journal_compression(name: str) -> str:
+    """Compression used by a journal, from its file name."""
+    for compression, suffix in _SUFFIXES.items():
+        if suffix and name.endswith(suffix):
+            return compression
+    return "none"
+
+
+def _zstandard():
+    """Import the optional zstandard package."""
+    try:
+        import zstandard
+    except ImportError as e:
+        raise ImportError(
+            "zstd checkpoint compression requires the 'zstandard' package "
+            "(pip install zstandard)"
+        ) from e
+    return zstandard
+
+
+def _compress(data: bytes, compression: str) -> bytes:
+    if compression == "gzip":
+        return gzip.compress(data, compresslevel=6)
+    if compression == "zstd":
+        return _zstandard().ZstdCompressor().compress(data)
+    return data
+
+
+def open_text(path: Path) -> TextIO:
+    """Open a checkpoint or journal file for streaming text reads.
+
+    Detects gzip and zstd compression from the leading magic bytes; anything
+    else is read as plain UTF-8.
+    """
+    with open(path, "rb") as f:
+        magic = f.read(4)
+    if magic.startswith(_GZIP_MAGIC):
+        return gzip.open(path, "rt", encoding="utf-8")
+    if magic.startswith(_ZSTD_MAGIC):
+        reader = _zstandard().ZstdDecompressor().stream_reader(
+            open(path, "rb"), read_across_frames=True, closefd=True
+        )
+        return io.TextIOWrapper(reader, encoding="utf-8")
+    return open(path, encoding="utf-8")
+
+
+def _truncation_errors() -> tuple[type[BaseException], ...]:
+    """Errors raised when a compressed stream ends mid-member/frame."""
+    errors: tuple[type[BaseException], ...] = (EOFError, gzip.BadGzipFile)
+    try:
+        import zstandard
+        errors += (zstandard.ZstdError,)
+    except ImportError:
+        pass
+    return errors
+
+
+class SessionJournal:
+    """Appends message and checkpoint records to a session's journal file."""
+
+    def __init__(self, path: Path, written: int = 0, compression: str = "none"):
+        self.path = path
+        # Number of messages already in the journal
+        self.written = written
+        self.compression = compression
+
+    def append(self, messages: list[dict], header: Optional[dict] = None) -> None:
+        """Append new messages, then an optional state header.
+
+        Args:
+            messages: Messages added since the last append, as dicts; they
+                are numbered from `written` onward
+            header: Checkpoint record to append after the messages
+        """
+        start = self.written
+        self.written += len(messages)
+        self.write(start, messages, header)
+
+    def write(self, start: int, messages: list[dict], header: Optional[dict] = None) -> None:
+        """Write message records numbered from start, then an optional header.
+
+        Unlike append(), does not touch `written`; callers that defer the
+        write (see checkpoint_writer) reserve sequence numbers up front.
+        """
+        lines = [
+            json.dumps({"type": "message", "seq": start + i, **m})
+            for i, m in enumerate(messages)
+        ]
+        if header is not None:
+            lines.append(json.dumps({"v": JOURNAL_VERSION, **header}))
+        if not lines:
+            return
+
+        data = _compress(("\n".join(lines) + "\n").encode("utf-8"), self.compression)
+        write_durable(self.path, data, append=True)
+
+
+def read_messages(path: Path, count: Optional[int] = None) -> list[dict]:
+    """Read message records from a journal.
+
+    Args:
+        path: Journal file
+        count: Number of messages to return (default: all contiguous ones)
+
+    Returns:
+        Message dicts in sequence order
+
+    Raises:
+        ValueError: If the journal is missing messages below count
+    """
+    by_seq: dict[int, dict] = {}
+    with open_text(path) as f:
+        try:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # Torn write at the end of the file
+                if record.get("type") == "message":
+                    by_seq[record["seq"]] = record
+        except _truncation_errors():
+            pass  # Torn write inside the last compressed member/frame
+
+    if count is None:
+        count = 0
+        while count in by_seq:
+            count += 1
+
+    messages = []
+    for seq in range(count):
+        record = by_seq.get(seq)
+        if record is None:
+            raise ValueError(f"Journal {path} is missing message {seq} of {count}")
+        messages.append({k: v for k, v in record.items() if k not in ("type", "seq")})
+    return messages
+
+
+def read_checkpoint_header(path: Path) -> dict:
+    """Read a checkpoint file (plain or compressed) without its messages."""
+    with open_text(path) as f:
+        return json.load(f)
+
+
+def load_checkpoint_data(path: Path) -> dict:
+    """Read a checkpoint file, attaching its messages from the journal.
+
+    Checkpoints written before the journal existed embed "messages"
+    directly and are returned as-is.
+    """
+    data = read_checkpoint_header(path)
+    if "messages" not in data and data.get("journal"):
+        data["messages"] = read_messages(path.parent / data["journal"], data.get("message_count"))
+    return data
@@ -9,6 +9,8 @@ from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any, Optional
 
+from .session_index import index_for
+
 
 def emit_metrics(
     session_id: str,
@@ -80,4 +82,8 @@ def emit_metrics(
     with open(metrics_path, "w") as f:
         json.dump(metrics, f, indent=2)
 
+    index = index_for(session_dir)
+    if index is not None:
+        index.record_metrics(session_dir.name, metrics)
+
     return metrics_path
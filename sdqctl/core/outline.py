@@ -0,0 +1,134 @@
+"""
+Structural outlines of source files.
+
+Extracts the lines that describe a file's shape (function and class
+signatures, markdown headings) without its bodies. Used when a CONTEXT file
+cannot be included in full: it is either replaced by a path+outline stub
+(packing) or elided down to its head, tail and signatures (token caps).
+"""
+
+import re
+from pathlib import Path
+
+from .refcat import detect_language
+
+# Declarations across common languages (Python, JS/TS, Go, Rust, Swift, Java, ...)
+_CODE_SIGNATURE = re.compile(
+    r"^\s*(?:@\w[\w.]*\s*)?"
+    r"(?:(?:export|default|public|private|protected|internal|static|abstract|final|"
+    r"open|override|async|pub(?:\([\w:]+\))?|unsafe|extern)\s+)*"
+    r"(?:def|class|function\*?|func|fn|interface|struct|enum|trait|impl|type|"
+    r"protocol|extension|module|namespace|object|record)\b"
+)
+
+# JS/TS arrow functions and function expressions bound to a name
+_JS_BINDING = re.compile(
+    r"^\s*(?:export\s+)?(?:const|let|var)\s+\w+\s*=\s*(?:async\s+)?"
+    r"(?:function\b|\([^)]*\)\s*=>|\w+\s*=>)"
+)
+
+_MARKDOWN_HEADING = re.compile(r"^#{1,6}\s+\S")
+
+_JS_LANGUAGES = {"javascript", "typescript"}
+
+
+def is_signature_line(line: str, language: str) -> bool:
+    """Check whether a line declares a function, class or section."""
+    if language == "markdown":
+        return bool(_MARKDOWN_HEADING.match(line))
+    if _CODE_SIGNATURE.match(line):
+        return True
+    return language in _JS_LANGUAGES and bool(_JS_BINDING.match(line))
+
+
+def extract_outline(content: str, path: Path, max_lines: int = 40) -> list[tuple[int, str]]:
+    """Extract signature lines from file content.
+
+    Args:
+        content: File content
+        path: File path (used for language detection)
+        max_lines: Maximum number of outline entries to return
+
+    Returns:
+        List of (1-based line number, line text) pairs, in file order
+    """
+    language = detect_language(path)
+    outline: list[tuple[int, str]] = []
+    for lineno, line in enumerate(content.splitlines(), 1):
+        if is_signature_line(line, language):
+            outline.append((lineno, line.rstrip()))
+            if len(outline) >= max_lines:
+                break
+    return outline
+
+
+def elide_content(content: str, path: Path, max_chars: int) -> str:
+    """Shrink content to roughly max_chars, keeping its structure visible.
+
+    Keeps the head and tail of the file and, in between, the signature
+    lines (see is_signature_line) that fit. Each elided span is replaced by
+    a marker line giving the number of lines removed; a single line longer
+    than the budget (e.g. a minified bundle) is cut with a character-count
+    marker.
+
+    Args:
+        content: File content
+        path: File path (used for language detection)
+        max_chars: Approximate size of the result in characters
+
+    Returns:
+        The content unchanged if it fits, otherwise the elided content
+    """
+    if len(content) <= max_chars:
+        return content
+
+    lines = content.splitlines(keepends=True)
+    head_budget = max_chars * 2 // 5
+    tail_budget = max_chars // 5
+    signature_budget = max_chars - head_budget - tail_budget
+
+    head_end, used = 0, 0
+    while head_end < len(lines) and used + len(lines[head_end]) <= head_budget:
+        used += len(lines[head_end])
+        head_end += 1
+
+    tail_start, used = len(lines), 0
+    while tail_start > head_end and used + len(lines[tail_start - 1]) <= tail_budget:
+        used += len(lines[tail_start - 1])
+        tail_start -= 1
+
+    if head_end == 0 and tail_start == len(lines):
+        # Nothing fits line by line: cut the text itself
+        return _elide_chars(content, head_budget + signature_budget, tail_budget)
+
+    language = detect_language(path)
+    parts = lines[:head_end]
+    gap_start = head_end
+    # Markers count against the budget; reserve room for the final one
+    used = len(_elided_marker(tail_start - head_end))
+    for i in range(head_end, tail_start):
+        line = lines[i]
+        if not is_signature_line(line, language):
+            continue
+        marker = _elided_marker(i - gap_start) if i > gap_start else ""
+        if used + len(marker) + len(line) > signature_budget:
+            continue
+        if marker:
+            parts.append(marker)
+        parts.append(line)
+        used += len(marker) + len(line)
+        gap_start = i + 1
+    if tail_start > gap_start:
+        parts.append(_elided_marker(tail_start - gap_start))
+    parts.extend(lines[tail_start:])
+    return "".join(parts)
+
+
+def _elided_marker(line_count: int) -> str:
+    return f"... [{line_count} lines elided] ...\n"
+
+
+def _elide_chars(content: str, head_chars: int, tail_chars: int) -> str:
+    elided = len(content) - head_chars - tail_chars
+    tail = content[-tail_chars:] if tail_chars else ""
+    return f"{content[:head_chars]}\n... [{elided} characters elided] ...\n{tail}"
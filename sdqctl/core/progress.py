@@ -342,6 +342,7 @@ class WorkflowProgress:
         total_cmds: int,
         success: bool = True,
         duration: Optional[float] = None,
+        cached: Optional[bool] = None,
     ) -> None:
         """Report that a RUN command completed.
 
@@ -350,14 +351,36 @@ class WorkflowProgress:
             total_cmds: Total number of commands
             success: Whether the command succeeded
             duration: Time taken in seconds
+            cached: RUN-CACHE outcome (True = hit, False = miss, None = not cached)
         """
         status = "✓" if success else "✗"
-        if duration is not None:
+        if cached:
+            message = f"  {status} RUN {cmd_idx + 1}/{total_cmds} (cached)"
+        elif duration is not None:
             message = f"  {status} RUN {cmd_idx + 1}/{total_cmds} ({duration:.1f}s)"
         else:
             message = f"  {status} RUN {cmd_idx + 1}/{total_cmds}"
+        if cached is False:
+            message += " [cache miss]"
         self._overwrite_line(message)
 
+    def producers_complete(self, timings: list, wall_time: float) -> None:
+        """Report per-producer timings of an ELIDE-merged step (shown at -v).
+
+        Args:
+            timings: ProducerTiming entries (kind, index, duration, success, prefetched)
+            wall_time: Elapsed time for all producers together, in seconds
+        """
+        if self.verbosity < 1 or not timings:
+            return
+        parts = [
+            f"{t.kind} {t.index + 1}{'' if t.success else ' ✗'} "
+            + ("prefetched" if getattr(t, "prefetched", False) else f"{t.duration:.1f}s")
+            for t in timings
+        ]
+        self._end_overwrite()
+        progress(f"    ⏱ {', '.join(parts)} (wall {wall_time:.1f}s)")
+
     def prompt_complete(
         self,
         cycle: int,
@@ -234,8 +234,9 @@ def expand_glob_refs(refs: list[str], cwd: Path) -> list[str]:
         >>> expand_glob_refs(["@src/**/*.py"], Path("/project"))
         ["@src/main.py", "@src/utils/helper.py"]
     """
-    import glob as glob_module
+    from .glob_index import get_glob_index
 
+    index = get_glob_index()
     expanded: list[str] = []
 
     for ref in refs:
@@ -249,25 +250,23 @@ def expand_glob_refs(refs: list[str], cwd: Path) -> list[str]:
         pattern_path = cwd / clean_ref
 
         # Use recursive glob for ** patterns
-        if "**" in str(pattern_path):
-            matches = glob_module.glob(str(pattern_path), recursive=True)
-        else:
-            matches = glob_module.glob(str(pattern_path))
+        matches = index.glob(
+            str(pattern_path), recursive="**" in str(pattern_path), files_only=True
+        )
 
         # Add each match as a ref
         for match in sorted(matches):  # Sort for deterministic order
             match_path = Path(match)
-            if match_path.is_file():
-                # Make relative to cwd if possible
-                try:
-                    rel_path = match_path.relative_to(cwd)
-                    expanded.append(f"@{rel_path}")
-                except ValueError:
-                    # Not relative to cwd, use absolute
-                    expanded.append(f"@{match_path}")
+            # Make relative to cwd if possible
+            try:
+                rel_path = match_path.relative_to(cwd)
+                expanded.append(f"@{rel_path}")
+            except ValueError:
+                # Not relative to cwd, use absolute
+                expanded.append(f"@{match_path}")
 
         # If no matches, keep original to generate a meaningful error later
-        if not any(Path(m).is_file() for m in matches):
+        if not matches:
             expanded.append(ref)
 
     return expanded
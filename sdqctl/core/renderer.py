@@ -272,11 +272,16 @@ def render_workflow(
         base_path=base_path,
         limit_threshold=conv.context_limit,
         path_filter=path_filter,
+        token_budget=conv.context_budget,
+        priority_patterns=conv.context_priority,
+        file_token_limit=conv.context_file_limit,
+        pattern_token_limit=conv.context_pattern_limit,
     )
 
-    # Load context files
+    # Load context files, then fit them into the token budget
     for pattern in conv.context_files:
         context_manager.add_pattern(pattern)
+    context_manager.pack()
 
     # Render cycles
     rendered_cycles = []
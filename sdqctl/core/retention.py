@@ -0,0 +1,301 @@
+"""
+Retention for local session storage.
+
+Session directories (~/.sdqctl/sessions/<id>) only ever grow: every
+CHECKPOINT adds a header file, journals keep appending, and finished
+sessions are never removed locally (`sessions cleanup` deletes through the
+adapter). Two limits, both off by default, bound that growth:
+
+    checkpoints:
+      keep_last: 10       # per session, newest checkpoint-*.json files kept
+      max_size: 2GB       # total size of the sessions directory
+
+keep_last drops the oldest checkpoint headers of each session (the journal
+is kept whole: the newest checkpoint still refers to all of it). max_size
+then evicts whole sessions, least recently written first, until the
+directory fits. These sessions are never evicted:
+
+- the session that just finished
+- sessions that can still be resumed: holding a pause.json checkpoint or
+  marked running/paused in the session index
+- sessions in progress in another process (a live running.pid marker, see
+  Session.mark_finished()) or written within RECENT_WRITE_SECONDS
+
+An evicted session is first renamed into a trash directory next to the
+sessions directory and only then removed, so a pass that is interrupted
+never leaves a half-deleted session behind; the next pass empties the trash.
+
+After a workflow destroys its adapter session, schedule_retention() waits
+for pending checkpoint writes and runs one pass on a worker thread, for at
+most RETENTION_TIMEOUT seconds before the process goes on to exit.
+"""
+
+import logging
+import os
+import re
+import shutil
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional, Union
+
+from .checkpoint_writer import flush_checkpoints
+
+logger = logging.getLogger("sdqctl.core.retention")
+
+DEFAULT_SESSIONS_DIR = Path.home() / ".sdqctl" / "sessions"
+TRASH_DIRNAME = "sessions-trash"  # Sibling of the sessions directory
+RECENT_WRITE_SECONDS = 60  # Sessions written this recently are never evicted
+RETENTION_TIMEOUT = 30.0  # Seconds schedule_retention() waits for its pass
+
+_SIZE_UNITS = {"": 1, "B": 1, "KB": 1024, "MB": 1024**2, "GB": 1024**3, "TB": 1024**4}
+
+
+def parse_size(value: Union[str, int]) -> int:
+    """Parse a byte size like "500MB", "2GB" or 1048576.
+
+    Raises:
+        ValueError: If the value is not a size
+    """
+    if isinstance(value, int):
+        return value
+    match = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([KMGT]?B?)\s*", str(value).upper())
+    if not match:
+        raise ValueError(f"Invalid size: {value!r} (expected e.g. 500MB, 2GB)")
+    number, unit = match.groups()
+    if unit and not unit.endswith("B"):
+        unit += "B"
+    return int(float(number) * _SIZE_UNITS[unit])
+
+
+@dataclass
+class RetentionResult:
+    """What a retention pass removed (or would remove, on a dry run)."""
+
+    checkpoints_removed: list[Path] = field(default_factory=list)
+    sessions_evicted: list[str] = field(default_factory=list)
+    bytes_freed: int = 0
+
+
+@dataclass
+class _SessionUsage:
+    name: str
+    path: Path
+    size: int
+    last_write: float
+
+
+def prune_checkpoints(session_dir: Path, keep_last: int, dry_run: bool = False) -> list[Path]:
+    """Remove all but the newest keep_last checkpoint headers of a session.
+
+    Returns:
+        The checkpoint files removed
+    """
+    checkpoints = []
+    for path in session_dir.glob("checkpoint-*.json"):
+        try:
+            checkpoints.append((path.stat().st_mtime, path))
+        except OSError:
+            continue
+    checkpoints.sort()
+    stale = [path for _, path in checkpoints[:max(0, len(checkpoints) - keep_last)]]
+    if not dry_run:
+        for path in stale:
+            path.unlink(missing_ok=True)
+    return stale
+
+
+def _session_usage(session_dir: Path) -> _SessionUsage:
+    size, last_write = 0, 0.0
+    for root, _, files in os.walk(session_dir):
+        for name in files:
+            try:
+                st = os.stat(os.path.join(root, name))
+            except OSError:
+                continue
+            size += st.st_size
+            last_write = max(last_write, st.st_mtime)
+    if not last_write:
+        last_write = session_dir.stat().st_mtime
+    return _SessionUsage(session_dir.name, session_dir, size, last_write)
+
+
+def apply_retention(
+    sessions_dir: Path,
+    keep_last: int = 0,
+    max_bytes: int = 0,
+    protect: frozenset[str] = frozenset(),
+    dry_run: bool = False,
+) -> RetentionResult:
+    """Run one retention pass over a sessions directory.
+
+    Args:
+        sessions_dir: Directory holding one subdirectory per session
+        keep_last: Checkpoint headers kept per session (0 = keep all)
+        max_bytes: Cap on the directory's total size (0 = no cap)
+        protect: Session names that are never evicted (paused, running and
+            recently written sessions are never evicted either)
+        dry_run: Report what would be removed without removing it
+
+    Returns:
+        RetentionResult describing the removals
+    """
+    result = RetentionResult()
+    if not sessions_dir.is_dir():
+        return result
+
+    session_dirs = [p for p in sessions_dir.iterdir() if p.is_dir()]
+    trash = sessions_dir.parent / TRASH_DIRNAME
+    if not dry_run:
+        _empty_trash(trash)
+
+    pruned_bytes: dict[str, int] = {}
+    if keep_last > 0:
+        for session_dir in session_dirs:
+            stale = prune_checkpoints(session_dir, keep_last, dry_run=True)
+            freed = sum(_file_size(p) for p in stale)
+            if not dry_run:
+                for path in stale:
+                    path.unlink(missing_ok=True)
+            result.checkpoints_removed.extend(stale)
+            result.bytes_freed += freed
+            pruned_bytes[session_dir.name] = freed
+
+    if max_bytes > 0:
+        protect = protect | _active_sessions(sessions_dir)
+        usage = [_session_usage(p) for p in session_dirs]
+        if dry_run:
+            # Pruned headers are still on disk; count them as already gone
+            for entry in usage:
+                entry.size -= pruned_bytes.get(entry.name, 0)
+        total = sum(u.size for u in usage)
+        recent = time.time() - RECENT_WRITE_SECONDS
+        for entry in sorted(usage, key=lambda u: u.last_write):
+            if total <= max_bytes:
+                break
+            if entry.name in protect or entry.last_write > recent or _in_use(entry.path):
+                continue
+            if not dry_run and not _evict(entry.path, trash):
+                continue
+            result.sessions_evicted.append(entry.name)
+            result.bytes_freed += entry.size
+            total -= entry.size
+
+    if not dry_run and (result.checkpoints_removed or result.sessions_evicted):
+        from .session_index import SessionIndex
+        try:
+            SessionIndex(sessions_dir).sync()
+        except Exception as e:
+            logger.warning(f"Failed to update session index after retention: {e}")
+    return result
+
+
+def _in_use(session_dir: Path) -> bool:
+    from .session_index import is_running
+    return (session_dir / "pause.json").exists() or is_running(session_dir)
+
+
+def _evict(session_dir: Path, trash: Path) -> bool:
+    """Move a session into the trash, then delete it.
+
+    Returns:
+        False if the session could not be moved (it is left untouched)
+    """
+    target = trash / f"{session_dir.name}-{uuid.uuid4().hex[:8]}"
+    try:
+        trash.mkdir(parents=True, exist_ok=True)
+        os.rename(session_dir, target)
+    except OSError as e:
+        logger.warning(f"Failed to evict session {session_dir.name}: {e}")
+        return False
+    shutil.rmtree(target, ignore_errors=True)
+    return True
+
+
+def _empty_trash(trash: Path) -> None:
+    """Remove sessions left in the trash by an interrupted pass."""
+    if trash.is_dir():
+        for path in trash.iterdir():
+            shutil.rmtree(path, ignore_errors=True)
+
+
+def _active_sessions(sessions_dir: Path) -> frozenset[str]:
+    """Sessions the index marks as paused or running."""
+    from .session_index import SessionIndex
+    try:
+        index = SessionIndex(sessions_dir)
+        index.sync()
+        return frozenset(index.active_sessions())
+    except Exception as e:
+        logger.warning(f"Failed to read session index for retention: {e}")
+        return frozenset()
+
+
+def _file_size(path: Path) -> int:
+    try:
+        return path.stat().st_size
+    except OSError:
+        return 0
+
+
+def _get_retention_limits() -> tuple[int, int]:
+    """Get (keep_last, max_bytes) from config (lazy import)."""
+    try:
+        from .config import load_config
+        checkpoints = load_config().checkpoints
+        return checkpoints.keep_last, checkpoints.max_bytes
+    except ImportError:
+        return 0, 0
+
+
+def schedule_retention(
+    protect: Optional[str] = None,
+    sessions_dir: Optional[Path] = None,
+    timeout: float = RETENTION_TIMEOUT,
+) -> bool:
+    """Run a retention pass if any limit is configured.
+
+    Pending checkpoint writes are flushed first. The pass runs on a daemon
+    thread that is waited for at most timeout seconds; a pass still running
+    when the process exits is safe to abandon (see _evict()).
+
+    Args:
+        protect: Name of the session directory that must survive (the one
+            that just finished)
+        sessions_dir: Sessions directory (default: ~/.sdqctl/sessions)
+        timeout: Seconds to wait for the pass
+
+    Returns:
+        True if a pass was started
+    """
+    keep_last, max_bytes = _get_retention_limits()
+    if keep_last <= 0 and max_bytes <= 0:
+        return False
+    target = sessions_dir or DEFAULT_SESSIONS_DIR
+    protected = frozenset([protect] if protect else [])
+
+    def run() -> None:
+        try:
+            result = apply_retention(target, keep_last, max_bytes, protected)
+        except Exception as e:
+            logger.warning(f"Retention pass failed: {e}")
+            return
+        if result.checkpoints_removed or result.sessions_evicted:
+            logger.info(
+                f"Retention removed {len(result.checkpoints_removed)} checkpoints, "
+                f"evicted {len(result.sessions_evicted)} sessions "
+                f"({result.bytes_freed} bytes)"
+            )
+
+    try:
+        flush_checkpoints()
+    except Exception as e:
+        logger.error(f"Checkpoint write failed before retention: {e}")
+    thread = threading.Thread(target=run, name="sdqctl-retention", daemon=True)
+    thread.start()
+    thread.join(timeout)
+    if thread.is_alive():
+        logger.info(f"Retention pass still running after {timeout}s; not waiting for it")
+    return True
@@ -8,8 +8,12 @@ Handles:
 - ExecutionContext for unified command execution
 """
 
+import atexit
 import json
+import os
+import sys
 import uuid
+from collections.abc import Iterable, Sequence
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from pathlib import Path
@@ -17,13 +21,34 @@ from typing import TYPE_CHECKING, Any, Optional
 
 from rich.console import Console
 
+from .checkpoint_writer import flush_checkpoints, get_checkpoint_writer, write_durable
 from .context import ContextManager
 from .conversation import ConversationFile
+from .journal import SessionJournal, journal_compression, journal_name, load_checkpoint_data
+from .session_index import RUNNING_FILENAME, index_for
 
 if TYPE_CHECKING:
     from ..adapters.base import AdapterBase, AdapterConfig, AdapterSession
 
 
+def _message_to_dict(m: "Message") -> dict:
+    return {
+        "role": m.role,
+        "content": m.content,
+        "timestamp": m.timestamp.isoformat(),
+        "metadata": m.metadata,
+    }
+
+
+def _get_checkpoint_compression() -> str:
+    """Get session journal compression from config (lazy import)."""
+    try:
+        from .config import get_checkpoint_compression
+        return get_checkpoint_compression()
+    except ImportError:
+        return "none"
+
+
 @dataclass
 class ExecutionContext:
     """Unified context for workflow execution across commands.
@@ -153,7 +178,7 @@ async def create_execution_context(
     )
 
 
-@dataclass
+@dataclass(slots=True)
 class Message:
     """A message in the conversation."""
 
@@ -162,6 +187,81 @@ class Message:
     timestamp: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
     metadata: dict = field(default_factory=dict)
 
+    def __post_init__(self):
+        # A handful of distinct roles across every message (incl. ones loaded from JSON)
+        self.role = sys.intern(self.role)
+
+
+class MessageStore(list):
+    """Append-only message history that stores each distinct content once.
+
+    Workflows resend the same text over and over (the same PROMPT every
+    cycle, identical RUN output, repeated responses), and each send builds a
+    fresh string. Appending a message swaps its content for the first equal
+    string already stored, so duplicates share one object.
+
+    Messages are never removed, so a prefix of the store is a stable
+    snapshot: checkpoints keep a MessageRange instead of copying the list,
+    and the session journal tracks how many messages it holds. List methods
+    that would replace, reorder or remove messages raise TypeError.
+    """
+
+    __slots__ = ("_contents",)
+
+    def __init__(self, messages: Iterable[Message] = ()):
+        super().__init__()
+        self._contents: dict[str, str] = {}
+        for msg in messages:
+            self.append(msg)
+
+    def append(self, msg: Message) -> None:
+        msg.content = self._contents.setdefault(msg.content, msg.content)
+        super().append(msg)
+
+    def extend(self, messages: Iterable[Message]) -> None:
+        for msg in messages:
+            self.append(msg)
+
+    def __iadd__(self, messages: Iterable[Message]) -> "MessageStore":
+        self.extend(messages)
+        return self
+
+    def _read_only(self, *args, **kwargs):
+        raise TypeError("MessageStore is append-only")
+
+    insert = __setitem__ = __delitem__ = __imul__ = _read_only
+    clear = pop = remove = sort = reverse = _read_only
+
+    def upto(self, stop: int) -> "MessageRange":
+        """View of the first `stop` messages."""
+        return MessageRange(self, 0, stop)
+
+
+class MessageRange(Sequence):
+    """Read-only view of messages[start:stop] in a MessageStore."""
+
+    __slots__ = ("_store", "start", "stop")
+
+    def __init__(self, store: MessageStore, start: int, stop: int):
+        self._store = store
+        self.start = start
+        self.stop = stop
+
+    def __len__(self) -> int:
+        return self.stop - self.start
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._store[self.start + i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("message index out of range")
+        return self._store[self.start + index]
+
+    def __repr__(self) -> str:
+        return f"MessageRange({self.start}, {self.stop})"
+
 
 @dataclass
 class Checkpoint:
@@ -170,7 +270,7 @@ class Checkpoint:
     id: str
     name: Optional[str]
     timestamp: datetime
-    messages: list[Message]
+    messages: Sequence[Message]  # MessageRange into the session's MessageStore
     context_status: dict
     cycle_number: int
     metadata: dict
@@ -182,7 +282,7 @@ class SessionState:
 
     id: str
     conversation: ConversationFile
-    messages: list[Message] = field(default_factory=list)
+    messages: MessageStore = field(default_factory=MessageStore)
     cycle_number: int = 0
     prompt_index: int = 0
     checkpoints: list[Checkpoint] = field(default_factory=list)
@@ -191,6 +291,19 @@ class SessionState:
     status: str = "pending"  # pending, running, paused, completed, failed
 
 
+# Running markers written by this process, removed at exit at the latest
+_running_markers: set[Path] = set()
+
+
+def _remove_running_markers() -> None:
+    for marker in list(_running_markers):
+        marker.unlink(missing_ok=True)
+    _running_markers.clear()
+
+
+atexit.register(_remove_running_markers)
+
+
 class Session:
     """Manages a single workflow session."""
 
@@ -205,6 +318,8 @@ class Session:
         self.adapter = adapter
         self.session_dir = session_dir or Path.home() / ".sdqctl" / "sessions" / self.id
         self.sdk_session_id: Optional[str] = None  # SDK's session UUID for resume (Q-018)
+        self._journal: Optional[SessionJournal] = None
+        self._running_marker: Optional[Path] = None
 
         # Initialize state
         self.state = SessionState(
@@ -227,17 +342,23 @@ class Session:
             base_path=Path(conversation.cwd) if conversation.cwd else Path.cwd(),
             limit_threshold=conversation.context_limit,
             path_filter=path_filter,
+            token_budget=conversation.context_budget,
+            priority_patterns=conversation.context_priority,
+            file_token_limit=conversation.context_file_limit,
+            pattern_token_limit=conversation.context_pattern_limit,
         )
 
-        # Load context files
+        # Load context files, then fit them into the token budget
         for pattern in conversation.context_files:
             self.context.add_pattern(pattern)
+        self.context.pack()
 
     def reload_context(self) -> None:
         """Reload CONTEXT files from disk.
 
         Used by fresh mode to pick up file changes between cycles.
-        Preserves ContextManager config (base_path, limit_threshold, path_filter).
+        Preserves ContextManager config (base_path, limit_threshold, path_filter,
+        token budget).
         """
         # Clear existing files (preserves conversation token count)
         self.context.clear_files()
@@ -245,6 +366,7 @@ class Session:
         # Re-load from disk using stored patterns
         for pattern in self.conversation.context_files:
             self.context.add_pattern(pattern)
+        self.context.pack()
 
     def add_message(self, role: str, content: str, **metadata) -> Message:
         """Add a message to the conversation."""
@@ -295,7 +417,7 @@ class Session:
             id=str(uuid.uuid4())[:8],
             name=checkpoint_name,
             timestamp=datetime.now(timezone.utc),
-            messages=list(self.state.messages),  # Copy
+            messages=self.state.messages.upto(len(self.state.messages)),
             context_status=self.context.get_status(),
             cycle_number=self.state.cycle_number,
             metadata={
@@ -312,29 +434,86 @@ class Session:
         return checkpoint
 
     def _save_checkpoint(self, checkpoint: Checkpoint) -> None:
-        """Save checkpoint to disk."""
-        self.session_dir.mkdir(parents=True, exist_ok=True)
+        """Save checkpoint to disk.
 
-        checkpoint_file = self.session_dir / f"checkpoint-{checkpoint.id}.json"
+        New messages go to the session journal; the checkpoint file holds
+        only the state header and how many journal messages it covers. The
+        write happens on the background checkpoint writer.
+        """
         data = {
             "id": checkpoint.id,
             "name": checkpoint.name,
             "timestamp": checkpoint.timestamp.isoformat(),
             "cycle_number": checkpoint.cycle_number,
             "metadata": checkpoint.metadata,
-            "messages": [
-                {
-                    "role": m.role,
-                    "content": m.content,
-                    "timestamp": m.timestamp.isoformat(),
-                    "metadata": m.metadata,
-                }
-                for m in checkpoint.messages
-            ],
             "context_status": checkpoint.context_status,
+            "journal": self._get_journal().path.name,
+            "message_count": len(checkpoint.messages),
         }
-
-        checkpoint_file.write_text(json.dumps(data, indent=2))
+        checkpoint_file = self.session_dir / f"checkpoint-{checkpoint.id}.json"
+        self._submit_checkpoint(checkpoint_file, data, {"type": "checkpoint", **data})
+
+    def _get_journal(self) -> SessionJournal:
+        """Get the journal for the current session id."""
+        journal = self._journal
+        if (
+            journal is None
+            or journal.path.parent != self.session_dir
+            or not journal.path.name.startswith(journal_name(self.id))
+        ):
+            compression = _get_checkpoint_compression()
+            path = self.session_dir / journal_name(self.id, compression)
+            self._journal = SessionJournal(path, compression=compression)
+        return self._journal
+
+    def _submit_checkpoint(self, checkpoint_file: Path, data: dict, record: dict) -> None:
+        """Queue a journal append plus header file write on the checkpoint writer.
+
+        The checkpoint's message count is captured now, so later messages
+        cannot leak into it; encoding and I/O happen off the caller's thread.
+        The journal's `written` count advances only once the append has
+        succeeded, so after a failed write (e.g. a full disk) the next
+        checkpoint appends the same messages again instead of leaving a gap.
+        """
+        journal = self._get_journal()
+        messages = self.state.messages  # Append-only (MessageStore)
+        stop = len(messages)
+
+        index = index_for(self.session_dir)
+        session_id = self.session_dir.name  # The index is keyed by directory
+        marker = None
+        if self._running_marker is None:
+            marker = self._running_marker = self.session_dir / RUNNING_FILENAME
+            _running_markers.add(marker)
+
+        def write() -> None:
+            if marker is not None:
+                # Before the first journal byte, so retention never sees the
+                # session directory without it while this process runs
+                write_durable(marker, str(os.getpid()).encode())
+            start = journal.written
+            journal.write(start, [_message_to_dict(m) for m in messages[start:stop]], record)
+            journal.written = stop
+            write_durable(checkpoint_file, json.dumps(data, indent=2).encode("utf-8"))
+            if index is not None:
+                if data.get("type") == "pause":
+                    index.record_pause(session_id, data)
+                else:
+                    index.record_checkpoint(session_id, data)
+
+        get_checkpoint_writer().submit(write)
+
+    def mark_finished(self) -> None:
+        """Drop the running marker once pending checkpoint writes are done.
+
+        The marker (running.pid) is written with the session's first
+        checkpoint and keeps retention from evicting the directory while
+        this process runs.
+        """
+        marker, self._running_marker = self._running_marker, None
+        if marker is not None:
+            _running_markers.discard(marker)
+            get_checkpoint_writer().submit(lambda: marker.unlink(missing_ok=True))
 
     def save_pause_checkpoint(
         self, message: str, expires_at: Optional[str] = None
@@ -346,10 +525,9 @@ class Session:
             expires_at: Optional ISO timestamp when this checkpoint expires
 
         Returns:
-            Path to the checkpoint file
+            Path to the checkpoint file (written and fsync'd, along with any
+            queued checkpoints, before this returns)
         """
-        self.session_dir.mkdir(parents=True, exist_ok=True)
-
         checkpoint_file = self.session_dir / "pause.json"
         data = {
             "type": "pause",
@@ -367,25 +545,22 @@ class Session:
             ),
             "cycle_number": self.state.cycle_number,
             "prompt_index": self.state.prompt_index,
-            "messages": [
-                {
-                    "role": m.role,
-                    "content": m.content,
-                    "timestamp": m.timestamp.isoformat(),
-                    "metadata": m.metadata,
-                }
-                for m in self.state.messages
-            ],
             "context_status": self.context.get_status(),
+            "journal": self._get_journal().path.name,
+            "message_count": len(self.state.messages),
         }
-
-        checkpoint_file.write_text(json.dumps(data, indent=2))
+        self._submit_checkpoint(checkpoint_file, data, data)
+        flush_checkpoints()
         return checkpoint_file
 
     @classmethod
     def load_from_pause(cls, checkpoint_path: Path) -> "Session":
-        """Load a session from a pause checkpoint file."""
-        data = json.loads(checkpoint_path.read_text())
+        """Load a session from a pause checkpoint file.
+
+        Messages are read back from the session journal (or, for checkpoints
+        written before the journal, from the file itself).
+        """
+        data = load_checkpoint_data(checkpoint_path)
 
         # Load the original conversation file or inline content
         conv_path = data.get("conversation_file")
@@ -423,6 +598,15 @@ class Session:
             )
             session.state.messages.append(msg)
 
+        # Keep appending to the same journal after the restored messages
+        # (older checkpoints embed their messages, so those start a new one)
+        if data.get("journal"):
+            session._journal = SessionJournal(
+                checkpoint_path.parent / data["journal"],
+                written=len(session.state.messages),
+                compression=journal_compression(data["journal"]),
+            )
+
         return session
 
     def needs_compaction(self, min_density: float = 0) -> bool:
@@ -0,0 +1,366 @@
+"""
+SQLite index of local session storage.
+
+`status` and `sessions list` used to walk ~/.sdqctl/sessions and parse every
+session's checkpoint headers and metrics.json, which takes seconds once CI
+runners accumulate thousands of sessions. This index keeps one row per
+session (checkpoint count, pause state, token metrics) and one row per
+checkpoint in ~/.sdqctl/sessions.db, next to the sessions directory.
+
+Writers update it in a transaction right after the file they describe is on
+disk (checkpoint and pause headers via the checkpoint writer, metrics.json
+when a session is destroyed). The files stay the source of truth:
+
+- sync() re-indexes only session directories whose mtime differs from the
+  one recorded (new, changed or deleted sessions, or ones written by older
+  versions), so a stale index heals itself at the cost of a directory scan.
+- rebuild() drops everything and re-reads the directory from scratch
+  (`sdqctl sessions reindex`).
+
+Sessions stored outside a `sessions/` directory (e.g. an explicit
+session_dir in tests) are not indexed.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+from contextlib import closing
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Optional
+
+from .journal import read_checkpoint_header
+
+logger = logging.getLogger("sdqctl.core.session_index")
+
+INDEX_FILENAME = "sessions.db"
+RUNNING_FILENAME = "running.pid"  # PID of the process running a session
+SCHEMA_VERSION = 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS sessions (
+    id TEXT PRIMARY KEY,
+    dir_mtime REAL,
+    modified REAL NOT NULL DEFAULT 0,
+    checkpoints INTEGER NOT NULL DEFAULT 0,
+    paused INTEGER NOT NULL DEFAULT 0,
+    status TEXT,
+    pause_message TEXT,
+    input_tokens INTEGER NOT NULL DEFAULT 0,
+    output_tokens INTEGER NOT NULL DEFAULT 0,
+    cycles INTEGER NOT NULL DEFAULT 0,
+    total_seconds REAL NOT NULL DEFAULT 0,
+    metrics TEXT
+);
+CREATE INDEX IF NOT EXISTS sessions_modified ON sessions (modified);
+CREATE TABLE IF NOT EXISTS checkpoints (
+    session_id TEXT NOT NULL,
+    id TEXT NOT NULL,
+    name TEXT,
+    timestamp TEXT,
+    cycle INTEGER,
+    PRIMARY KEY (session_id, id)
+);
+"""
+
+# Columns accepted by list_sessions(sort=...)
+SORT_COLUMNS = {
+    "modified", "id", "checkpoints", "input_tokens", "output_tokens", "cycles",
+    "total_seconds",
+}
+
+# Session statuses that must survive retention (see active_sessions())
+ACTIVE_STATUSES = ("running", "paused")
+
+
+class SessionIndex:
+    """SQLite index over one sessions directory."""
+
+    def __init__(self, sessions_dir: Path, db_path: Optional[Path] = None):
+        self.sessions_dir = sessions_dir
+        self.db_path = db_path or sessions_dir.parent / INDEX_FILENAME
+
+    def _connect(self) -> sqlite3.Connection:
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        conn.row_factory = sqlite3.Row
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        if version != SCHEMA_VERSION:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(
+                "DROP TABLE IF EXISTS sessions; DROP TABLE IF EXISTS checkpoints;" + _SCHEMA
+            )
+            conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        return conn
+
+    # --- Writers (called after the corresponding file is on disk) ---
+
+    def record_checkpoint(self, session_id: str, header: dict) -> None:
+        """Index a checkpoint-<id>.json header."""
+        self._record(session_id, lambda conn: _insert_checkpoint(conn, session_id, header))
+
+    def record_pause(self, session_id: str, header: dict) -> None:
+        """Index a pause.json header."""
+        self._record(session_id, lambda conn: _update_pause(conn, session_id, header))
+
+    def record_metrics(self, session_id: str, metrics: dict) -> None:
+        """Index a metrics.json document."""
+        self._record(session_id, lambda conn: _update_metrics(conn, session_id, metrics))
+
+    def remove(self, session_id: str) -> None:
+        """Drop a session from the index."""
+        try:
+            with closing(self._connect()) as conn, conn:
+                conn.execute("DELETE FROM sessions WHERE id = ?", (session_id,))
+                conn.execute("DELETE FROM checkpoints WHERE session_id = ?", (session_id,))
+        except sqlite3.Error as e:
+            logger.warning(f"Failed to update session index: {e}")
+
+    def _record(self, session_id: str, update) -> None:
+        # The index is derived data: a failed update is healed by the next sync()
+        try:
+            with closing(self._connect()) as conn, conn:
+                _ensure_session(conn, session_id)
+                update(conn)
+                _touch(conn, session_id, self.sessions_dir / session_id)
+        except sqlite3.Error as e:
+            logger.warning(f"Failed to update session index: {e}")
+
+    # --- Maintenance ---
+
+    def sync(self) -> int:
+        """Re-index sessions whose directory changed since they were indexed.
+
+        Returns:
+            Number of sessions re-indexed or removed
+        """
+        on_disk: dict[str, float] = {}
+        if self.sessions_dir.is_dir():
+            with os.scandir(self.sessions_dir) as it:
+                for entry in it:
+                    if entry.is_dir():
+                        on_disk[entry.name] = entry.stat().st_mtime
+
+        with closing(self._connect()) as conn, conn:
+            known = dict(conn.execute("SELECT id, dir_mtime FROM sessions").fetchall())
+            removed = known.keys() - on_disk.keys()
+            stale = [sid for sid, mtime in on_disk.items() if known.get(sid) != mtime]
+            for session_id in removed:
+                conn.execute("DELETE FROM sessions WHERE id = ?", (session_id,))
+                conn.execute("DELETE FROM checkpoints WHERE session_id = ?", (session_id,))
+            for session_id in stale:
+                _index_dir(conn, session_id, self.sessions_dir / session_id)
+        return len(removed) + len(stale)
+
+    def rebuild(self) -> int:
+        """Drop the index and re-read every session directory.
+
+        Returns:
+            Number of sessions indexed
+        """
+        with closing(self._connect()) as conn, conn:
+            conn.execute("DELETE FROM sessions")
+            conn.execute("DELETE FROM checkpoints")
+        return self.sync()
+
+    # --- Queries ---
+
+    def totals(self) -> tuple[int, int]:
+        """Return (session count, checkpoint count)."""
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(checkpoints), 0) FROM sessions"
+            ).fetchone()
+        return row[0], row[1]
+
+    def list_sessions(
+        self,
+        pattern: Optional[str] = None,
+        sort: str = "modified",
+        descending: bool = True,
+        limit: Optional[int] = None,
+    ) -> list[dict[str, Any]]:
+        """List indexed sessions.
+
+        Args:
+            pattern: Glob on the session id (e.g. "audit-*")
+            sort: Column to sort by (see SORT_COLUMNS)
+            descending: Sort direction
+            limit: Maximum rows to return
+
+        Raises:
+            ValueError: If sort is not a known column
+        """
+        if sort not in SORT_COLUMNS:
+            raise ValueError(f"Cannot sort sessions by '{sort}'")
+        query = "SELECT * FROM sessions"
+        params: list[Any] = []
+        if pattern:
+            query += " WHERE id GLOB ?"
+            params.append(pattern)
+        query += f" ORDER BY {sort} {'DESC' if descending else 'ASC'}, id"
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+
+        with closing(self._connect()) as conn:
+            rows = conn.execute(query, params).fetchall()
+        return [_session_dict(row) for row in rows]
+
+    def active_sessions(self) -> set[str]:
+        """Ids of sessions that are paused or marked running/paused."""
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT id FROM sessions WHERE paused = 1 OR status IN (?, ?)",
+                ACTIVE_STATUSES,
+            ).fetchall()
+        return {row["id"] for row in rows}
+
+    def get_checkpoints(self, session_id: str) -> list[dict[str, Any]]:
+        """List a session's checkpoints, oldest first."""
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT id, name, timestamp, cycle FROM checkpoints "
+                "WHERE session_id = ? ORDER BY timestamp, id",
+                (session_id,),
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def get_metrics(self, session_ids: list[str]) -> dict[str, dict]:
+        """Return stored metrics.json documents keyed by session id."""
+        result: dict[str, dict] = {}
+        with closing(self._connect()) as conn:
+            for start in range(0, len(session_ids), 500):
+                chunk = session_ids[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = conn.execute(
+                    f"SELECT id, metrics FROM sessions "
+                    f"WHERE metrics IS NOT NULL AND id IN ({placeholders})",
+                    chunk,
+                ).fetchall()
+                for row in rows:
+                    result[row["id"]] = json.loads(row["metrics"])
+        return result
+
+
+def index_for(session_dir: Path) -> Optional[SessionIndex]:
+    """Get the index covering a session directory, if it lives in sessions/."""
+    if session_dir.parent.name != "sessions":
+        return None
+    return SessionIndex(session_dir.parent)
+
+
+def is_running(session_dir: Path) -> bool:
+    """True if a live process holds the session's running.pid marker.
+
+    Markers left behind by a process that died are ignored.
+    """
+    try:
+        pid = int((session_dir / RUNNING_FILENAME).read_text())
+    except (OSError, ValueError):
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True  # Alive, owned by another user
+    return True
+
+
+def _ensure_session(conn: sqlite3.Connection, session_id: str) -> None:
+    conn.execute("INSERT OR IGNORE INTO sessions (id) VALUES (?)", (session_id,))
+
+
+def _touch(conn: sqlite3.Connection, session_id: str, session_dir: Path) -> None:
+    try:
+        mtime = session_dir.stat().st_mtime
+    except OSError:
+        return
+    conn.execute(
+        "UPDATE sessions SET dir_mtime = ?, modified = MAX(modified, ?) WHERE id = ?",
+        (mtime, mtime, session_id),
+    )
+
+
+def _insert_checkpoint(conn: sqlite3.Connection, session_id: str, header: dict) -> None:
+    conn.execute(
+        "INSERT OR REPLACE INTO checkpoints (session_id, id, name, timestamp, cycle) "
+        "VALUES (?, ?, ?, ?, ?)",
+        (session_id, header.get("id"), header.get("name"), header.get("timestamp"),
+         header.get("cycle_number")),
+    )
+    conn.execute(
+        "UPDATE sessions SET checkpoints = "
+        "(SELECT COUNT(*) FROM checkpoints WHERE session_id = ?) WHERE id = ?",
+        (session_id, session_id),
+    )
+
+
+def _update_pause(conn: sqlite3.Connection, session_id: str, header: dict) -> None:
+    conn.execute(
+        "UPDATE sessions SET paused = 1, status = ?, pause_message = ? WHERE id = ?",
+        (header.get("status"), header.get("message"), session_id),
+    )
+
+
+def _update_metrics(conn: sqlite3.Connection, session_id: str, metrics: dict) -> None:
+    tokens = metrics.get("token_efficiency") or {}
+    duration = metrics.get("duration") or {}
+    conn.execute(
+        "UPDATE sessions SET input_tokens = ?, output_tokens = ?, cycles = ?, "
+        "total_seconds = ?, metrics = ? WHERE id = ?",
+        (
+            tokens.get("input_tokens") or 0,
+            tokens.get("output_tokens") or 0,
+            duration.get("cycles") or 0,
+            duration.get("total_seconds") or 0,
+            json.dumps(metrics),
+            session_id,
+        ),
+    )
+
+
+def _index_dir(conn: sqlite3.Connection, session_id: str, session_dir: Path) -> None:
+    """(Re-)index one session directory from its files."""
+    conn.execute("DELETE FROM checkpoints WHERE session_id = ?", (session_id,))
+    conn.execute("DELETE FROM sessions WHERE id = ?", (session_id,))
+    _ensure_session(conn, session_id)
+
+    for cp_file in session_dir.glob("checkpoint-*.json"):
+        try:
+            _insert_checkpoint(conn, session_id, read_checkpoint_header(cp_file))
+        except (OSError, ValueError) as e:
+            logger.debug(f"Skipping unreadable checkpoint {cp_file}: {e}")
+
+    pause_file = session_dir / "pause.json"
+    if pause_file.exists():
+        try:
+            _update_pause(conn, session_id, read_checkpoint_header(pause_file))
+        except (OSError, ValueError) as e:
+            logger.debug(f"Skipping unreadable pause file {pause_file}: {e}")
+
+    metrics_file = session_dir / "metrics.json"
+    if metrics_file.exists():
+        try:
+            _update_metrics(conn, session_id, json.loads(metrics_file.read_text()))
+        except (OSError, ValueError) as e:
+            logger.debug(f"Skipping unreadable metrics {metrics_file}: {e}")
+
+    _touch(conn, session_id, session_dir)
+
+
+def _session_dict(row: sqlite3.Row) -> dict[str, Any]:
+    return {
+        "id": row["id"],
+        "modified": datetime.fromtimestamp(row["modified"]).isoformat(),
+        "checkpoints": row["checkpoints"],
+        "paused": bool(row["paused"]),
+        "status": row["status"],
+        "input_tokens": row["input_tokens"],
+        "output_tokens": row["output_tokens"],
+        "cycles": row["cycles"],
+        "total_seconds": row["total_seconds"],
+    }
@@ -0,0 +1,258 @@
+"""
+Pluggable token counting for context window tracking.
+
+The default heuristic (~4 characters per token) is off by 30% or more on
+code-heavy contexts, which makes ContextWindow.is_near_limit trigger
+compaction too early or too late. When a local BPE vocabulary is available
+it is used instead; otherwise the heuristic remains the fallback.
+
+Tokenizers:
+    heuristic   len(text) // 4 (zero dependencies, always available)
+    bpe         Byte-pair encoding using a local vocabulary file in tiktoken
+                format: one "<base64 token> <rank>" pair per line
+                (e.g. cl100k_base.tiktoken)
+
+Selection (first match wins):
+    1. SDQCTL_TOKENIZER environment variable (tokenizer name)
+    2. context.tokenizer in .sdqctl.yaml ("auto" by default)
+    3. auto: "bpe" if a vocabulary file is found, else "heuristic"
+
+Vocabulary search order for "bpe":
+    1. SDQCTL_TOKENIZER_VOCAB environment variable
+    2. context.tokenizer_vocab in .sdqctl.yaml
+    3. ~/.sdqctl/tokenizer.tiktoken
+
+Counts from tokenizers that are expensive to run are cached by content hash,
+so re-estimating unchanged files is free.
+
+Custom tokenizers can be added with register_tokenizer().
+"""
+
+import base64
+import hashlib
+import logging
+import os
+import re
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Optional
+
+logger = logging.getLogger("sdqctl.core.tokenizer")
+
+# Default vocabulary location for the "bpe" tokenizer
+DEFAULT_VOCAB_PATH = Path.home() / ".sdqctl" / "tokenizer.tiktoken"
+
+# Max number of content hashes remembered by the count cache
+COUNT_CACHE_SIZE = 4096
+
+# Pre-tokenization split, approximating the cl100k pattern with stdlib `re`
+_PRETOKENIZE = re.compile(
+    r"'(?:[sdmt]|ll|ve|re)"
+    r"| ?[^\W\d_]+"
+    r"|\d{1,3}"
+    r"| ?[^\s\w]+[\r\n]*"
+    r"|\s*[\r\n]+"
+    r"|\s+(?!\S)"
+    r"|\s+",
+    re.IGNORECASE,
+)
+
+
+class Tokenizer(ABC):
+    """Base class for token counters."""
+
+    name = "base"
+    # Whether counts are worth caching by content hash
+    cacheable = False
+
+    @abstractmethod
+    def count(self, text: str) -> int:
+        """Number of tokens in text."""
+
+
+class HeuristicTokenizer(Tokenizer):
+    """~4 characters per token; cheap and dependency free."""
+
+    name = "heuristic"
+
+    def count(self, text: str) -> int:
+        return len(text) // 4
+
+
+class BPETokenizer(Tokenizer):
+    """Byte-pair encoding token counter backed by a tiktoken-format vocabulary."""
+
+    name = "bpe"
+    cacheable = True
+
+    # Max distinct pre-tokenized pieces remembered between calls
+    PIECE_CACHE_SIZE = 100_000
+
+    def __init__(self, ranks: dict[bytes, int], source: Optional[Path] = None):
+        self.ranks = ranks
+        self.source = source
+        self._piece_cache: dict[bytes, int] = {}
+
+    @classmethod
+    def from_file(cls, path: Path) -> "BPETokenizer":
+        """Load a tiktoken-format vocabulary ("<base64 token> <rank>" per line)."""
+        ranks: dict[bytes, int] = {}
+        with open(path, "rb") as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) != 2:
+                    continue
+                ranks[base64.b64decode(parts[0])] = int(parts[1])
+        if not ranks:
+            raise ValueError(f"Empty or invalid BPE vocabulary: {path}")
+        return cls(ranks, source=path)
+
+    def count(self, text: str) -> int:
+        total = 0
+        cache = self._piece_cache
+        for match in _PRETOKENIZE.finditer(text):
+            piece = match.group().encode("utf-8")
+            n = cache.get(piece)
+            if n is None:
+                n = self._count_piece(piece)
+                if len(cache) >= self.PIECE_CACHE_SIZE:
+                    cache.clear()
+                cache[piece] = n
+            total += n
+        return total
+
+    def _count_piece(self, piece: bytes) -> int:
+        """Apply BPE merges to a single piece and return its token count."""
+        ranks = self.ranks
+        if piece in ranks:
+            return 1
+        parts = [piece[i:i + 1] for i in range(len(piece))]
+        while len(parts) > 1:
+            best_rank = None
+            best_idx = -1
+            for i in range(len(parts) - 1):
+                rank = ranks.get(parts[i] + parts[i + 1])
+                if rank is not None and (best_rank is None or rank < best_rank):
+                    best_rank = rank
+                    best_idx = i
+            if best_rank is None:
+                break
+            parts[best_idx:best_idx + 2] = [parts[best_idx] + parts[best_idx + 1]]
+        return len(parts)
+
+
+def _find_vocab() -> Optional[Path]:
+    """Locate a BPE vocabulary file (see module docstring for search order)."""
+    candidates = []
+    env_vocab = os.environ.get("SDQCTL_TOKENIZER_VOCAB")
+    if env_vocab:
+        candidates.append(Path(env_vocab).expanduser())
+    config_vocab = _config_value("tokenizer_vocab")
+    if config_vocab:
+        candidates.append(Path(config_vocab).expanduser())
+    candidates.append(DEFAULT_VOCAB_PATH)
+
+    for path in candidates:
+        if path.is_file():
+            return path
+    return None
+
+
+def _config_value(key: str) -> Optional[str]:
+    """Read a context.* tokenizer setting from .sdqctl.yaml (lazy import)."""
+    try:
+        from .config import load_config
+        return getattr(load_config().context, key, None)
+    except ImportError:
+        return None
+
+
+def _make_heuristic() -> Tokenizer:
+    return HeuristicTokenizer()
+
+
+def _make_bpe() -> Tokenizer:
+    vocab = _find_vocab()
+    if vocab is None:
+        raise FileNotFoundError("No BPE vocabulary file found")
+    return BPETokenizer.from_file(vocab)
+
+
+# Registry of tokenizer factories by name
+TOKENIZERS: dict[str, Callable[[], Tokenizer]] = {
+    "heuristic": _make_heuristic,
+    "bpe": _make_bpe,
+}
+
+
+def register_tokenizer(name: str, factory: Callable[[], Tokenizer]) -> None:
+    """Register a tokenizer factory under a name usable in SDQCTL_TOKENIZER."""
+    TOKENIZERS[name] = factory
+
+
+# Active tokenizer and count cache (process-wide)
+_tokenizer: Optional[Tokenizer] = None
+_count_cache: OrderedDict[bytes, int] = OrderedDict()
+_lock = threading.Lock()
+
+
+def get_tokenizer() -> Tokenizer:
+    """Get the active tokenizer, resolving it on first use."""
+    global _tokenizer
+    if _tokenizer is None:
+        _tokenizer = _resolve_tokenizer()
+    return _tokenizer
+
+
+def _resolve_tokenizer() -> Tokenizer:
+    name = os.environ.get("SDQCTL_TOKENIZER") or _config_value("tokenizer") or "auto"
+    if name == "auto":
+        name = "bpe" if _find_vocab() is not None else "heuristic"
+
+    factory = TOKENIZERS.get(name)
+    if factory is None:
+        logger.warning(f"Unknown tokenizer '{name}', using heuristic")
+        return HeuristicTokenizer()
+    try:
+        return factory()
+    except Exception as e:
+        logger.warning(f"Failed to load tokenizer '{name}': {e}; using heuristic")
+        return HeuristicTokenizer()
+
+
+def set_tokenizer(tokenizer: Optional[Tokenizer]) -> None:
+    """Override the active tokenizer (None re-resolves on next use).
+
+    Also drops cached file contents, whose token estimates were computed
+    with the previous tokenizer.
+    """
+    global _tokenizer
+    from .file_cache import clear_file_cache
+
+    with _lock:
+        _tokenizer = tokenizer
+        _count_cache.clear()
+    clear_file_cache()
+
+
+def count_tokens(text: str) -> int:
+    """Count tokens with the active tokenizer, cached by content hash."""
+    tokenizer = get_tokenizer()
+    if not tokenizer.cacheable:
+        return tokenizer.count(text)
+
+    digest = hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+    with _lock:
+        cached = _count_cache.get(digest)
+        if cached is not None:
+            _count_cache.move_to_end(digest)
+            return cached
+
+    tokens = tokenizer.count(text)
+    with _lock:
+        _count_cache[digest] = tokens
+        if len(_count_cache) > COUNT_CACHE_SIZE:
+            _count_cache.popitem(last=False)
+    return tokens
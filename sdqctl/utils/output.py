@@ -13,7 +13,7 @@ TTY detection (git-style):
 import json
 import sys
 from pathlib import Path
-from typing import Any, Optional, Union
+from typing import Any, Iterable, Optional, Union
 
 from rich.console import Console
 from rich.markdown import Markdown
@@ -67,7 +67,7 @@ class PromptWriter:
 
     def write_prompt(
         self,
-        prompt: str,
+        prompt: Union[str, Iterable[str]],
         cycle: int = 1,
         total_cycles: int = 1,
         prompt_idx: int = 1,
@@ -77,7 +77,8 @@ class PromptWriter:
         """Write a prompt to stderr with context information.
 
         Args:
-            prompt: The fully expanded prompt text
+            prompt: The fully expanded prompt text, or an iterable of its
+                chunks (written as they come, without joining them)
             cycle: Current cycle number (1-indexed)
             total_cycles: Total number of cycles
             prompt_idx: Current prompt index (1-indexed)
@@ -100,15 +101,23 @@ class PromptWriter:
         if _stderr_is_tty:
             self.console.print()
             self.console.print(Rule(header, style="dim"))
-            self.console.print(prompt)
+            self._write_body(prompt)
             self.console.print(Rule(style="dim"))
         else:
             # Plain text for redirection/logging
             separator = "─" * 60
             self.console.print(f"\n{header} {separator}")
-            self.console.print(prompt)
+            self._write_body(prompt)
             self.console.print(separator)
 
+    def _write_body(self, prompt: Union[str, Iterable[str]]) -> None:
+        if isinstance(prompt, str):
+            self.console.print(prompt)
+            return
+        for chunk in prompt:
+            self.console.out(chunk, end="", highlight=False)
+        self.console.out("")
+
 
 def format_output(data: Any, format: str = "markdown", title: str = None) -> str:
     """Format data for output.
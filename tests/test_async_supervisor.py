@@ -0,0 +1,132 @@
+"""Tests for the RUN-ASYNC supervisor - sdqctl/commands/async_supervisor.py"""
+
+import asyncio
+import socket
+import sys
+import time
+
+import pytest
+
+from sdqctl.commands.async_supervisor import ProcessSupervisor, parse_probe
+
+
+def _supervised(tmp_path, body):
+    """Run body(supervisor) and always stop the supervisor's processes."""
+
+    async def main():
+        supervisor = ProcessSupervisor()
+        try:
+            return await body(supervisor)
+        finally:
+            await supervisor.stop_all(grace=1)
+
+    return asyncio.run(main())
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class TestParseProbe:
+    def test_probes_and_durations(self):
+        assert parse_probe("5s") is None
+        assert parse_probe("port:8000").describe() == "port 127.0.0.1:8000"
+        assert parse_probe("port:localhost:3000").host == "localhost"
+        assert parse_probe("output:ready in \\d+ms").pattern.search("ready in 12ms")
+
+    def test_malformed(self):
+        with pytest.raises(ValueError):
+            parse_probe("port:http")
+        with pytest.raises(ValueError):
+            parse_probe("output:(")
+
+
+class TestProcessSupervisor:
+    def test_chatty_process_is_drained(self, tmp_path):
+        # ~1MB of output would block on a full pipe if nothing read it
+        command = "python -c \"import sys; [print('x' * 99) for _ in range(10000)]; print('done')\""
+
+        async def body(supervisor):
+            bg = await supervisor.start(command, allow_shell=True, cwd=tmp_path)
+            await asyncio.wait_for(bg.proc.wait(), 10)
+            return await supervisor.wait_ready(parse_probe("output:^done$"), 5), bg
+
+        (ready, _), bg = _supervised(tmp_path, body)
+        assert ready and bg.returncode == 0
+        assert bg.buffers["stdout"].total_lines == 10001
+
+    def test_output_probe_waits_for_pattern(self, tmp_path):
+        async def body(supervisor):
+            await supervisor.start(
+                "sleep 0.3; echo 'Listening on 4000'; sleep 5", allow_shell=True, cwd=tmp_path
+            )
+            return await supervisor.wait_ready(parse_probe("output:Listening on \\d+"), 5)
+
+        assert _supervised(tmp_path, body) == (True, "")
+
+    def test_port_probe(self, tmp_path):
+        port = _free_port()
+        server = (
+            f"{sys.executable} -c \"import socket, time; s = socket.socket(); "
+            f"time.sleep(0.3); s.bind(('127.0.0.1', {port})); s.listen(); time.sleep(5)\""
+        )
+
+        async def body(supervisor):
+            await supervisor.start(server, allow_shell=True, cwd=tmp_path)
+            return await supervisor.wait_ready(parse_probe(f"port:{port}"), 5)
+
+        assert _supervised(tmp_path, body) == (True, "")
+
+    def test_probe_fails_fast_when_process_exits(self, tmp_path):
+        async def body(supervisor):
+            await supervisor.start("echo boom; exit 4", allow_shell=True, cwd=tmp_path)
+            return await supervisor.wait_ready(parse_probe("output:never"), 10)
+
+        start = time.perf_counter()
+        assert _supervised(tmp_path, body) == (False, "process exited with code 4")
+        assert time.perf_counter() - start < 3
+
+    def test_stop_all_kills_process_group(self, tmp_path):
+        async def body(supervisor):
+            bg = await supervisor.start(
+                "sleep 30 & echo $! > child.pid; wait", allow_shell=True, cwd=tmp_path
+            )
+            await supervisor.wait_ready(parse_probe("output:.*"), 0.5)
+            pid_file = tmp_path / "child.pid"
+            for _ in range(50):
+                # The file is created before the shell writes the PID into it
+                if pid_file.exists() and pid_file.read_text().strip():
+                    break
+                await asyncio.sleep(0.05)
+            await supervisor.stop_all(grace=1)
+            return bg
+
+        bg = _supervised(tmp_path, body)
+        assert bg.returncode is not None
+        child = int((tmp_path / "child.pid").read_text())
+
+        def sleeper_alive():
+            # Gone, a zombie waiting to be reaped by init, or a reused PID
+            try:
+                with open(f"/proc/{child}/stat") as f:
+                    state = f.read().split(") ")[1][0]
+                with open(f"/proc/{child}/cmdline", "rb") as f:
+                    cmdline = f.read()
+            except (OSError, IndexError):
+                return False
+            return state != "Z" and cmdline.startswith(b"sleep\0")
+
+        for _ in range(20):
+            if not sleeper_alive():
+                break
+            time.sleep(0.05)
+        assert not sleeper_alive()
+
+    def test_find_running_reuses_process(self, tmp_path):
+        async def body(supervisor):
+            bg = await supervisor.start("sleep 5", allow_shell=True, cwd=tmp_path)
+            return supervisor.find_running("sleep 5", tmp_path) is bg
+
+        assert _supervised(tmp_path, body)
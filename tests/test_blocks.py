@@ -4,6 +4,7 @@ import pytest
 from unittest.mock import AsyncMock, MagicMock, patch
 
 from sdqctl.commands.blocks import execute_block_steps
+from sdqctl.commands.run_engine import RunResult
 from sdqctl.core.conversation import ConversationStep
 
 
@@ -77,12 +78,8 @@ class TestExecuteBlockSteps:
     async def test_run_step_executes_command(self, mock_context):
         steps = [ConversationStep(type="run", content="echo test")]
         
-        with patch("sdqctl.commands.blocks.subprocess.run") as mock_run:
-            mock_run.return_value = MagicMock(
-                returncode=0,
-                stdout="test output",
-                stderr=""
-            )
+        with patch("sdqctl.commands.blocks.run_command", new_callable=AsyncMock) as mock_run:
+            mock_run.return_value = RunResult("echo test", 0, "test output", "", 0.1)
             await execute_block_steps(steps, **mock_context)
             
             mock_run.assert_called_once()
@@ -92,12 +89,8 @@ class TestExecuteBlockSteps:
     async def test_run_step_handles_failure(self, mock_context):
         steps = [ConversationStep(type="run", content="false")]
         
-        with patch("sdqctl.commands.blocks.subprocess.run") as mock_run:
-            mock_run.return_value = MagicMock(
-                returncode=1,
-                stdout="",
-                stderr="error"
-            )
+        with patch("sdqctl.commands.blocks.run_command", new_callable=AsyncMock) as mock_run:
+            mock_run.return_value = RunResult("false", 1, "", "error", 0.1)
             await execute_block_steps(steps, **mock_context)
             
             # Should still complete without raising
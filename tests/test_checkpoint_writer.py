@@ -0,0 +1,115 @@
+"""
+Tests for background checkpoint persistence - sdqctl/core/checkpoint_writer.py
+"""
+
+import json
+import threading
+
+import pytest
+
+from sdqctl.core.checkpoint_writer import CheckpointWriter, flush_checkpoints, write_durable
+from sdqctl.core.conversation import ConversationFile
+from sdqctl.core.session import Session
+
+
+class TestCheckpointWriter:
+    """Ordering, barrier and error semantics of the writer thread."""
+
+    def test_tasks_run_in_submission_order_off_thread(self):
+        writer = CheckpointWriter()
+        seen = []
+        for i in range(50):
+            writer.submit(lambda i=i: seen.append((i, threading.current_thread().name)))
+        writer.flush()
+
+        assert [i for i, _ in seen] == list(range(50))
+        assert {name for _, name in seen} == {"sdqctl-checkpoint-writer"}
+        writer.close()
+
+    def test_flush_waits_for_pending_tasks(self):
+        writer = CheckpointWriter()
+        release = threading.Event()
+        writer.submit(release.wait)
+        assert writer.pending == 1
+
+        release.set()
+        writer.flush()
+        assert writer.pending == 0
+        writer.close()
+
+    def test_flush_reraises_first_error_once(self):
+        writer = CheckpointWriter()
+
+        def fail():
+            raise OSError("disk full")
+
+        writer.submit(fail)
+        writer.submit(lambda: None)
+        with pytest.raises(OSError, match="disk full"):
+            writer.flush()
+        writer.flush()  # Error already reported
+        writer.close()
+
+    def test_write_durable_appends(self, tmp_path):
+        path = tmp_path / "nested" / "log.jsonl"
+        write_durable(path, b"a\n", append=True)
+        write_durable(path, b"b\n", append=True)
+        assert path.read_text() == "a\nb\n"
+
+
+class TestSessionBackgroundCheckpoints:
+    """Session checkpoints go through the writer."""
+
+    def test_checkpoint_snapshot_excludes_later_messages(self, tmp_path, sample_conv_content):
+        """Messages added after create_checkpoint are not in its journal slice."""
+        conv = ConversationFile.parse(sample_conv_content)
+        session = Session(conv, session_dir=tmp_path / "session")
+        session.add_message("user", "Q1")
+        checkpoint = session.create_checkpoint("one")
+        session.add_message("assistant", "A1")
+        flush_checkpoints()
+
+        journal = tmp_path / "session" / f"journal-{session.id}.jsonl"
+        records = [json.loads(line) for line in journal.read_text().splitlines()]
+        assert [r["type"] for r in records] == ["message", "checkpoint"]
+        header = json.loads(
+            (tmp_path / "session" / f"checkpoint-{checkpoint.id}.json").read_text()
+        )
+        assert header["message_count"] == 1
+
+    def test_pause_checkpoint_is_a_flush_barrier(self, tmp_path, sample_conv_content):
+        """save_pause_checkpoint returns only after queued writes are on disk."""
+        conv = ConversationFile.parse(sample_conv_content)
+        session = Session(conv, session_dir=tmp_path / "session")
+        session.add_message("user", "Q1")
+        checkpoint = session.create_checkpoint("one")
+
+        pause_file = session.save_pause_checkpoint("Paused")
+
+        assert pause_file.exists()
+        assert (tmp_path / "session" / f"checkpoint-{checkpoint.id}.json").exists()
+
+    def test_failed_journal_write_is_retried(self, tmp_path, sample_conv_content, monkeypatch):
+        """Messages of a failed append are written again by the next checkpoint."""
+        from sdqctl.core.journal import SessionJournal, read_messages
+
+        conv = ConversationFile.parse(sample_conv_content)
+        session = Session(conv, session_dir=tmp_path / "session")
+        session.add_message("user", "Q1")
+        write = SessionJournal.write
+
+        def full_disk(self, start, messages, header=None):
+            raise OSError(28, "No space left on device")
+
+        monkeypatch.setattr(SessionJournal, "write", full_disk)
+        session.create_checkpoint("one")
+        with pytest.raises(OSError):
+            flush_checkpoints()
+
+        monkeypatch.setattr(SessionJournal, "write", write)
+        session.add_message("assistant", "A1")
+        session.create_checkpoint("two")
+        flush_checkpoints()
+
+        journal = tmp_path / "session" / f"journal-{session.id}.jsonl"
+        assert [m["content"] for m in read_messages(journal, 2)] == ["Q1", "A1"]
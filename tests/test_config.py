@@ -76,6 +76,30 @@ class TestConfig:
         config = Config.from_dict(data)
         assert config.context.limit == 0.75
     
+    def test_config_from_dict_context_tokenizer(self):
+        """Config.from_dict parses tokenizer settings."""
+        from sdqctl.core.config import Config
+
+        data = {"context": {"tokenizer": "bpe", "tokenizer_vocab": "~/vocab.tiktoken"}}
+        config = Config.from_dict(data)
+        assert config.context.tokenizer == "bpe"
+        assert config.context.tokenizer_vocab == "~/vocab.tiktoken"
+
+    def test_config_from_dict_context_load_workers(self):
+        """Config.from_dict parses load_workers, clamped to at least 1."""
+        from sdqctl.core.config import Config
+
+        assert Config.from_dict({}).context.load_workers == 8
+        assert Config.from_dict({"context": {"load_workers": 2}}).context.load_workers == 2
+        assert Config.from_dict({"context": {"load_workers": 0}}).context.load_workers == 1
+
+    def test_config_from_dict_context_prefetch(self):
+        """Config.from_dict parses context.prefetch (on by default)."""
+        from sdqctl.core.config import Config
+
+        assert Config.from_dict({}).context.prefetch is True
+        assert Config.from_dict({"context": {"prefetch": False}}).context.prefetch is False
+
     def test_config_from_dict_checkpoints(self):
         """Config.from_dict parses checkpoints section."""
         from sdqctl.core.config import Config
@@ -89,7 +113,43 @@ class TestConfig:
         config = Config.from_dict(data)
         assert config.checkpoints.enabled is False
         assert config.checkpoints.directory == "custom/checkpoints"
-    
+        assert config.checkpoints.compression == "none"
+
+    def test_config_from_dict_checkpoint_compression(self):
+        """Config.from_dict accepts known compression names only."""
+        from sdqctl.core.config import Config
+
+        data = {"checkpoints": {"compression": "GZIP"}}
+        assert Config.from_dict(data).checkpoints.compression == "gzip"
+        data = {"checkpoints": {"compression": "lz4"}}
+        assert Config.from_dict(data).checkpoints.compression == "none"
+
+    def test_config_from_dict_checkpoint_retention(self):
+        """Config.from_dict parses keep_last and max_size."""
+        from sdqctl.core.config import Config
+
+        config = Config.from_dict({})
+        assert (config.checkpoints.keep_last, config.checkpoints.max_bytes) == (0, 0)
+        config = Config.from_dict({"checkpoints": {"keep_last": 5, "max_size": "2GB"}})
+        assert config.checkpoints.keep_last == 5
+        assert config.checkpoints.max_bytes == 2 * 1024**3
+
+    def test_config_from_dict_run_capture(self):
+        """Config.from_dict parses run.capture_limit and run.log_dir."""
+        from sdqctl.core.config import Config
+
+        config = Config.from_dict({})
+        assert (config.run.capture_bytes, config.run.log_dir) == (2 * 1024**2, None)
+        config = Config.from_dict({"run": {"capture_limit": "512KB", "log_dir": "logs"}})
+        assert (config.run.capture_bytes, config.run.log_dir) == (512 * 1024, "logs")
+
+    def test_config_from_dict_run_cache(self):
+        """Config.from_dict parses run.cache_dir and run.cache_max_size."""
+        from sdqctl.core.config import Config
+
+        config = Config.from_dict({"run": {"cache_dir": "rc", "cache_max_size": "10MB"}})
+        assert (config.run.cache_dir, config.run.cache_max_bytes) == ("rc", 10 * 1024**2)
+
     def test_config_from_dict_stores_source_path(self):
         """Config.from_dict stores source path."""
         from sdqctl.core.config import Config
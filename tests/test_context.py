@@ -7,7 +7,7 @@ P1 High Priority - Context management tests.
 import pytest
 from pathlib import Path
 
-from sdqctl.core.context import ContextManager, ContextFile, ContextWindow
+from sdqctl.core.context import ContextManager, ContextFile, ContextWindow, estimate_tokens
 
 
 class TestContextWindow:
@@ -208,6 +208,29 @@ class TestContextManagerAddPattern:
         
         assert len(ctx.files) == 2
 
+    def test_add_pattern_parallel_preserves_order(self, tmp_path):
+        """Test threaded loading keeps match order and token totals."""
+        for i in range(40):
+            (tmp_path / f"f{i:02d}.txt").write_text(f"file {i} " * (i + 1))
+        sequential = ContextManager(base_path=tmp_path, load_workers=1)
+        parallel = ContextManager(base_path=tmp_path, load_workers=8)
+
+        sequential.add_pattern("@*.txt")
+        parallel.add_pattern("@*.txt")
+
+        assert [f.path for f in parallel.files] == [f.path for f in sequential.files]
+        assert [f.path.name for f in parallel.files] == sorted(f"f{i:02d}.txt" for i in range(40))
+        assert parallel.window.used_tokens == sequential.window.used_tokens
+
+    def test_add_pattern_isolates_unreadable_files(self, temp_workspace):
+        """Test one unreadable file does not stop the rest from loading."""
+        (temp_workspace / "lib" / "binary.js").write_bytes(b"\xff\xfe\x00bad")
+        ctx = ContextManager(base_path=temp_workspace, load_workers=4)
+
+        added = ctx.add_pattern("@lib/*.js")
+
+        assert [f.path.name for f in added] == ["auth.js", "secret.js", "utils.js"]
+
 
 class TestContextManagerConversationTokens:
     """Tests for conversation token tracking."""
@@ -246,6 +269,33 @@ class TestContextManagerContent:
         assert "```" in content
         assert "// auth code" in content
 
+    def test_get_context_content_layout(self, temp_workspace):
+        """Test the exact layout of two files."""
+        ctx = ContextManager(base_path=temp_workspace)
+        ctx.add_file(temp_workspace / "lib" / "auth.js")
+        ctx.add_file(temp_workspace / "lib" / "utils.js")
+
+        assert ctx.get_context_content() == (
+            "## Context Files\n"
+            "\n### lib/auth.js\n```\n// auth code\nfunction login() {}\n```\n"
+            "\n### lib/utils.js\n```\n// utils code\nfunction format() {}\n```\n"
+        )
+
+    def test_stream_matches_content(self, temp_workspace):
+        """Test streamed chunks equal get_context_content()."""
+        import io
+
+        ctx = ContextManager(base_path=temp_workspace, token_budget=5)
+        ctx.add_pattern("@lib/*.js")
+        ctx.pack()
+        out = io.StringIO()
+
+        written = ctx.write_context_content(out)
+
+        assert out.getvalue() == ctx.get_context_content()
+        assert written == len(out.getvalue())
+        assert "".join(ctx.iter_context_content()) == out.getvalue()
+
 
 class TestContextManagerClear:
     """Tests for clearing context."""
@@ -436,3 +486,510 @@ class TestSessionWithFileRestrictions:
         session = Session(conv)
         
         assert len(session.context.files) == 2
+
+
+def _age_file(path: Path, seconds: int = 60) -> None:
+    """Backdate mtime so the file is outside the cache's racy window."""
+    import os
+    import time
+    old = time.time() - seconds
+    os.utime(path, (old, old))
+
+
+class TestContextFileCache:
+    """Tests for the stat-keyed file content cache."""
+
+    def test_unchanged_file_served_from_cache(self, temp_workspace):
+        """Test reloading an unchanged file does not re-read it."""
+        from sdqctl.core.file_cache import FileContentCache
+
+        cache = FileContentCache()
+        path = temp_workspace / "lib" / "auth.js"
+        _age_file(path)
+
+        ctx = ContextManager(base_path=temp_workspace, file_cache=cache)
+        ctx.add_file(path)
+        ctx.clear_files()
+        ctx.add_file(path)
+
+        assert cache.misses == 1
+        assert cache.hits == 1
+        assert "// auth code" in ctx.files[0].content
+
+    def test_changed_file_is_reread(self, temp_workspace):
+        """Test a stat change invalidates the cached content."""
+        from sdqctl.core.file_cache import FileContentCache
+
+        cache = FileContentCache()
+        path = temp_workspace / "lib" / "auth.js"
+        _age_file(path)
+
+        ctx = ContextManager(base_path=temp_workspace, file_cache=cache)
+        ctx.add_file(path)
+
+        path.write_text("// rewritten")
+        _age_file(path, seconds=30)
+        ctx.clear_files()
+        ctx.add_file(path)
+
+        assert cache.hits == 0
+        assert ctx.files[0].content == "// rewritten"
+
+    def test_recently_modified_file_not_cached(self, temp_workspace):
+        """Test files inside the racy window are always re-read."""
+        from sdqctl.core.file_cache import FileContentCache
+
+        cache = FileContentCache()
+        path = temp_workspace / "lib" / "auth.js"
+        path.write_text("// fresh")
+
+        ctx = ContextManager(base_path=temp_workspace, file_cache=cache)
+        ctx.add_file(path)
+
+        assert len(cache) == 0
+
+    def test_lru_byte_cap_evicts_oldest(self, temp_workspace):
+        """Test least recently used entries are evicted over the byte cap."""
+        from sdqctl.core.file_cache import FileContentCache
+
+        paths = []
+        for i in range(3):
+            p = temp_workspace / f"f{i}.txt"
+            p.write_text("x" * 100)
+            _age_file(p)
+            paths.append(p)
+
+        cache = FileContentCache(max_bytes=250)
+        ctx = ContextManager(base_path=temp_workspace, file_cache=cache)
+        for p in paths:
+            ctx.add_file(p)
+
+        assert len(cache) == 2
+        assert cache.total_bytes == 200
+        assert cache.get(paths[0], paths[0].stat()) is None
+        assert cache.get(paths[2], paths[2].stat()) is not None
+
+    def test_reload_context_uses_cache(self, temp_workspace):
+        """Test Session.reload_context hits the cache for unchanged files."""
+        from sdqctl.core.conversation import ConversationFile
+        from sdqctl.core.file_cache import get_file_cache
+        from sdqctl.core.session import Session
+
+        for p in (temp_workspace / "lib").glob("*.js"):
+            _age_file(p)
+
+        conv = ConversationFile(cwd=str(temp_workspace), context_files=["@lib/*.js"])
+        session = Session(conv)
+        hits_before = get_file_cache().hits
+
+        session.reload_context()
+
+        assert get_file_cache().hits - hits_before == 3
+        assert len(session.context.files) == 3
+
+
+class TestContextPacking:
+    """Tests for packing CONTEXT files into a token budget."""
+
+    @pytest.fixture
+    def packed_workspace(self, tmp_path):
+        """Three files of different size and age."""
+        (tmp_path / "small.py").write_text("def small():\n    return 1\n")
+        (tmp_path / "big.py").write_text(
+            "class Big:\n    def method(self):\n" + "        x = 1\n" * 400
+        )
+        (tmp_path / "notes.md").write_text("# Notes\n\n" + "words " * 200)
+        for age, name in enumerate(["small.py", "big.py", "notes.md"]):
+            _age_file(tmp_path / name, seconds=60 * (age + 1))
+        return tmp_path
+
+    def _load(self, workspace, **kwargs):
+        ctx = ContextManager(base_path=workspace, **kwargs)
+        for name in ["small.py", "big.py", "notes.md"]:
+            ctx.add_file(workspace / name)
+        return ctx
+
+    def test_fits_budget_unchanged(self, packed_workspace):
+        """Test packing is a no-op when everything fits."""
+        ctx = self._load(packed_workspace)
+        used = ctx.window.used_tokens
+
+        pack = ctx.pack()
+
+        assert len(pack.included) == 3
+        assert pack.omitted == []
+        assert ctx.window.used_tokens == used
+
+    def test_over_budget_omits_with_outline_stub(self, packed_workspace):
+        """Test files that don't fit become path+outline stubs."""
+        ctx = self._load(packed_workspace)
+        big_tokens = next(f.tokens_estimate for f in ctx.files if f.path.name == "big.py")
+        total = sum(f.tokens_estimate for f in ctx.files)
+
+        pack = ctx.pack(budget=total - big_tokens + 100)
+
+        assert [o.file.path.name for o in pack.omitted] == ["big.py"]
+        assert ctx.window.used_tokens == pack.tokens
+        assert pack.tokens <= pack.budget
+
+        content = ctx.get_context_content()
+        assert "## Omitted Context Files" in content
+        assert "### big.py (omitted" in content
+        assert "1: class Big:" in content
+        assert "x = 1" not in content
+
+    def test_priority_pattern_packed_first(self, packed_workspace):
+        """Test CONTEXT-PRIORITY files win over smaller, newer files."""
+        ctx = self._load(packed_workspace, priority_patterns=["big.*"])
+        big_tokens = next(f.tokens_estimate for f in ctx.files if f.path.name == "big.py")
+
+        pack = ctx.pack(budget=big_tokens + 100)
+
+        assert pack.included[0].path.name == "big.py"
+        assert [o.file.path.name for o in pack.omitted] == ["notes.md"]
+
+    def test_recency_breaks_ties(self, packed_workspace):
+        """Test newer files are kept before older ones."""
+        ctx = self._load(packed_workspace)
+        notes_tokens = next(f.tokens_estimate for f in ctx.files if f.path.name == "notes.md")
+        _age_file(packed_workspace / "notes.md", seconds=1)
+        ctx.clear_files()
+        for name in ["small.py", "big.py", "notes.md"]:
+            ctx.add_file(packed_workspace / name)
+
+        pack = ctx.pack(budget=notes_tokens + 100)
+
+        assert "notes.md" in [f.path.name for f in pack.included]
+        assert [o.file.path.name for o in pack.omitted] == ["big.py"]
+
+    def test_repack_restores_files(self, packed_workspace):
+        """Test a larger budget brings omitted files back."""
+        ctx = self._load(packed_workspace, token_budget=10)
+        ctx.pack()
+        assert ctx.get_status()["files_omitted"] > 0
+
+        pack = ctx.pack(budget=100_000)
+
+        assert pack.omitted == []
+        assert len(ctx.files) == 3
+
+    def test_diff_of_omitted_file_sends_new_stub(self, packed_workspace):
+        """Test a changed packed-out file is re-sent as its stub, not diffed."""
+        big = packed_workspace / "big.py"
+        ctx = self._load(packed_workspace)
+        budget = sum(f.tokens_estimate for f in ctx.files if f.path != big) + 100
+        ctx.pack(budget=budget)
+        ctx.mark_injected()
+
+        def reload():
+            ctx.clear_files()
+            for name in ["small.py", "big.py", "notes.md"]:
+                ctx.add_file(packed_workspace / name)
+            ctx.pack(budget=budget)
+
+        big.write_text("class Biggest:\n    def method(self):\n" + "        z = 3\n" * 400)
+        reload()
+        diff = ctx.get_context_diff()
+        assert "### big.py (modified, omitted" in diff
+        assert "1: class Biggest:" in diff
+        assert "```diff" not in diff and "z = 3" not in diff
+        assert ctx.get_context_diff() == ""
+
+        # Once it fits, the whole file is sent rather than a diff against the stub
+        big.write_text("class Final:\n    pass\n")
+        reload()
+        assert "### big.py (modified)\n```\nclass Final:" in ctx.get_context_diff()
+
+    def test_clear_files_drops_stubs(self, packed_workspace):
+        """Test clear_files resets both included files and stubs."""
+        ctx = self._load(packed_workspace, token_budget=10)
+        ctx.add_conversation_turn("hello world, this is a turn")
+        conv_tokens = ctx.conversation_tokens
+        ctx.pack()
+
+        ctx.clear_files()
+
+        assert ctx.omitted == []
+        assert ctx.window.used_tokens == conv_tokens
+
+
+class TestLazyContextContent:
+    """Tests for on-demand ContextFile content."""
+
+    def test_loaded_file_does_not_retain_content(self, temp_workspace):
+        """Test files are not pinned in memory after loading."""
+        from sdqctl.core.file_cache import FileContentCache
+
+        ctx = ContextManager(base_path=temp_workspace, file_cache=FileContentCache())
+        ctx_file = ctx.add_file(temp_workspace / "lib" / "auth.js")
+
+        assert not ctx_file.is_loaded
+        assert ctx.get_status()["files_loaded"] == 1
+        assert "// auth code" in ctx.get_context_content()
+        assert not ctx_file.is_loaded
+
+    def test_content_reread_when_not_cached(self, temp_workspace):
+        """Test content is re-read from disk when the cache has no entry."""
+        from sdqctl.core.file_cache import FileContentCache
+
+        cache = FileContentCache()
+        ctx = ContextManager(base_path=temp_workspace, file_cache=cache)
+        ctx_file = ctx.add_file(temp_workspace / "lib" / "auth.js")
+        cache.clear()
+
+        assert ctx_file.content == "// auth code\nfunction login() {}"
+
+    def test_changed_file_logs_warning(self, temp_workspace, caplog):
+        """Test a hash mismatch on re-read is reported and re-estimated."""
+        path = temp_workspace / "lib" / "auth.js"
+        ctx = ContextManager(base_path=temp_workspace)
+        ctx_file = ctx.add_file(path)
+        loaded_digest = ctx_file.digest
+        path.write_text("// edited after load\n" * 50)
+
+        with caplog.at_level("WARNING", logger="sdqctl.core.context"):
+            content = ctx.get_context_content()
+
+        assert "// edited after load" in content
+        assert "changed since it was loaded" in caplog.text
+        assert ctx_file.digest != loaded_digest
+        assert ctx_file.tokens_estimate == estimate_tokens("// edited after load\n" * 50)
+        assert ctx.window.used_tokens == ctx_file.tokens_estimate
+
+    def test_window_reconciled_after_reading(self, temp_workspace):
+        """Test every reader of lazy content keeps the window total in step."""
+        path = temp_workspace / "lib" / "auth.js"
+        ctx = ContextManager(base_path=temp_workspace)
+        ctx_file = ctx.add_file(path)
+        path.write_text("// edited after load\n" * 50)
+
+        chunks = ctx.iter_context_content()
+        assert "".join(next(chunks) for _ in range(3)).endswith("// edited after load\n")
+        assert ctx.window.used_tokens != ctx_file.tokens_estimate  # Not mid-iteration
+        chunks.close()
+        assert ctx.window.used_tokens == ctx_file.tokens_estimate
+
+        path.write_text("// short")
+        ctx.mark_injected()
+        assert ctx.window.used_tokens == ctx_file.tokens_estimate == estimate_tokens("// short")
+
+    def test_removed_file_replaced_by_stub(self, temp_workspace):
+        """Test a file deleted after loading is sent as an explicit stub."""
+        path = temp_workspace / "lib" / "auth.js"
+        ctx = ContextManager(base_path=temp_workspace)
+        ctx_file = ctx.add_file(path)
+        path.unlink()
+
+        stub = f"[File removed since it was loaded: {path}]"
+        assert stub in ctx.get_context_content()
+        assert ctx_file.content == stub
+        assert ctx.window.used_tokens == ctx_file.tokens_estimate
+
+    def test_explicit_content_is_kept(self):
+        """Test ContextFile built with content behaves like a plain record."""
+        ctx_file = ContextFile(path=Path("x.py"), content="print(1)", tokens_estimate=2)
+
+        assert ctx_file.is_loaded
+        assert ctx_file.content == "print(1)"
+        assert ctx_file.digest
+
+
+class TestContextTokenCaps:
+    """Tests for per-file and per-pattern token caps."""
+
+    @staticmethod
+    def _write_module(path: Path, functions: int) -> None:
+        path.write_text("".join(
+            f"def function_{i}(value):\n" + "    value = value + 1\n" * 15
+            for i in range(functions)
+        ))
+
+    def test_file_limit_elides_large_file(self, tmp_path):
+        """Test a file over the cap is elided and counted at its reduced size."""
+        self._write_module(tmp_path / "big.py", 100)
+        ctx = ContextManager(base_path=tmp_path, file_token_limit=500)
+
+        ctx_file = ctx.add_file(tmp_path / "big.py")
+
+        assert ctx_file.tokens_estimate <= 500
+        assert ctx_file.elided_tokens > 0
+        assert ctx.window.used_tokens == ctx_file.tokens_estimate
+        assert "def function_0(value):" in ctx_file.content
+        assert "def function_99(value):" in ctx_file.content
+        assert "lines elided] ..." in ctx_file.content
+        assert "(elided from ~" in ctx.get_context_content()
+        assert ctx.get_status()["files_elided"] == 1
+
+    def test_small_files_untouched(self, temp_workspace):
+        """Test files under the cap are loaded as-is."""
+        ctx = ContextManager(base_path=temp_workspace, file_token_limit=500)
+
+        ctx.add_pattern("@lib/*.js")
+
+        assert all(f.elided_tokens == 0 for f in ctx.files)
+
+    def test_pattern_limit_cuts_largest_files(self, tmp_path):
+        """Test a pattern's total is capped by eliding its largest files."""
+        self._write_module(tmp_path / "a_small.py", 1)
+        self._write_module(tmp_path / "b_big.py", 60)
+        self._write_module(tmp_path / "c_big.py", 80)
+        ctx = ContextManager(base_path=tmp_path, pattern_token_limit=1000)
+
+        added = ctx.add_pattern("@*.py")
+
+        by_name = {f.path.name: f for f in added}
+        assert by_name["a_small.py"].elided_tokens == 0
+        assert by_name["b_big.py"].elided_tokens > 0
+        assert by_name["c_big.py"].elided_tokens > 0
+        assert ctx.window.used_tokens <= 1000
+
+    def test_minified_single_line(self, tmp_path):
+        """Test a single huge line is cut by characters."""
+        (tmp_path / "bundle.min.js").write_text("var a=1;" * 5000)
+        ctx = ContextManager(base_path=tmp_path, file_token_limit=200)
+
+        ctx_file = ctx.add_file(tmp_path / "bundle.min.js")
+
+        assert ctx_file.tokens_estimate <= 200
+        assert "characters elided] ..." in ctx_file.content
+
+
+class TestContextDeduplication:
+    """Tests for skipping files loaded more than once."""
+
+    def test_overlapping_patterns_load_once(self, temp_workspace):
+        """Test a file matched by two patterns is counted and emitted once."""
+        ctx = ContextManager(base_path=temp_workspace)
+        ctx.add_pattern("@lib/*.js")
+        tokens = ctx.window.used_tokens
+
+        added = ctx.add_pattern("@lib/auth.js")
+
+        assert added == []
+        assert len(ctx.files) == 3
+        assert ctx.window.used_tokens == tokens
+        assert ctx.get_context_content().count("// auth code") == 1
+        status = ctx.get_status()
+        assert status["duplicates_skipped"] == 1
+        assert status["duplicate_bytes_saved"] == (temp_workspace / "lib" / "auth.js").stat().st_size
+        assert status["duplicate_tokens_saved"] == ctx.files[0].tokens_estimate
+
+    def test_symlinked_copy_deduplicated(self, temp_workspace):
+        """Test a symlink to a loaded file is listed by name, not repeated."""
+        vendor = temp_workspace / "vendor"
+        vendor.mkdir()
+        (vendor / "auth.js").symlink_to(temp_workspace / "lib" / "auth.js")
+        ctx = ContextManager(base_path=temp_workspace)
+        ctx.add_file(temp_workspace / "lib" / "auth.js")
+
+        assert ctx.add_file(vendor / "auth.js") is None
+
+        content = ctx.get_context_content()
+        assert content.count("// auth code") == 1
+        assert "- vendor/auth.js (same content as lib/auth.js)" in content
+
+    def test_identical_content_deduplicated(self, temp_workspace):
+        """Test a byte-identical copy at another path is skipped."""
+        body = "function login() { return check(user); }\n" * 20
+        (temp_workspace / "lib" / "auth.js").write_text(body)
+        (temp_workspace / "src" / "auth_copy.js").write_text(body)
+        ctx = ContextManager(base_path=temp_workspace)
+        ctx.add_pattern("@lib/auth.js")
+        ctx.add_pattern("@src/*.js")
+
+        assert len(ctx.files) == 1
+        assert ctx.duplicates[0].same_as == temp_workspace / "lib" / "auth.js"
+
+    def test_small_identical_files_all_sent(self, tmp_path):
+        """Test empty or small files that are identical by design are not merged."""
+        for package in ("a", "b"):
+            (tmp_path / "pkg" / package).mkdir(parents=True)
+            (tmp_path / "pkg" / package / "__init__.py").write_text("")
+            (tmp_path / "pkg" / package / "conftest.py").write_text("import pytest\n")
+        ctx = ContextManager(base_path=tmp_path)
+
+        ctx.add_pattern("@pkg/**/*.py")
+
+        assert len(ctx.files) == 4
+        assert ctx.duplicates == []
+        content = ctx.get_context_content()
+        assert "### pkg/a/__init__.py" in content
+        assert "### pkg/b/__init__.py" in content
+
+    def test_clear_files_resets_duplicates(self, temp_workspace):
+        """Test reloading after clear_files does not treat files as duplicates."""
+        ctx = ContextManager(base_path=temp_workspace)
+        ctx.add_pattern("@lib/*.js")
+        ctx.add_pattern("@lib/auth.js")
+
+        ctx.clear_files()
+        ctx.add_pattern("@lib/*.js")
+
+        assert len(ctx.files) == 3
+        assert ctx.get_status()["duplicates_skipped"] == 0
+        assert ctx.window.used_tokens == sum(f.tokens_estimate for f in ctx.files)
+
+
+class TestContextDiff:
+    """Tests for diff session mode change tracking."""
+
+    def _reload(self, ctx):
+        ctx.clear_files()
+        ctx.add_pattern("@lib/*.js")
+
+    def test_no_changes_returns_empty(self, temp_workspace):
+        """Test unchanged files produce no diff."""
+        ctx = ContextManager(base_path=temp_workspace)
+        ctx.add_pattern("@lib/*.js")
+        ctx.mark_injected()
+
+        self._reload(ctx)
+
+        assert ctx.get_context_diff() == ""
+
+    def test_modified_file_as_unified_diff(self, temp_workspace):
+        """Test an edited file is injected as a unified diff."""
+        path = temp_workspace / "lib" / "auth.js"
+        path.write_text("".join(f"line {i}\n" for i in range(50)))
+        ctx = ContextManager(base_path=temp_workspace)
+        ctx.add_pattern("@lib/*.js")
+        ctx.mark_injected()
+
+        path.write_text("".join(f"line {i}\n" for i in range(50)).replace("line 25", "changed"))
+        self._reload(ctx)
+        diff = ctx.get_context_diff()
+
+        assert "### lib/auth.js (modified)" in diff
+        assert "-line 25" in diff
+        assert "+changed" in diff
+        assert "line 1\n" not in diff
+        assert "utils.js" not in diff
+
+    def test_new_and_removed_files(self, temp_workspace):
+        """Test added files are sent in full and removed files are listed."""
+        ctx = ContextManager(base_path=temp_workspace)
+        ctx.add_pattern("@lib/*.js")
+        ctx.mark_injected()
+
+        (temp_workspace / "lib" / "utils.js").unlink()
+        (temp_workspace / "lib" / "new.js").write_text("// brand new")
+        self._reload(ctx)
+        diff = ctx.get_context_diff()
+
+        assert "### lib/new.js (new)" in diff
+        assert "// brand new" in diff
+        assert "### lib/utils.js (removed)" in diff
+
+    def test_baseline_advances(self, temp_workspace):
+        """Test a change is only reported once."""
+        path = temp_workspace / "lib" / "auth.js"
+        ctx = ContextManager(base_path=temp_workspace)
+        ctx.add_pattern("@lib/*.js")
+        ctx.mark_injected()
+
+        path.write_text("// auth code v2")
+        self._reload(ctx)
+        assert ctx.get_context_diff() != ""
+
+        self._reload(ctx)
+        assert ctx.get_context_diff() == ""
@@ -13,6 +13,7 @@ from sdqctl.core.conversation import (
     ConversationStep,
     DirectiveType,
     substitute_template_variables,
+    substitute_tokens,
     get_standard_variables,
 )
 from sdqctl.commands.run import process_elided_steps
@@ -71,6 +72,40 @@ PROMPT Analyze.
         assert conv.context_limit == 0.75
         assert conv.on_context_limit == "stop"
 
+    def test_parse_context_budget_directives(self):
+        """Test parsing CONTEXT-BUDGET and CONTEXT-PRIORITY."""
+        content = """MODEL gpt-4
+ADAPTER mock
+CONTEXT @lib/**/*.ts
+CONTEXT-BUDGET 40K
+CONTEXT-PRIORITY lib/core/*
+CONTEXT-PRIORITY *.md
+PROMPT Analyze.
+"""
+        conv = ConversationFile.parse(content)
+
+        assert conv.context_budget == 40000
+        assert conv.context_priority == ["lib/core/*", "*.md"]
+
+        reparsed = ConversationFile.parse(conv.to_string())
+        assert reparsed.context_budget == 40000
+        assert reparsed.context_priority == ["lib/core/*", "*.md"]
+
+    def test_parse_context_limit_directives(self):
+        """Test parsing CONTEXT-FILE-LIMIT and CONTEXT-PATTERN-LIMIT."""
+        content = """MODEL gpt-4
+ADAPTER mock
+CONTEXT-FILE-LIMIT 8K
+CONTEXT-PATTERN-LIMIT 30000
+PROMPT Analyze.
+"""
+        conv = ConversationFile.parse(content)
+
+        assert conv.context_file_limit == 8000
+        assert conv.context_pattern_limit == 30000
+        reparsed = ConversationFile.parse(conv.to_string())
+        assert reparsed.context_file_limit == 8000
+
     def test_parse_file_restrictions(self, file_restrictions_conv_content):
         """Test parsing ALLOW-FILES, DENY-FILES, ALLOW-DIR, DENY-DIR."""
         conv = ConversationFile.parse(file_restrictions_conv_content)
@@ -554,6 +589,22 @@ class TestTemplateVariables:
         result = substitute_template_variables(text, variables)
         assert result == "2026-01-20 report. Date: 2026-01-20"
 
+    def test_substitute_single_pass(self):
+        """Values are not expanded again; unknown variables are kept."""
+        text = "{{A}} and {{B}} and {{UNKNOWN}}"
+        variables = {"A": "{{B}}", "B": 2}
+
+        result = substitute_template_variables(text, variables)
+        assert result == "{{B}} and 2 and {{UNKNOWN}}"
+
+    def test_substitute_tokens_prefers_longest(self):
+        """Placeholders whose labels contain other tokens match whole."""
+        text = "x {{RUN:0:echo {{A}}}} y {{A}}"
+        replacements = {"{{A}}": "a", "{{RUN:0:echo {{A}}}}": "out", "": "never"}
+
+        assert substitute_tokens(text, replacements) == "x out y a"
+        assert substitute_tokens(text, {}) == text
+
     def test_get_standard_variables(self):
         """Test standard variables are populated."""
         variables = get_standard_variables()
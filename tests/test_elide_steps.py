@@ -0,0 +1,75 @@
+"""Tests for concurrent ELIDE producer execution - sdqctl/commands/elide_steps.py"""
+
+import asyncio
+import time
+
+from sdqctl.commands.elide_steps import execute_merged_producers
+from sdqctl.commands.step_plan import compile_step_plan
+from sdqctl.core.conversation import ConversationFile, ConversationStep
+
+
+def _merged(tmp_path, body: str, extra_steps=()):
+    """Parse a workflow whose steps form one ELIDE group; return (conv, plan)."""
+    conv = ConversationFile.parse(f"MODEL gpt-4\nALLOW-SHELL true\nCWD {tmp_path}\n{body}")
+    for step_type, content in extra_steps:
+        conv.steps.append(ConversationStep(type="elide"))
+        conv.steps.append(ConversationStep(type=step_type, content=content))
+    plan = compile_step_plan(conv)
+    assert plan.steps[0].type == "merged_prompt"
+    return conv, plan
+
+
+def _execute(conv, plan, **kwargs):
+    step = plan.steps[0]
+    return asyncio.run(execute_merged_producers(
+        step, step.content, plan.placeholders[0], plan.resolved[0], conv, **kwargs
+    ))
+
+
+class TestExecuteMergedProducers:
+    def test_runs_overlap(self, tmp_path):
+        conv, plan = _merged(tmp_path, (
+            "PROMPT Go\nELIDE\n"
+            "RUN sleep 0.4; echo one\nELIDE\n"
+            "RUN sleep 0.4; echo two\n"
+        ))
+
+        start = time.perf_counter()
+        prompt, timings = _execute(conv, plan)
+
+        assert time.perf_counter() - start < 0.75
+        assert "+ sleep 0.4; echo one\none" in prompt
+        assert "+ sleep 0.4; echo two\ntwo" in prompt
+        assert "{{RUN:" not in prompt
+        assert [(t.kind, t.index, t.success) for t in timings] == [
+            ("RUN", 0, True), ("RUN", 1, True),
+        ]
+
+    def test_sequential_run_is_a_barrier(self, tmp_path):
+        conv, plan = _merged(tmp_path, (
+            "PROMPT Go\nELIDE\n"
+            "RUN sleep 0.3; echo first >> order.txt\nELIDE\n"
+            "RUN-SEQUENTIAL echo second >> order.txt\nELIDE\n"
+            "RUN echo third >> order.txt\n"
+        ))
+        assert plan.steps[0].run_sequential == [False, True, False]
+
+        _execute(conv, plan)
+        assert (tmp_path / "order.txt").read_text().split() == ["first", "second", "third"]
+
+    def test_errors_and_consult_filled_in_order(self, tmp_path):
+        conv, plan = _merged(tmp_path, "PROMPT Go\n", [
+            ("refcat", "@missing.py#L1-L2"), ("consult", "Which?"),
+        ])
+        asked = []
+
+        async def consult(text):
+            asked.append(text)
+            return "Option A"
+
+        prompt, timings = _execute(conv, plan, consult=consult)
+
+        assert "## REFCAT @missing.py#L1-L2\n[Error:" in prompt
+        assert prompt.endswith("## CONSULT\nOption A")
+        assert asked == ["Which?"]
+        assert [(t.kind, t.success) for t in timings] == [("REFCAT", False), ("CONSULT", True)]
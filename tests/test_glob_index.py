@@ -0,0 +1,128 @@
+"""
+Tests for the shared directory-walk index - sdqctl/core/glob_index.py
+"""
+
+import glob
+import os
+import time
+from pathlib import Path
+
+import pytest
+
+from sdqctl.core.glob_index import GlobIndex
+
+
+def _age(path: Path, seconds: int = 60) -> None:
+    """Backdate mtime so the directory is outside the racy window."""
+    old = time.time() - seconds
+    os.utime(path, (old, old))
+
+
+@pytest.fixture
+def tree(tmp_path):
+    """Nested tree with hidden entries, all aged past the racy window."""
+    (tmp_path / "lib" / "auth").mkdir(parents=True)
+    (tmp_path / "lib" / ".hidden").mkdir()
+    (tmp_path / "lib" / "a.js").write_text("a")
+    (tmp_path / "lib" / "b.py").write_text("b")
+    (tmp_path / "lib" / ".dot.js").write_text("dot")
+    (tmp_path / "lib" / "auth" / "login.js").write_text("login")
+    (tmp_path / "lib" / ".hidden" / "x.js").write_text("x")
+    for d in (tmp_path, tmp_path / "lib", tmp_path / "lib" / "auth", tmp_path / "lib" / ".hidden"):
+        _age(d)
+    return tmp_path
+
+
+class TestGlobIndexMatching:
+    """GlobIndex.glob should agree with glob.glob."""
+
+    @pytest.mark.parametrize("pattern,recursive", [
+        ("lib/*.js", False),
+        ("lib/**/*.js", True),
+        ("lib/**/*.js", False),
+        ("lib/**", True),
+        ("lib/.*", False),
+        ("lib/[ab].*", False),
+        ("lib/auth/login.js", False),
+        ("missing/**/*.js", True),
+    ])
+    def test_matches_glob_module(self, tree, pattern, recursive):
+        """Test results match glob.glob for the same pattern."""
+        full = str(tree / pattern)
+        index = GlobIndex()
+
+        assert sorted(index.glob(full, recursive=recursive)) == sorted(
+            glob.glob(full, recursive=recursive)
+        )
+
+    def test_files_only(self, tree):
+        """Test files_only excludes directories."""
+        index = GlobIndex()
+
+        matches = index.glob(str(tree / "lib" / "*"), files_only=True)
+
+        assert sorted(Path(m).name for m in matches) == ["a.js", "b.py"]
+
+    def test_files_only_skips_broken_symlinks_and_fifos(self, tree):
+        """Test files_only means regular files, following valid symlinks."""
+        lib = tree / "lib"
+        (lib / "broken.py").symlink_to(lib / "missing.py")
+        (lib / "link.py").symlink_to(lib / "b.py")
+        os.mkfifo(lib / "pipe.py")
+        _age(lib)
+        index = GlobIndex()
+
+        for pattern, recursive in (("lib/*.py", False), ("lib/**/*.py", True)):
+            matches = index.glob(str(tree / pattern), recursive=recursive, files_only=True)
+            assert sorted(Path(m).name for m in matches) == ["b.py", "link.py"]
+        assert "broken.py" in [Path(m).name for m in index.glob(str(lib / "*.py"))]
+
+        (lib / "b.py").unlink()
+        _age(lib)
+        matches = index.glob(str(lib / "*.py"), files_only=True)
+        assert matches == []
+
+
+class TestGlobIndexInvalidation:
+    """Listings are reused until a directory's mtime changes."""
+
+    def test_repeat_glob_reuses_listings(self, tree):
+        """Test a second glob over an unchanged tree performs no rescans."""
+        index = GlobIndex()
+        index.glob(str(tree / "lib" / "**" / "*.js"), recursive=True)
+        misses = index.misses
+
+        index.glob(str(tree / "lib" / "**" / "*.js"), recursive=True)
+
+        assert index.misses == misses
+        assert index.hits > 0
+
+    def test_new_file_invalidates_directory(self, tree):
+        """Test adding a file is seen on the next glob."""
+        index = GlobIndex()
+        pattern = str(tree / "lib" / "auth" / "*.js")
+        assert len(index.glob(pattern)) == 1
+
+        (tree / "lib" / "auth" / "logout.js").write_text("logout")
+
+        assert len(index.glob(pattern)) == 2
+
+    def test_context_manager_and_validation_share_index(self, tree, monkeypatch):
+        """Test validation followed by resolution walks the tree once."""
+        from sdqctl.core.context import ContextManager
+        from sdqctl.core.conversation import ConversationFile
+        from sdqctl.core.glob_index import GlobIndex
+
+        index = GlobIndex()
+        monkeypatch.setattr("sdqctl.core.glob_index._glob_index", index)
+        monkeypatch.chdir(tree)
+
+        conv = ConversationFile(context_files=["@lib/**/*.js"])
+        errors, _ = conv.validate_context_files()
+        assert errors == []
+        misses = index.misses
+
+        paths = ContextManager(base_path=tree).resolve_pattern("@lib/**/*.js")
+
+        assert len(paths) == 2
+        assert index.misses == misses
@@ -75,6 +75,18 @@ class TestPromptWriter:
         combined = " ".join(all_args)
         assert "Test prompt content" in combined
     
+    def test_prompt_writer_writes_chunks(self):
+        """Test PromptWriter writes an iterable of chunks without joining it."""
+        from sdqctl.utils.output import PromptWriter
+
+        writer = PromptWriter(enabled=True)
+        writer.console = MagicMock()
+
+        writer.write_prompt(iter(["## Context\n", "body\n", "Prompt"]))
+
+        written = [call.args[0] for call in writer.console.out.call_args_list]
+        assert written == ["## Context\n", "body\n", "Prompt", ""]
+
     def test_prompt_writer_format_position_multicycle(self):
         """Test PromptWriter formats cycle info for multi-cycle."""
         from sdqctl.utils.output import PromptWriter
@@ -0,0 +1,135 @@
+"""Tests for next-step input prefetching - sdqctl/commands/prefetch.py"""
+
+import asyncio
+import os
+import time
+
+from sdqctl.commands.elide_steps import execute_merged_producers
+from sdqctl.commands.prefetch import Prefetcher, prepare, tree_deps
+from sdqctl.commands.step_plan import compile_step_plan
+from sdqctl.core.conversation import (
+    ConversationFile,
+    ConversationStep,
+    resolve_content_reference,
+)
+from sdqctl.core.file_cache import get_file_cache
+
+
+def _write_old(path, text):
+    """Write text with an mtime outside the racy window."""
+    path.write_text(text)
+    old = time.time() - 60
+    os.utime(path, (old, old))
+
+
+def _plan(tmp_path, body, extra_steps=()):
+    conv = ConversationFile.parse(f"MODEL gpt-4\nCWD {tmp_path}\n{body}")
+    conv.source_path = tmp_path / "workflow.conv"
+    for step_type, content in extra_steps:
+        conv.steps.append(ConversationStep(type="elide"))
+        conv.steps.append(ConversationStep(type=step_type, content=content))
+    return conv, compile_step_plan(conv)
+
+
+async def _prefetch_then_take(conv, plan, edit=None):
+    prefetcher = Prefetcher()
+    prefetcher.prefetch_producers(0, plan.steps[0], plan.placeholders[0], conv)
+    await asyncio.gather(*prefetcher._tasks.values())
+    if edit:
+        edit()
+    return prefetcher, await prefetcher.take_producers(0, plan.placeholders[0])
+
+
+class TestPrepare:
+    def test_changed_dependency_invalidates(self, tmp_path):
+        source = tmp_path / "a.txt"
+        _write_old(source, "one")
+        prepared = prepare(lambda: [str(source)], source.read_text)
+        assert prepared.value == "one" and prepared.valid()
+
+        source.write_text("two")
+        assert not prepared.valid()
+
+    def test_racy_dependency_not_prepared(self, tmp_path):
+        source = tmp_path / "a.txt"
+        source.write_text("fresh")
+        assert prepare(lambda: [str(source)], source.read_text) is None
+
+    def test_tree_deps_include_dirs_and_skip_excludes(self, tmp_path):
+        (tmp_path / "docs").mkdir()
+        (tmp_path / "docs" / "a.md").write_text("x")
+        (tmp_path / "node_modules").mkdir()
+        (tmp_path / "node_modules" / "b.js").write_text("x")
+
+        deps = tree_deps(tmp_path)
+        assert str(tmp_path / "docs") in deps
+        assert str(tmp_path / "docs" / "a.md") in deps
+        assert not any("b.js" in path for path in deps)
+        assert tree_deps(tmp_path, limit=2) is None
+
+
+class TestProducerPrefetch:
+    def test_refcat_hit_and_stale(self, tmp_path):
+        notes = tmp_path / "notes.md"
+        _write_old(notes, "alpha\nbeta\n")
+        conv, plan = _plan(tmp_path, "PROMPT Go\n", [("refcat", "@notes.md#L1")])
+        (placeholder,) = plan.placeholders[0]["REFCAT"]
+
+        prefetcher, ready = asyncio.run(_prefetch_then_take(conv, plan))
+        assert "alpha" in ready[placeholder][0] and prefetcher.hits == 1
+
+        prefetcher, ready = asyncio.run(
+            _prefetch_then_take(conv, plan, edit=lambda: notes.write_text("gamma\n"))
+        )
+        assert ready == {} and prefetcher.stale == 1
+
+    def test_verify_invalidated_by_new_file(self, tmp_path):
+        _write_old(tmp_path / "README.md", "# Title\n")
+        os.utime(tmp_path, (time.time() - 60, time.time() - 60))
+        conv, plan = _plan(tmp_path, "PROMPT Go\nELIDE\nVERIFY links\n")
+
+        _, ready = asyncio.run(_prefetch_then_take(conv, plan))
+        assert len(ready) == 1
+
+        _, ready = asyncio.run(_prefetch_then_take(
+            conv, plan, edit=lambda: (tmp_path / "new.md").write_text("[x](missing.md)\n")
+        ))
+        assert ready == {}
+
+    def test_prefetched_outputs_replace_producers(self, tmp_path):
+        conv, plan = _plan(
+            tmp_path, "PROMPT Go\nELIDE\nVERIFY refs\n", [("refcat", "@missing.py")]
+        )
+        step = plan.steps[0]
+        ready = {
+            plan.placeholders[0]["REFCAT"][0]: ("## REFCAT (prepared)", True),
+            plan.placeholders[0]["VERIFY"][0]: ("## VERIFY (prepared)", False),
+        }
+
+        prompt, timings = asyncio.run(execute_merged_producers(
+            step, step.content, plan.placeholders[0], plan.resolved[0], conv, prefetched=ready,
+        ))
+        assert "## REFCAT (prepared)" in prompt and "## VERIFY (prepared)" in prompt
+        assert [(t.kind, t.success, t.prefetched) for t in timings] == [
+            ("VERIFY", False, True), ("REFCAT", True, True),
+        ]
+
+
+class TestWarming:
+    def test_references_served_from_file_cache(self, tmp_path):
+        prologue = tmp_path / "prologue.md"
+        _write_old(prologue, "Be brief.")
+        cache = get_file_cache()
+
+        async def warm():
+            prefetcher = Prefetcher()
+            prefetcher.warm_references(["inline text", f"@{prologue}"], None)
+            await asyncio.gather(*prefetcher._warming.values())
+
+        asyncio.run(warm())
+        hits = cache.hits
+        assert resolve_content_reference(f"@{prologue}") == "Be brief."
+        assert cache.hits == hits + 1
+
+        prologue.write_text("Be thorough.")
+        assert resolve_content_reference(f"@{prologue}") == "Be thorough."
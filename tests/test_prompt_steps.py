@@ -140,6 +140,38 @@ class TestBuildFullPrompt:
         assert result.is_first is True
         assert result.is_last is False  # not last of 2
 
+    def test_build_prompt_streams_context(self):
+        """Test streamed CONTEXT chunks follow context_content in one join."""
+        ctx = PromptContext(
+            prompt="Do the thing",
+            prompt_idx=0,
+            total_prompts=1,
+            cycle_num=0,
+            max_cycles=1,
+            session_mode="fresh",
+            context_content="Intro",
+            template_vars={},
+            no_stop_file_prologue=True,
+            context_stream=lambda: iter(["## Context Files\n", "file body"]),
+        )
+
+        mock_conv = MagicMock()
+        mock_conv.prologues = []
+        mock_conv.epilogues = []
+        mock_conv.source_path = None
+        mock_conv.on_context_limit_prompt = None
+
+        mock_session = MagicMock()
+        mock_session.context.get_status.return_value = {"usage_percent": 10}
+
+        result = build_full_prompt(ctx, mock_conv, mock_session, MagicMock())
+        assert result.full_prompt == "Intro\n\n## Context Files\nfile body\n\nDo the thing"
+
+        ctx.context_content = ""
+        ctx.context_stream = lambda: iter(())
+        result = build_full_prompt(ctx, mock_conv, mock_session, MagicMock())
+        assert result.full_prompt == "Do the thing"
+
     def test_build_prompt_stop_file_injection(self):
         """Test stop file instructions are injected on first prompt."""
         ctx = PromptContext(
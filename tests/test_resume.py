@@ -14,6 +14,7 @@ from pathlib import Path
 import pytest
 
 from sdqctl.core.conversation import ConversationFile
+from sdqctl.core.journal import load_checkpoint_data
 from sdqctl.core.session import Session, Message
 
 
@@ -53,7 +54,7 @@ class TestSavePauseCheckpoint:
         session.add_message("system", "[RUN output]\n```\n$ echo hello\nhello\n```")
         
         checkpoint_path = session.save_pause_checkpoint("Test pause")
-        data = json.loads(checkpoint_path.read_text())
+        data = load_checkpoint_data(checkpoint_path)
         
         assert len(data["messages"]) == 3
         assert data["messages"][0]["role"] == "user"
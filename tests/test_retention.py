@@ -0,0 +1,178 @@
+"""
+Tests for local session storage retention - sdqctl/core/retention.py
+"""
+
+import os
+import time
+
+import pytest
+from click.testing import CliRunner
+
+from sdqctl.core.checkpoint_writer import flush_checkpoints
+from sdqctl.core.conversation import ConversationFile
+from sdqctl.core.retention import apply_retention, parse_size, schedule_retention
+from sdqctl.core.session import Session
+from sdqctl.core.session_index import SessionIndex
+
+
+def _backdate(session_dir, age):
+    """Backdate every file of a session directory by age seconds."""
+    old = time.time() - age
+    for path in session_dir.iterdir():
+        os.utime(path, (old, old))
+
+
+def _write(path, size, age):
+    """Write size bytes to path, backdated by age seconds."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(b"x" * size)
+    old = time.time() - age
+    os.utime(path, (old, old))
+
+
+@pytest.fixture
+def sessions_dir(tmp_path):
+    """Three sessions of 1000 bytes each; "old" is least recently written."""
+    root = tmp_path / "sessions"
+    for name, age in (("old", 300), ("mid", 200), ("new", 100)):
+        for i in range(4):
+            _write(root / name / f"checkpoint-{i}.json", 100, age + 10 * (4 - i))
+        _write(root / name / f"journal-{name}.jsonl", 600, age)
+    return root
+
+
+class TestParseSize:
+    @pytest.mark.parametrize("value,expected", [
+        ("500", 500), ("1KB", 1024), ("2MB", 2 * 1024**2), ("1.5G", int(1.5 * 1024**3)),
+        (4096, 4096),
+    ])
+    def test_parse_size(self, value, expected):
+        assert parse_size(value) == expected
+
+    def test_invalid_size(self):
+        with pytest.raises(ValueError):
+            parse_size("lots")
+
+
+class TestApplyRetention:
+    def test_keep_last_prunes_oldest_checkpoints(self, sessions_dir):
+        result = apply_retention(sessions_dir, keep_last=1)
+
+        assert len(result.checkpoints_removed) == 9
+        assert sorted(p.name for p in (sessions_dir / "mid").iterdir()) == [
+            "checkpoint-3.json", "journal-mid.jsonl"
+        ]
+        assert result.bytes_freed == 900
+
+    def test_size_cap_evicts_least_recently_written(self, sessions_dir):
+        result = apply_retention(sessions_dir, max_bytes=2000)
+
+        assert result.sessions_evicted == ["old"]
+        assert not (sessions_dir / "old").exists()
+        assert (sessions_dir / "mid").exists()
+
+    def test_pruning_counts_toward_cap(self, sessions_dir):
+        # 3 x (600 + 100) = 2100 bytes after pruning: one eviction is still needed
+        result = apply_retention(sessions_dir, keep_last=1, max_bytes=1500)
+        assert result.sessions_evicted == ["old"]
+
+    def test_protected_session_never_evicted(self, sessions_dir):
+        result = apply_retention(sessions_dir, max_bytes=1000, protect=frozenset({"old"}))
+        assert result.sessions_evicted == ["mid", "new"]
+        assert (sessions_dir / "old").exists()
+
+    def test_paused_session_never_evicted(self, sessions_dir):
+        _write(sessions_dir / "old" / "pause.json", 10, 300)
+        result = apply_retention(sessions_dir, max_bytes=2100)
+        assert result.sessions_evicted == ["mid"]
+        assert (sessions_dir / "old").exists()
+
+    def test_session_paused_in_index_never_evicted(self, sessions_dir):
+        # Marked in the index only; there is no pause.json on disk
+        index = SessionIndex(sessions_dir)
+        index.sync()
+        index.record_pause("old", {"status": "running"})
+
+        assert index.active_sessions() == {"old"}
+        result = apply_retention(sessions_dir, max_bytes=2100)
+        assert result.sessions_evicted == ["mid"]
+        assert (sessions_dir / "old").exists()
+
+    def test_running_session_never_evicted(self, sessions_dir):
+        session = Session(
+            ConversationFile.parse("MODEL gpt-4\nPROMPT Go\n"),
+            session_dir=sessions_dir / "live",
+        )
+        session.add_message("user", "x" * 2000)
+        session.create_checkpoint("start")
+        flush_checkpoints()
+        _backdate(sessions_dir / "live", 400)
+
+        result = apply_retention(sessions_dir, max_bytes=3000)
+        assert "live" not in result.sessions_evicted
+        assert (sessions_dir / "live").exists()
+
+        session.mark_finished()
+        flush_checkpoints()
+        result = apply_retention(sessions_dir, max_bytes=3000)
+        assert result.sessions_evicted[0] == "live"
+
+    def test_stale_running_marker_ignored(self, sessions_dir):
+        (sessions_dir / "old" / "running.pid").write_text("999999999")
+        _backdate(sessions_dir / "old", 300)
+        result = apply_retention(sessions_dir, max_bytes=2100)
+        assert result.sessions_evicted == ["old"]
+
+    def test_recently_written_session_never_evicted(self, sessions_dir):
+        _write(sessions_dir / "old" / "journal-old.jsonl", 600, 5)
+        result = apply_retention(sessions_dir, max_bytes=2100)
+        assert result.sessions_evicted == ["mid"]
+
+    def test_eviction_goes_through_trash(self, sessions_dir):
+        trash = sessions_dir.parent / "sessions-trash"
+        _write(trash / "leftover-1234" / "journal-x.jsonl", 10, 0)
+
+        result = apply_retention(sessions_dir, max_bytes=2100)
+
+        assert result.sessions_evicted == ["old"]
+        assert not (sessions_dir / "old").exists()
+        assert list(trash.iterdir()) == []
+
+    def test_dry_run_removes_nothing(self, sessions_dir):
+        result = apply_retention(sessions_dir, keep_last=1, max_bytes=1500, dry_run=True)
+
+        assert result.sessions_evicted == ["old"]
+        assert len(result.checkpoints_removed) == 9
+        assert len(list(sessions_dir.glob("*/checkpoint-*.json"))) == 12
+
+    def test_missing_dir(self, tmp_path):
+        result = apply_retention(tmp_path / "missing", keep_last=1, max_bytes=1)
+        assert result.sessions_evicted == [] and result.checkpoints_removed == []
+
+
+class TestScheduleRetention:
+    def test_not_scheduled_without_limits(self, sessions_dir, monkeypatch):
+        monkeypatch.setattr("sdqctl.core.retention._get_retention_limits", lambda: (0, 0))
+        assert schedule_retention(sessions_dir=sessions_dir) is False
+
+    def test_pass_finishes_before_returning(self, sessions_dir, monkeypatch):
+        monkeypatch.setattr("sdqctl.core.retention._get_retention_limits", lambda: (0, 2000))
+        assert schedule_retention(protect="old", sessions_dir=sessions_dir) is True
+
+        assert (sessions_dir / "old").exists()
+        assert not (sessions_dir / "mid").exists()
+
+
+class TestSessionsGcCommand:
+    def test_gc_dry_run(self, sessions_dir, monkeypatch):
+        import sdqctl.commands.sessions as sessions_module
+        from sdqctl.cli import cli
+
+        monkeypatch.setattr(sessions_module, "SDQCTL_DIR", sessions_dir.parent)
+        result = CliRunner().invoke(
+            cli, ["sessions", "gc", "--keep-last", "2", "--max-size", "2KB", "--dry-run"]
+        )
+
+        assert result.exit_code == 0
+        assert "Would remove 6 checkpoints and 1 sessions" in result.output
+        assert (sessions_dir / "old").exists()
@@ -0,0 +1,122 @@
+"""Tests for RUN result memoization - sdqctl/commands/run_cache.py"""
+
+import asyncio
+import os
+from unittest.mock import MagicMock
+
+import pytest
+
+from sdqctl.commands import run_cache
+from sdqctl.commands.elide_steps import execute_merged_producers
+from sdqctl.commands.run_cache import RunCache, run_cached
+from sdqctl.commands.run_engine import RunResult, run_command
+from sdqctl.commands.step_plan import compile_step_plan
+from sdqctl.core.conversation import ConversationFile
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    cache = RunCache(tmp_path / "cache", max_bytes=1024 * 1024)
+    monkeypatch.setattr(run_cache, "_run_cache", cache)
+    return cache
+
+
+def _cached_run(command, workdir, cache, inputs=("src/*.py",), env=None):
+    def run():
+        return run_command(command, allow_shell=True, timeout=10, cwd=workdir, env=env)
+
+    return asyncio.run(run_cached(
+        command, inputs, run, cwd=workdir, env=env, allow_shell=True, cache=cache
+    ))
+
+
+class TestRunCache:
+    def test_key_tracks_command_env_and_input_content(self, tmp_path, cache):
+        (tmp_path / "src").mkdir()
+        source = tmp_path / "src" / "a.py"
+        source.write_text("x = 1\n")
+        key = cache.key("pytest", tmp_path, {"A": "1"}, False, ["src/*.py"])
+
+        assert cache.key("pytest", tmp_path, {"A": "1"}, False, ["src/*.py"]) == key
+        assert cache.key("pytest -x", tmp_path, {"A": "1"}, False, ["src/*.py"]) != key
+        assert cache.key("pytest", tmp_path, {"A": "2"}, False, ["src/*.py"]) != key
+        source.write_text("x = 2\n")
+        assert cache.key("pytest", tmp_path, {"A": "1"}, False, ["src/*.py"]) != key
+
+    def test_hit_replays_output_and_exit_code(self, tmp_path, cache):
+        (tmp_path / "src").mkdir()
+        (tmp_path / "src" / "a.py").write_text("x = 1\n")
+        command = "echo run >> count.txt; echo out; echo err >&2; exit 2"
+
+        first, hit = _cached_run(command, tmp_path, cache)
+        assert not hit and first.returncode == 2
+        second, hit = _cached_run(command, tmp_path, cache)
+        assert hit and second.cached
+        assert (second.returncode, second.stdout, second.stderr) == (2, "out\n", "err\n")
+        assert (tmp_path / "count.txt").read_text() == "run\n"
+
+        (tmp_path / "src" / "b.py").write_text("y = 1\n")
+        _, hit = _cached_run(command, tmp_path, cache)
+        assert not hit
+        assert (cache.hits, cache.misses) == (1, 2)
+
+    def test_timed_out_result_not_stored(self, tmp_path, cache):
+        cache.put("k", RunResult("sleep", -1, "", "", 1.0, timed_out=True))
+        assert cache.get("k") is None
+
+    def test_evicts_least_recently_used(self, tmp_path):
+        cache = RunCache(tmp_path / "cache", max_bytes=10 * 1024)
+        for i, name in enumerate(("old", "used", "new")):
+            cache.put(name, RunResult(name, 0, "x" * 3000, "", 0.1))
+            os.utime(cache.directory / f"{name}.json", (1000 + i, 1000 + i))
+        assert cache.get("used") is not None  # Refreshes its mtime
+
+        cache.put("newest", RunResult("newest", 0, "x" * 3000, "", 0.1))
+        assert sorted(p.stem for p in cache.directory.glob("*.json")) == [
+            "new", "newest", "used"
+        ]
+
+
+class TestRunCacheDirective:
+    def test_marks_previous_run(self):
+        conv = ConversationFile.parse("MODEL gpt-4\nRUN pytest\nRUN-CACHE src/**/*.py setup.cfg\n")
+        assert conv.steps[-1].cache_inputs == ["src/**/*.py", "setup.cfg"]
+
+    def test_requires_a_run(self):
+        with pytest.raises(ValueError, match="RUN-CACHE"):
+            ConversationFile.parse("MODEL gpt-4\nRUN-CACHE src/*.py\n")
+
+    def test_elide_group_reports_hits_and_misses(self, tmp_path, cache):
+        (tmp_path / "in.txt").write_text("data\n")
+        conv = ConversationFile.parse(
+            f"MODEL gpt-4\nALLOW-SHELL true\nCWD {tmp_path}\nPROMPT Go\nELIDE\n"
+            "RUN cat in.txt\nRUN-CACHE in.txt\nELIDE\nRUN echo live\n"
+        )
+        plan = compile_step_plan(conv)
+        step = plan.steps[0]
+        assert step.run_cache_inputs == [["in.txt"], None]
+
+        for expected in (False, True):
+            progress = MagicMock()
+            prompt, _ = asyncio.run(execute_merged_producers(
+                step, step.content, plan.placeholders[0], plan.resolved[0], conv,
+                progress=progress,
+            ))
+            assert "+ cat in.txt\ndata" in prompt
+            cached = {c.args[0]: c.kwargs["cached"] for c in progress.run_complete.call_args_list}
+            assert cached == {0: expected, 1: None}
+
+    def test_run_step_reports_cache_hit(self, tmp_path, cache):
+        from sdqctl.commands.run_steps import execute_run_step
+
+        (tmp_path / "in.txt").write_text("data\n")
+        conv = ConversationFile.parse(
+            f"MODEL gpt-4\nALLOW-SHELL true\nCWD {tmp_path}\nRUN cat in.txt\nRUN-CACHE in.txt\n"
+        )
+        for expected in ("cache miss", "(cached)"):
+            progress = MagicMock()
+            asyncio.run(execute_run_step(
+                conv.steps[-1], conv, MagicMock(), MagicMock(), MagicMock(), MagicMock(),
+                progress, True,
+            ))
+            assert expected in progress.call_args_list[-1].args[0]
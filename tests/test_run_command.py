@@ -812,8 +812,8 @@ RUN exit 1
         
     def test_checkpoint_contains_run_output(self, tmp_path):
         """Verify checkpoint preserves RUN output messages."""
-        import json
         from sdqctl.core.conversation import ConversationFile
+        from sdqctl.core.journal import load_checkpoint_data
         from sdqctl.core.session import Session
         
         content = """MODEL gpt-4
@@ -832,7 +832,7 @@ RUN false
         checkpoint_path = session.save_pause_checkpoint("RUN failed: false")
         
         # Load and verify
-        data = json.loads(checkpoint_path.read_text())
+        data = load_checkpoint_data(checkpoint_path)
         messages = data.get("messages", [])
         assert len(messages) == 1
         assert messages[0]["role"] == "system"
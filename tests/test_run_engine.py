@@ -0,0 +1,125 @@
+"""Tests for the asyncio RUN engine - sdqctl/commands/run_engine.py"""
+
+import asyncio
+import time
+
+import pytest
+
+from sdqctl.commands.run_engine import OutputBuffer, dropped_note, run_command
+
+
+def _run(command, tmp_path, **kwargs):
+    kwargs.setdefault("timeout", 10)
+    return asyncio.run(run_command(command, allow_shell=True, cwd=tmp_path, **kwargs))
+
+
+class TestRunCommand:
+    def test_captures_and_streams_output(self, tmp_path):
+        seen = []
+        result = _run(
+            "echo out; echo err >&2; exit 3", tmp_path,
+            on_output=lambda stream, text: seen.append((stream, text)),
+        )
+
+        assert (result.returncode, result.stdout, result.stderr) == (3, "out\n", "err\n")
+        assert ("stdout", "out\n") in seen and ("stderr", "err\n") in seen
+
+    def test_shlex_without_shell(self, tmp_path):
+        result = asyncio.run(run_command(
+            "python -c 'print(1 + 1)'", allow_shell=False, timeout=10, cwd=tmp_path,
+            env={"SDQCTL_TEST": "1"},
+        ))
+        assert result.stdout == "2\n"
+
+    def test_timeout_keeps_partial_output(self, tmp_path):
+        start = time.perf_counter()
+        result = _run("echo started; sleep 5", tmp_path, timeout=0.3)
+
+        assert result.timed_out and result.returncode == -1
+        assert result.stdout == "started\n"
+        assert time.perf_counter() - start < 3
+
+    def test_stop_predicate_terminates(self, tmp_path):
+        stop_file = tmp_path / "STOP"
+
+        async def main():
+            task = asyncio.ensure_future(run_command(
+                "sleep 5", allow_shell=True, timeout=None, cwd=tmp_path,
+                should_stop=stop_file.exists,
+            ))
+            await asyncio.sleep(0.2)
+            stop_file.touch()
+            return await task
+
+        result = asyncio.run(main())
+        assert result.stopped and result.returncode == -1
+        assert result.duration < 3
+
+    def test_cancellation_kills_process_group(self, tmp_path):
+        async def main():
+            task = asyncio.ensure_future(run_command(
+                "sleep 0.5 && touch marker", allow_shell=True, timeout=10, cwd=tmp_path,
+            ))
+            await asyncio.sleep(0.2)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+            await asyncio.sleep(0.6)
+
+        asyncio.run(main())
+        assert not (tmp_path / "marker").exists()
+
+    def test_event_loop_stays_responsive(self, tmp_path):
+        async def main():
+            ticks = 0
+
+            async def ticker():
+                nonlocal ticks
+                while True:
+                    await asyncio.sleep(0.05)
+                    ticks += 1
+
+            tick_task = asyncio.ensure_future(ticker())
+            await run_command("sleep 0.5", allow_shell=True, timeout=10, cwd=tmp_path)
+            tick_task.cancel()
+            return ticks
+
+        assert asyncio.run(main()) >= 5
+
+
+class TestBoundedCapture:
+    def test_buffer_keeps_head_and_tail(self):
+        buffer = OutputBuffer(limit=30)
+        for i in range(100):
+            buffer.feed(f"line {i:03d}\n".encode())
+
+        text = buffer.text()
+        assert text.startswith("line 000\nline 001\n")
+        assert text.endswith("line 099\n")
+        assert buffer.total_bytes == 900 and buffer.total_lines == 100
+        assert buffer.dropped_bytes == 870
+        assert f"[... 870 bytes, {buffer.dropped_lines} lines dropped ...]" in text
+        assert 95 <= buffer.dropped_lines <= 98
+
+    def test_small_output_untouched(self):
+        buffer = OutputBuffer(limit=1024)
+        buffer.feed(b"a\r\nb\n")
+        assert buffer.text() == "a\nb\n"
+        assert buffer.dropped_bytes == buffer.dropped_lines == 0
+
+    def test_command_output_capped_and_spilled(self, tmp_path):
+        result = _run(
+            "python -c \"print('x' * 99, flush=True); [print(i) for i in range(5000)]\"",
+            tmp_path, capture_limit=3000, log_dir=tmp_path / "logs",
+        )
+
+        assert len(result.stdout) < 3200
+        assert result.dropped_bytes > 20000 and result.dropped_lines > 4000
+        spilled = result.log_files["stdout"].read_text().splitlines()
+        assert len(spilled) == 5001 and spilled[-1] == "4999"
+        note = dropped_note(result)
+        assert str(result.log_files["stdout"]) in note
+        assert note.startswith(f"[RUN output capped: {result.dropped_bytes} bytes")
+
+    def test_no_note_without_drops(self, tmp_path):
+        assert dropped_note(_run("echo hi", tmp_path)) == ""
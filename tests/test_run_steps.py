@@ -1,9 +1,9 @@
 """Tests for run_steps module."""
 
-import subprocess
 import pytest
 from unittest.mock import Mock, patch, AsyncMock
 
+from sdqctl.commands.async_supervisor import ProcessSupervisor
 from sdqctl.commands.run_steps import (
     execute_run_step,
     execute_run_async_step,
@@ -16,24 +16,38 @@ from sdqctl.core.session import Session
 class TestExecuteRunWaitStep:
     """Tests for RUN-WAIT step execution."""
 
-    def test_run_wait_step(self):
-        """Verify RUN-WAIT calls sleep with parsed duration."""
+    @pytest.mark.asyncio
+    async def test_run_wait_step(self):
+        """Verify RUN-WAIT sleeps (without blocking the loop) for the parsed duration."""
         step = Mock()
         step.content = "100ms"
         progress_fn = Mock()
 
-        with patch("sdqctl.commands.run_steps.time") as mock_time:
-            execute_run_wait_step(step, progress_fn)
-            mock_time.sleep.assert_called_once_with(0.1)
+        with patch("sdqctl.commands.run_steps.asyncio.sleep", new_callable=AsyncMock) as mock_sleep:
+            await execute_run_wait_step(step, progress_fn)
+            mock_sleep.assert_awaited_once_with(0.1)
 
         assert progress_fn.called
 
+    @pytest.mark.asyncio
+    async def test_run_wait_probe_times_out(self):
+        """RUN-WAIT port:N reports False when nothing listens before the timeout."""
+        step = Mock()
+        step.content = "port:1"
+        progress_fn = Mock()
+
+        ready = await execute_run_wait_step(step, progress_fn, ProcessSupervisor(), timeout=0.3)
+
+        assert ready is False
+        assert "Not ready" in progress_fn.call_args[0][0]
+
 
 class TestExecuteRunAsyncStep:
     """Tests for RUN-ASYNC step execution."""
 
-    def test_run_async_step_starts_background_process(self, tmp_path):
-        """Verify RUN-ASYNC starts process and tracks it."""
+    @pytest.mark.asyncio
+    async def test_run_async_step_starts_background_process(self, tmp_path):
+        """Verify RUN-ASYNC starts a supervised process and tracks it."""
         step = Mock()
         step.content = "echo test"
 
@@ -47,18 +61,16 @@ class TestExecuteRunAsyncStep:
 
         session = Mock(spec=Session)
         progress_fn = Mock()
+        supervisor = ProcessSupervisor()
 
-        with patch("subprocess.Popen") as mock_popen:
-            mock_proc = Mock()
-            mock_proc.pid = 12345
-            mock_popen.return_value = mock_proc
+        bg = await execute_run_async_step(step, conv, session, progress_fn, supervisor)
+        await bg.proc.wait()
+        await supervisor.stop_all()
 
-            execute_run_async_step(step, conv, session, progress_fn)
-
-            mock_popen.assert_called_once()
-            assert len(conv.async_processes) == 1
-            assert conv.async_processes[0] == ("echo test", mock_proc)
-            session.add_message.assert_called_once()
+        assert supervisor.processes == [bg]
+        assert conv.async_processes == [("echo test", bg)]
+        assert bg.output() == "test\n"
+        session.add_message.assert_called_once()
 
 
 class TestExecuteRunStep:
@@ -71,6 +83,7 @@ class TestExecuteRunStep:
         step.content = "echo hello"
         step.retry_count = 0
         step.retry_prompt = ""
+        step.cache_inputs = None
         step.on_failure = None
         step.on_success = None
 
@@ -112,6 +125,7 @@ class TestExecuteRunStep:
         step.content = "exit 1"
         step.retry_count = 0
         step.retry_prompt = ""
+        step.cache_inputs = None
         step.on_failure = None
         step.on_success = None
 
@@ -150,3 +164,33 @@ class TestExecuteRunStep:
         # False means stop execution
         assert result is False
         assert session.state.status == "failed"
+
+    @pytest.mark.asyncio
+    async def test_run_step_uses_async_engine_by_default(self, tmp_path):
+        """Without run_subprocess_fn the command runs on the asyncio engine."""
+        step = Mock()
+        step.content = "echo engine"
+        step.retry_count = 0
+        step.cache_inputs = None
+        step.on_failure = None
+        step.on_success = None
+
+        conv = Mock(spec=ConversationFile)
+        conv.run_cwd = None
+        conv.cwd = str(tmp_path)
+        conv.source_path = None
+        conv.run_env = None
+        conv.allow_shell = True
+        conv.run_timeout = 10
+        conv.run_output = "always"
+        conv.run_output_limit = None
+        conv.run_on_error = "stop"
+
+        session = Mock(spec=Session)
+
+        result = await execute_run_step(
+            step, conv, session, Mock(), Mock(), Mock(), Mock(), True
+        )
+
+        assert result is None
+        assert "$ echo engine\nengine" in session.add_message.call_args[0][1]
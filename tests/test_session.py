@@ -6,11 +6,20 @@ P0 Critical - Session lifecycle tests.
 
 import pytest
 import json
+import sys
 from pathlib import Path
 from datetime import datetime, timezone
 from unittest.mock import AsyncMock, MagicMock
 
-from sdqctl.core.session import Session, SessionState, Message, Checkpoint, ExecutionContext
+from sdqctl.core.session import (
+    Checkpoint,
+    ExecutionContext,
+    Message,
+    MessageStore,
+    Session,
+    SessionState,
+)
+from sdqctl.core.checkpoint_writer import flush_checkpoints
 from sdqctl.core.conversation import ConversationFile
 
 
@@ -89,6 +98,54 @@ class TestMessageManagement:
         
         assert msg.metadata.get("prompt_index") == 0
 
+    def test_repeated_content_stored_once(self, sample_conv_content):
+        """Equal contents built separately share one string object."""
+        conv = ConversationFile.parse(sample_conv_content)
+        session = Session(conv)
+
+        first = session.add_message("user", "".join(["Review ", "the code"]))
+        second = session.add_message("user", "".join(["Review the ", "code"]))
+
+        assert first.content is second.content
+        assert not hasattr(first, "__dict__")  # __slots__
+
+    def test_extend_operator_interns_content(self):
+        """+= appends through the store, like extend()."""
+        store = MessageStore([Message("user", "".join(["a", "b"]))])
+        store += [Message("user", "".join(["a", "b"]))]
+
+        assert isinstance(store, MessageStore)
+        assert store[0].content is store[1].content
+
+    @pytest.mark.parametrize("mutate", [
+        lambda s: s.insert(0, Message("user", "x")),
+        lambda s: s.__setitem__(0, Message("user", "x")),
+        lambda s: s.__setitem__(slice(0, 1), []),
+        lambda s: s.__delitem__(0),
+        lambda s: s.__imul__(2),
+        lambda s: s.clear(),
+        lambda s: s.pop(),
+        lambda s: s.remove(s[0]),
+        lambda s: s.sort(key=id),
+        lambda s: s.reverse(),
+    ], ids=[
+        "insert", "setitem", "slice-assign", "delitem", "imul", "clear", "pop", "remove",
+        "sort", "reverse",
+    ])
+    def test_store_is_append_only(self, mutate):
+        """Operations that would rewrite the history are refused."""
+        store = MessageStore([Message("user", "a"), Message("assistant", "b")])
+
+        with pytest.raises(TypeError):
+            mutate(store)
+        assert [m.content for m in store] == ["a", "b"]
+
+    def test_roles_interned(self):
+        """Roles (e.g. from JSON) are interned."""
+        role = "".join(["assis", "tant"])
+        msg = Message(role=role, content="x")
+        assert msg.role is sys.intern("assistant")
+
 
 class TestPromptNavigation:
     """Tests for prompt/cycle advancement."""
@@ -251,12 +308,28 @@ class TestCheckpointCreation:
         assert checkpoint.cycle_number == 0
         assert len(session.state.checkpoints) == 1
 
+    def test_checkpoint_references_messages(self, tmp_path, sample_conv_content):
+        """A checkpoint is a range over the history, not a copy of it."""
+        conv = ConversationFile.parse(sample_conv_content)
+        session = Session(conv, session_dir=tmp_path)
+        session.add_message("user", "First message")
+        checkpoint = session.create_checkpoint("one")
+        session.add_message("assistant", "Later message")
+
+        assert len(checkpoint.messages) == 1
+        assert checkpoint.messages[0] is session.state.messages[0]
+        assert checkpoint.messages[-1].content == "First message"
+        assert [m.content for m in checkpoint.messages] == ["First message"]
+        with pytest.raises(IndexError):
+            checkpoint.messages[1]
+
     def test_checkpoint_saved_to_disk(self, tmp_path, sample_conv_content):
         """Test checkpoint is saved to disk."""
         conv = ConversationFile.parse(sample_conv_content)
         session = Session(conv, session_dir=tmp_path)
         
         checkpoint = session.create_checkpoint("disk-test")
+        flush_checkpoints()  # Written by the background checkpoint writer
         
         # Check file exists
         checkpoint_files = list(tmp_path.glob("checkpoint-*.json"))
@@ -300,7 +373,8 @@ class TestPauseCheckpoint:
         data = json.loads(pause_file.read_text())
         assert data["type"] == "pause"
         assert data["message"] == "Please review before continuing"
-        assert len(data["messages"]) == 1
+        assert data["message_count"] == 1
+        assert "messages" not in data  # Messages live in the journal
 
     def test_load_from_pause(self, tmp_path, sample_conv_content):
         """Test session restored from pause checkpoint."""
@@ -359,6 +433,176 @@ PROMPT Inline prompt.
         assert restored.state.status == "consulting"
 
 
+class TestCheckpointJournal:
+    """Tests for the append-only checkpoint journal."""
+
+    def _journal_lines(self, session):
+        path = session.session_dir / f"journal-{session.id}.jsonl"
+        return [json.loads(line) for line in path.read_text().splitlines()]
+
+    def test_checkpoints_append_only_new_messages(self, tmp_path, sample_conv_content):
+        """Each checkpoint writes the messages added since the previous one."""
+        conv = ConversationFile.parse(sample_conv_content)
+        session = Session(conv, session_dir=tmp_path)
+
+        session.add_message("user", "Q1")
+        session.add_message("assistant", "A1")
+        first = session.create_checkpoint("one")
+        session.add_message("user", "Q2")
+        session.create_checkpoint("two")
+        flush_checkpoints()
+
+        records = self._journal_lines(session)
+        messages = [r for r in records if r["type"] == "message"]
+        assert [m["seq"] for m in messages] == [0, 1, 2]
+        assert [r["type"] for r in records] == [
+            "message", "message", "checkpoint", "message", "checkpoint"
+        ]
+
+        data = json.loads((tmp_path / f"checkpoint-{first.id}.json").read_text())
+        assert data["message_count"] == 2
+        assert "messages" not in data
+
+    def test_resume_continues_journal(self, tmp_path, sample_conv_content):
+        """A resumed session appends after the restored messages."""
+        conv = ConversationFile.parse(sample_conv_content)
+        session = Session(conv, session_dir=tmp_path)
+        session.add_message("user", "Q1")
+        pause_file = session.save_pause_checkpoint("Pause one")
+
+        restored = Session.load_from_pause(pause_file)
+        restored.add_message("assistant", "A1")
+        pause_file = restored.save_pause_checkpoint("Pause two")
+
+        messages = [r for r in self._journal_lines(session) if r["type"] == "message"]
+        assert [m["content"] for m in messages] == ["Q1", "A1"]
+
+        again = Session.load_from_pause(pause_file)
+        assert [m.content for m in again.state.messages] == ["Q1", "A1"]
+
+    def test_torn_last_line_ignored(self, tmp_path, sample_conv_content):
+        """A partially written record at the end of the journal is skipped."""
+        conv = ConversationFile.parse(sample_conv_content)
+        session = Session(conv, session_dir=tmp_path)
+        session.add_message("user", "Q1")
+        pause_file = session.save_pause_checkpoint("Paused")
+
+        journal = tmp_path / f"journal-{session.id}.jsonl"
+        with open(journal, "a") as f:
+            f.write('{"type": "message", "seq": 1, "role": "assis')
+
+        restored = Session.load_from_pause(pause_file)
+        assert [m.content for m in restored.state.messages] == ["Q1"]
+
+    def test_load_legacy_pause_with_embedded_messages(self, tmp_path, sample_conv_content):
+        """Pause files written before the journal still load."""
+        conv = ConversationFile.parse(sample_conv_content)
+        session = Session(conv, session_dir=tmp_path)
+        pause_file = session.save_pause_checkpoint("Paused")
+
+        data = json.loads(pause_file.read_text())
+        del data["journal"], data["message_count"]
+        data["messages"] = [{
+            "role": "user",
+            "content": "Old question",
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "metadata": {},
+        }]
+        pause_file.write_text(json.dumps(data))
+
+        restored = Session.load_from_pause(pause_file)
+        assert [m.content for m in restored.state.messages] == ["Old question"]
+
+        # The embedded messages are journaled on the next checkpoint
+        restored.save_pause_checkpoint("Paused again")
+        again = Session.load_from_pause(pause_file)
+        assert [m.content for m in again.state.messages] == ["Old question"]
+
+
+class TestCompressedJournal:
+    """Tests for gzip/zstd-compressed session journals."""
+
+    def _paused_session(self, tmp_path, conv_content, monkeypatch, compression):
+        monkeypatch.setattr(
+            "sdqctl.core.session._get_checkpoint_compression", lambda: compression
+        )
+        conv = ConversationFile.parse(conv_content)
+        session = Session(conv, session_dir=tmp_path)
+        session.add_message("user", "Q1 " * 1000)
+        session.create_checkpoint()
+        session.add_message("assistant", "A1")
+        return session, session.save_pause_checkpoint("Paused")
+
+    def test_gzip_journal_round_trip(self, tmp_path, sample_conv_content, monkeypatch):
+        """A gzip journal is written per append and detected on load."""
+        import gzip
+
+        session, pause_file = self._paused_session(
+            tmp_path, sample_conv_content, monkeypatch, "gzip"
+        )
+        journal = tmp_path / f"journal-{session.id}.jsonl.gz"
+        assert journal.read_bytes()[:2] == b"\x1f\x8b"
+        assert json.loads(pause_file.read_text())["journal"] == journal.name
+        assert len(gzip.decompress(journal.read_bytes()).splitlines()) == 4
+
+        # Resume uses the existing journal even if the configured encoding changed
+        monkeypatch.setattr("sdqctl.core.session._get_checkpoint_compression", lambda: "none")
+        restored = Session.load_from_pause(pause_file)
+        assert [m.content for m in restored.state.messages] == ["Q1 " * 1000, "A1"]
+        restored.add_message("user", "Q2")
+        pause_file = restored.save_pause_checkpoint("Paused again")
+        again = Session.load_from_pause(pause_file)
+        assert [m.content for m in again.state.messages][-1] == "Q2"
+
+    def test_gzip_torn_member_ignored(self, tmp_path, sample_conv_content, monkeypatch):
+        """A truncated trailing gzip member does not break the resume."""
+        import gzip
+
+        session, pause_file = self._paused_session(
+            tmp_path, sample_conv_content, monkeypatch, "gzip"
+        )
+        journal = tmp_path / f"journal-{session.id}.jsonl.gz"
+        partial = gzip.compress(b'{"type": "message", "seq": 2, "role": "user"}\n')
+        with open(journal, "ab") as f:
+            f.write(partial[: len(partial) // 2])
+
+        restored = Session.load_from_pause(pause_file)
+        assert len(restored.state.messages) == 2
+
+    def test_zstd_journal_round_trip(self, tmp_path, sample_conv_content, monkeypatch):
+        """A zstd journal is written per append and detected on load."""
+        pytest.importorskip("zstandard")
+        session, pause_file = self._paused_session(
+            tmp_path, sample_conv_content, monkeypatch, "zstd"
+        )
+        journal = tmp_path / f"journal-{session.id}.jsonl.zst"
+        assert journal.read_bytes()[:4] == b"\x28\xb5\x2f\xfd"
+
+        restored = Session.load_from_pause(pause_file)
+        assert [m.content for m in restored.state.messages] == ["Q1 " * 1000, "A1"]
+
+    def test_compressed_legacy_checkpoint_loads(self, tmp_path, sample_conv_content):
+        """A gzipped checkpoint file with embedded messages is detected."""
+        import gzip
+
+        conv = ConversationFile.parse(sample_conv_content)
+        session = Session(conv, session_dir=tmp_path)
+        pause_file = session.save_pause_checkpoint("Paused")
+
+        data = json.loads(pause_file.read_text())
+        del data["journal"], data["message_count"]
+        data["messages"] = [{
+            "role": "user",
+            "content": "Old question",
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "metadata": {},
+        }]
+        pause_file.write_bytes(gzip.compress(json.dumps(data).encode()))
+
+        restored = Session.load_from_pause(pause_file)
+        assert [m.content for m in restored.state.messages] == ["Old question"]
+
+
 class TestReloadContext:
     """Tests for CONTEXT file reloading (fresh mode support)."""
 
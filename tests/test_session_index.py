@@ -0,0 +1,122 @@
+"""
+Tests for the SQLite session index - sdqctl/core/session_index.py
+"""
+
+import json
+import shutil
+from datetime import datetime, timezone
+
+import pytest
+
+from sdqctl.core.checkpoint_writer import flush_checkpoints
+from sdqctl.core.conversation import ConversationFile
+from sdqctl.core.metrics import emit_metrics
+from sdqctl.core.session import Session
+from sdqctl.core.session_index import SessionIndex, index_for
+
+
+@pytest.fixture
+def sessions_dir(tmp_path):
+    """Sessions directory with two sessions written the old way (no index)."""
+    root = tmp_path / "sessions"
+    for session_id, checkpoints in (("audit-1", 2), ("build-1", 0)):
+        session_dir = root / session_id
+        session_dir.mkdir(parents=True)
+        for i in range(checkpoints):
+            (session_dir / f"checkpoint-{i}.json").write_text(json.dumps({
+                "id": str(i), "name": f"cycle-{i}",
+                "timestamp": f"2026-01-0{i + 1}T00:00:00", "cycle_number": i,
+            }))
+    (root / "build-1" / "metrics.json").write_text(json.dumps({
+        "token_efficiency": {"input_tokens": 100, "output_tokens": 50},
+        "duration": {"cycles": 3, "total_seconds": 12.5},
+    }))
+    return root
+
+
+class TestSessionIndexSync:
+    """Keeping the index in step with the directory."""
+
+    def test_sync_indexes_existing_sessions(self, sessions_dir):
+        index = SessionIndex(sessions_dir)
+        assert index.sync() == 2
+
+        assert index.db_path == sessions_dir.parent / "sessions.db"
+        assert index.totals() == (2, 2)
+        assert [c["name"] for c in index.get_checkpoints("audit-1")] == ["cycle-0", "cycle-1"]
+        build = index.list_sessions(pattern="build-*")[0]
+        assert (build["input_tokens"], build["output_tokens"], build["cycles"]) == (100, 50, 3)
+
+    def test_sync_only_rereads_changed_sessions(self, sessions_dir):
+        index = SessionIndex(sessions_dir)
+        index.sync()
+        assert index.sync() == 0
+
+        (sessions_dir / "new-1").mkdir()
+        shutil.rmtree(sessions_dir / "build-1")
+        assert index.sync() == 2
+        assert sorted(s["id"] for s in index.list_sessions()) == ["audit-1", "new-1"]
+
+    def test_rebuild_recovers_from_stale_rows(self, sessions_dir):
+        index = SessionIndex(sessions_dir)
+        index.record_checkpoint("ghost", {"id": "x", "name": "gone"})
+        assert index.rebuild() == 2
+        assert sorted(s["id"] for s in index.list_sessions()) == ["audit-1", "build-1"]
+
+
+class TestSessionIndexQueries:
+    """Filtering and sorting."""
+
+    def test_sort_and_limit(self, sessions_dir):
+        index = SessionIndex(sessions_dir)
+        index.sync()
+
+        by_checkpoints = index.list_sessions(sort="checkpoints", descending=True, limit=1)
+        assert [s["id"] for s in by_checkpoints] == ["audit-1"]
+        by_id = index.list_sessions(sort="id", descending=False)
+        assert [s["id"] for s in by_id] == ["audit-1", "build-1"]
+
+    def test_unknown_sort_rejected(self, sessions_dir):
+        with pytest.raises(ValueError):
+            SessionIndex(sessions_dir).list_sessions(sort="id; DROP TABLE sessions")
+
+    def test_get_metrics_bulk(self, sessions_dir):
+        index = SessionIndex(sessions_dir)
+        index.sync()
+        metrics = index.get_metrics(["audit-1", "build-1", "missing"])
+        assert list(metrics) == ["build-1"]
+        assert metrics["build-1"]["duration"]["cycles"] == 3
+
+
+class TestSessionIndexWriters:
+    """Sessions update the index as they write files."""
+
+    def test_checkpoint_and_pause_recorded(self, tmp_path, sample_conv_content):
+        sessions_dir = tmp_path / "sessions"
+        conv = ConversationFile.parse(sample_conv_content)
+        session = Session(conv, session_dir=sessions_dir / "run-1")
+        session.add_message("user", "Q1")
+        session.create_checkpoint("first")
+        session.save_pause_checkpoint("Paused")
+        flush_checkpoints()
+
+        index = SessionIndex(sessions_dir)
+        rows = index.list_sessions()
+        assert [(s["id"], s["checkpoints"], s["paused"]) for s in rows] == [
+            ("run-1", 1, True)
+        ]
+        # The recorded directory mtime is current, so sync has nothing to do
+        assert index.sync() == 0
+
+    def test_emit_metrics_recorded(self, tmp_path):
+        sessions_dir = tmp_path / "sessions"
+        emit_metrics(
+            "run-2", sessions_dir / "run-2", datetime.now(timezone.utc),
+            input_tokens=7, output_tokens=3,
+        )
+        row = SessionIndex(sessions_dir).list_sessions()[0]
+        assert (row["id"], row["input_tokens"], row["output_tokens"]) == ("run-2", 7, 3)
+
+    def test_sessions_outside_sessions_dir_not_indexed(self, tmp_path):
+        assert index_for(tmp_path / "scratch") is None
+        assert index_for(tmp_path / "sessions" / "abc") is not None
@@ -0,0 +1,98 @@
+"""Tests for the persistent RUN shell - sdqctl/commands/shell_worker.py"""
+
+import asyncio
+import shutil
+import time
+
+import pytest
+
+from sdqctl.commands.shell_worker import ShellWorker, create_shell_worker
+from sdqctl.core.conversation import ConversationFile
+
+pytestmark = pytest.mark.skipif(shutil.which("bash") is None, reason="bash not available")
+
+
+def _session(tmp_path, *commands, **kwargs):
+    """Run commands in one ShellWorker; return (results, worker)."""
+    kwargs.setdefault("timeout", 10)
+
+    async def main():
+        worker = ShellWorker()
+        try:
+            return [await worker.run(c, cwd=tmp_path, **kwargs) for c in commands], worker
+        finally:
+            await worker.close()
+
+    return asyncio.run(main())
+
+
+class TestShellWorker:
+    def test_state_persists_and_exit_codes_captured(self, tmp_path):
+        (results, worker) = _session(
+            tmp_path,
+            "export GREETING=hi; greet() { echo \"$GREETING $1\"; }",
+            "greet there; echo oops >&2; false",
+            "printf 'no newline'",
+            "if then",  # Syntax error must not break the framing
+            "pwd",
+        )
+        assert [r.returncode for r in results] == [0, 1, 0, 2, 0]
+        assert (results[1].stdout, results[1].stderr) == ("hi there\n", "oops\n")
+        assert results[2].stdout == "no newline"
+        assert results[4].stdout.strip() == str(tmp_path)
+        assert worker.starts == 1
+
+    def test_env_exported_and_stdin_isolated(self, tmp_path):
+        (results, _) = _session(tmp_path, "cat; echo $MODE", "echo after", env={"MODE": "a b"})
+        assert [r.stdout for r in results] == ["a b\n", "after\n"]
+
+    def test_exit_and_timeout_restart_shell(self, tmp_path):
+        start = time.perf_counter()
+        (results, worker) = _session(
+            tmp_path, "X=1; exit 3", "echo ${X:-unset}", "sleep 5", "echo again",
+            timeout=0.5,
+        )
+        assert results[0].returncode == 3
+        assert results[1].stdout == "unset\n"
+        assert results[2].timed_out and results[2].returncode == -1
+        assert results[3].stdout == "again\n"
+        assert worker.starts == 3
+        assert time.perf_counter() - start < 4
+
+
+class TestRunShellDirective:
+    def test_persistent_requires_allow_shell(self):
+        conv = ConversationFile.parse("MODEL gpt-4\nRUN-SHELL persistent\n")
+        assert conv.run_shell == "persistent"
+        assert create_shell_worker(conv) is None
+        conv.allow_shell = True
+        assert isinstance(create_shell_worker(conv), ShellWorker)
+        assert "RUN-SHELL persistent" in conv.to_string()
+
+    def test_invalid_value(self):
+        with pytest.raises(ValueError, match="RUN-SHELL"):
+            ConversationFile.parse("MODEL gpt-4\nRUN-SHELL sometimes\n")
+
+    def test_elide_group_runs_in_order_in_one_shell(self, tmp_path):
+        from sdqctl.commands.elide_steps import execute_merged_producers
+        from sdqctl.commands.step_plan import compile_step_plan
+
+        conv = ConversationFile.parse(
+            f"MODEL gpt-4\nALLOW-SHELL true\nRUN-SHELL persistent\nCWD {tmp_path}\n"
+            "PROMPT Go\nELIDE\nRUN sleep 0.2; COUNT=1\nELIDE\nRUN echo count=$COUNT\n"
+        )
+        plan = compile_step_plan(conv)
+        step = plan.steps[0]
+
+        async def main():
+            worker = create_shell_worker(conv)
+            try:
+                return await execute_merged_producers(
+                    step, step.content, plan.placeholders[0], plan.resolved[0], conv,
+                    shell=worker,
+                )
+            finally:
+                await worker.close()
+
+        prompt, _ = asyncio.run(main())
+        assert "+ echo count=$COUNT\ncount=1" in prompt
@@ -0,0 +1,72 @@
+"""Tests for compiled step plans - sdqctl/commands/step_plan.py"""
+
+import dataclasses
+
+import pytest
+
+from sdqctl.commands.elide import placeholder
+from sdqctl.commands.step_plan import compile_step_plan, render_help_topics
+from sdqctl.core.conversation import ConversationFile, ConversationStep
+
+
+def _conv(content: str) -> ConversationFile:
+    return ConversationFile.parse(content)
+
+
+class TestCompileStepPlan:
+    """Compiling a ConversationFile into a StepPlan."""
+
+    def test_prompt_turns_counted_after_elide(self):
+        conv = _conv("""MODEL gpt-4
+PROMPT Analyze the output.
+ELIDE
+RUN echo hi
+ELIDE
+PROMPT Fix it.
+COMPACT
+PROMPT Summarize.
+""")
+        plan = compile_step_plan(conv)
+
+        assert [s.type for s in plan] == ["merged_prompt", "compact", "prompt"]
+        assert plan.total_prompts == 2
+        assert len(conv.prompts) == 3
+
+    def test_falls_back_to_prompts(self):
+        conv = _conv("MODEL gpt-4\nPROMPT one\n")
+        conv.steps = []
+        plan = compile_step_plan(conv)
+        assert plan.steps == ({"type": "prompt", "content": "one"},)
+        assert plan.total_prompts == 1
+
+    def test_placeholders_match_merged_content(self):
+        consult = "x" * 80
+        conv = _conv("MODEL gpt-4\nPROMPT Check\nELIDE\nRUN make test\n")
+        conv.steps.extend([
+            ConversationStep(type="elide", content=""),
+            ConversationStep(type="consult", content=consult),
+        ])
+        plan = compile_step_plan(conv)
+
+        run_ph = plan.placeholders_for(0, "RUN")
+        consult_ph = plan.placeholders_for(0, "CONSULT")
+        assert run_ph == (placeholder("RUN", 0, "make test"),)
+        assert consult_ph == ("{{CONSULT:0:" + "x" * 50 + "}}",)
+        assert run_ph[0] in plan.steps[0].content
+        assert consult_ph[0] in plan.steps[0].content
+        assert plan.placeholders_for(0, "VERIFY") == ()
+
+    def test_help_inline_merged_into_next_prompt(self):
+        conv = _conv("MODEL gpt-4\nHELP-INLINE nosuchtopic\nPROMPT Start\n")
+        plan = compile_step_plan(conv)
+        assert [s.type for s in plan] == ["prompt"]
+
+    def test_render_help_topics(self):
+        text = render_help_topics("nosuchtopic")
+        assert text == "## NOSUCHTOPIC\n[Unknown help topic: nosuchtopic]"
+
+    def test_plan_is_immutable(self):
+        plan = compile_step_plan(_conv("MODEL gpt-4\nPROMPT one\n"))
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            plan.total_prompts = 5
+        assert isinstance(plan.steps, tuple)
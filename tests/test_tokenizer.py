@@ -0,0 +1,143 @@
+"""
+Tests for pluggable token counting - sdqctl/core/tokenizer.py
+"""
+
+import base64
+
+import pytest
+
+from sdqctl.core import tokenizer as tokenizer_module
+from sdqctl.core.tokenizer import (
+    BPETokenizer,
+    HeuristicTokenizer,
+    Tokenizer,
+    count_tokens,
+    get_tokenizer,
+    register_tokenizer,
+    set_tokenizer,
+)
+
+
+@pytest.fixture(autouse=True)
+def reset_tokenizer():
+    """Re-resolve the tokenizer around each test."""
+    set_tokenizer(None)
+    yield
+    set_tokenizer(None)
+
+
+@pytest.fixture
+def vocab_file(tmp_path):
+    """Tiny tiktoken-format vocabulary: single bytes plus a few merges."""
+    tokens = [bytes([b]) for b in range(256)] + [b"de", b"def", b" f", b" fo", b" foo"]
+    lines = [f"{base64.b64encode(t).decode()} {rank}" for rank, t in enumerate(tokens)]
+    path = tmp_path / "tiny.tiktoken"
+    path.write_text("\n".join(lines))
+    return path
+
+
+class TestHeuristicTokenizer:
+    """Tests for the fallback heuristic."""
+
+    def test_four_chars_per_token(self):
+        """Test ~4 chars per token."""
+        assert HeuristicTokenizer().count("A" * 400) == 100
+
+    def test_default_without_vocab(self, monkeypatch, tmp_path):
+        """Test heuristic is selected when no vocabulary is found."""
+        monkeypatch.delenv("SDQCTL_TOKENIZER", raising=False)
+        monkeypatch.delenv("SDQCTL_TOKENIZER_VOCAB", raising=False)
+        monkeypatch.setattr(tokenizer_module, "DEFAULT_VOCAB_PATH", tmp_path / "none")
+        monkeypatch.setattr(tokenizer_module, "_config_value", lambda key: None)
+
+        assert get_tokenizer().name == "heuristic"
+
+
+class TestBPETokenizer:
+    """Tests for the local-vocabulary BPE tokenizer."""
+
+    def test_merges_applied(self, vocab_file):
+        """Test merges reduce the token count."""
+        bpe = BPETokenizer.from_file(vocab_file)
+
+        # "def" -> 1 token, " foo" -> 1 token, "()" -> 2 single bytes
+        assert bpe.count("def foo()") == 4
+
+    def test_unknown_pairs_fall_back_to_bytes(self, vocab_file):
+        """Test pieces without merges count one token per byte."""
+        bpe = BPETokenizer.from_file(vocab_file)
+
+        assert bpe.count("xyz") == 3
+
+    def test_auto_selects_bpe_when_vocab_present(self, monkeypatch, vocab_file):
+        """Test auto mode picks BPE when SDQCTL_TOKENIZER_VOCAB is set."""
+        monkeypatch.delenv("SDQCTL_TOKENIZER", raising=False)
+        monkeypatch.setenv("SDQCTL_TOKENIZER_VOCAB", str(vocab_file))
+
+        assert get_tokenizer().name == "bpe"
+        assert count_tokens("def foo()") == 4
+
+    def test_invalid_vocab_falls_back(self, monkeypatch, tmp_path):
+        """Test an unreadable vocabulary falls back to the heuristic."""
+        bad = tmp_path / "bad.tiktoken"
+        bad.write_text("not a vocabulary")
+        monkeypatch.setenv("SDQCTL_TOKENIZER", "bpe")
+        monkeypatch.setenv("SDQCTL_TOKENIZER_VOCAB", str(bad))
+
+        assert get_tokenizer().name == "heuristic"
+
+
+class TestTokenizerRegistry:
+    """Tests for registration and count caching."""
+
+    def test_counts_cached_by_content_hash(self, monkeypatch):
+        """Test repeated counts of identical content run the tokenizer once."""
+        calls = []
+
+        class CountingTokenizer(Tokenizer):
+            name = "counting"
+            cacheable = True
+
+            def count(self, text):
+                calls.append(text)
+                return 7
+
+        register_tokenizer("counting", CountingTokenizer)
+        monkeypatch.setenv("SDQCTL_TOKENIZER", "counting")
+
+        assert count_tokens("same content") == 7
+        assert count_tokens("same content") == 7
+        assert len(calls) == 1
+
+    def test_base_class_is_abstract(self):
+        """Test Tokenizer subclasses must implement count()."""
+        with pytest.raises(TypeError):
+            Tokenizer()
+
+    def test_unknown_name_falls_back(self, monkeypatch):
+        """Test an unregistered tokenizer name uses the heuristic."""
+        monkeypatch.setenv("SDQCTL_TOKENIZER", "no-such-tokenizer")
+
+        assert get_tokenizer().name == "heuristic"
+
+    def test_context_status_reports_tokenizer(self, temp_workspace, monkeypatch):
+        """Test ContextManager token accounting uses the active tokenizer."""
+        from sdqctl.core.context import ContextManager
+
+        class FixedTokenizer(Tokenizer):
+            name = "fixed"
+
+            def count(self, text):
+                return 1000
+
+        set_tokenizer(FixedTokenizer())
+        ctx = ContextManager(base_path=temp_workspace, max_tokens=2000)
+        ctx.add_file(temp_workspace / "lib" / "auth.js")
+
+        status = ctx.get_status()
+        assert status["tokenizer"] == "fixed"
+        assert status["file_tokens"] == 1000
+        assert status["near_limit"] is False
+
+        ctx.add_conversation_turn("hello")
+        assert ctx.get_status()["near_limit"] is True